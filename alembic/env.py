@@ -8,28 +8,29 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 from app import create_app
 from app.extensions import db
-from app.models import Card, Column, Settings
+from app.models import Card, Column, Revision, Settings
 
 config = context.config
 
-if config.config_file_name is not None:
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # Keep Alembic and application pointed to the same DB.
-# Priority: environment URL (docker/runtime) -> alembic config URL (tests/cli).
-effective_db_url = os.getenv("SQLALCHEMY_DATABASE_URI") or config.get_main_option("sqlalchemy.url")
-app = create_app(
-    test_config={"SQLALCHEMY_DATABASE_URI": effective_db_url} if effective_db_url else None,
+# Priority: programmatic URL (board shards) -> environment URL (docker/runtime)
+# -> alembic config URL (tests/cli).
+effective_db_url = (
+    config.attributes.get("sqlalchemy.url")
+    or os.getenv("SQLALCHEMY_DATABASE_URI")
+    or config.get_main_option("sqlalchemy.url")
 )
-_ = (Column, Card, Settings)
+_ = (Column, Card, Settings, Revision)
 target_metadata = db.metadata
 
 
 def get_url() -> str:
     if effective_db_url:
         return effective_db_url
-    with app.app_context():
-        return app.config["SQLALCHEMY_DATABASE_URI"]
+    return create_app().config["SQLALCHEMY_DATABASE_URI"]
 
 
 def run_migrations_offline() -> None:
@@ -57,6 +58,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            if not connection.exec_driver_sql("SELECT 1 FROM sqlite_master LIMIT 1").first():
+                # Only possible before the first table exists; older files need a full
+                # VACUUM (`flask maintenance run --convert`) to allow incremental vacuuming.
+                connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            # End the implicit transaction so Alembic begins (and commits) its own.
+            connection.commit()
         context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
 
         with context.begin_transaction():
@@ -0,0 +1,59 @@
+"""add revision counters
+
+Revision ID: 20261019_0003
+Revises: 20260213_0002
+Create Date: 2026-10-19 09:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0003"
+down_revision = "20260213_0002"
+branch_labels = None
+depends_on = None
+
+# Tables whose writes bump each revision counter.
+TRACKED = {"board": ("columns", "cards"), "settings": ("settings",)}
+
+
+def _trigger_name(table: str, event: str) -> str:
+    return f"trg_{table}_{event.lower()}_revision"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("revisions"):
+        op.create_table(
+            "revisions",
+            sa.Column("name", sa.String(length=32), nullable=False),
+            sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+            sa.PrimaryKeyConstraint("name"),
+        )
+    for name in TRACKED:
+        bind.execute(
+            sa.text("INSERT OR IGNORE INTO revisions (name, value) VALUES (:name, 1)"),
+            {"name": name},
+        )
+
+    for name, tables in TRACKED.items():
+        for table in tables:
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                op.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, event)} "
+                    f"AFTER {event} ON {table} "
+                    f"BEGIN UPDATE revisions SET value = value + 1 WHERE name = '{name}'; END"
+                )
+
+
+def downgrade() -> None:
+    for tables in TRACKED.values():
+        for table in tables:
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                op.execute(f"DROP TRIGGER IF EXISTS {_trigger_name(table, event)}")
+    op.drop_table("revisions")
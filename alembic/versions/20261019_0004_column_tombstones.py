@@ -0,0 +1,56 @@
+"""column tombstones
+
+Revision ID: 20261019_0004
+Revises: 20261019_0003
+Create Date: 2026-10-19 13:30:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0004"
+down_revision = "20261019_0003"
+branch_labels = None
+depends_on = None
+
+BUMP_BOARD = "BEGIN UPDATE revisions SET value = value + 1 WHERE name = 'board'; END"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    columns = {col["name"] for col in sa.inspect(bind).get_columns("columns")}
+    if "deleted" not in columns:
+        op.add_column(
+            "columns",
+            sa.Column("deleted", sa.Boolean(), nullable=False, server_default=sa.false()),
+        )
+
+    # Purging a tombstoned column changes nothing visible: keep the revision (and
+    # every cached payload keyed by it) while its cards are deleted in chunks.
+    op.execute("DROP TRIGGER IF EXISTS trg_cards_delete_revision")
+    op.execute(
+        "CREATE TRIGGER trg_cards_delete_revision AFTER DELETE ON cards "
+        "WHEN NOT EXISTS (SELECT 1 FROM columns WHERE id = OLD.column_id AND deleted) " + BUMP_BOARD
+    )
+    op.execute("DROP TRIGGER IF EXISTS trg_columns_delete_revision")
+    op.execute(
+        "CREATE TRIGGER trg_columns_delete_revision AFTER DELETE ON columns "
+        "WHEN NOT OLD.deleted " + BUMP_BOARD
+    )
+
+
+def downgrade() -> None:
+    # Finish pending purges first: the old schema has no way to hide these rows.
+    op.execute("DELETE FROM cards WHERE column_id IN (SELECT id FROM columns WHERE deleted)")
+    op.execute("DELETE FROM columns WHERE deleted")
+    for table in ("cards", "columns"):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_delete_revision")
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_delete_revision AFTER DELETE ON {table} " + BUMP_BOARD
+        )
+    # Not batch mode: recreating the table would drop its revision triggers.
+    op.execute("ALTER TABLE columns DROP COLUMN deleted")
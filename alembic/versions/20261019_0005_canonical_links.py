@@ -0,0 +1,59 @@
+"""canonical card links
+
+Revision ID: 20261019_0005
+Revises: 20261019_0004
+Create Date: 2026-10-19 16:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.urls import canonical_url
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0005"
+down_revision = "20261019_0004"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    columns = {col["name"] for col in sa.inspect(bind).get_columns("cards")}
+    if "canonical_link" not in columns:
+        op.add_column(
+            "cards",
+            sa.Column("canonical_link", sa.String(length=2048), nullable=False, server_default=""),
+        )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, link FROM cards WHERE id > :last_id AND link != '' "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH},
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE cards SET canonical_link = :canonical WHERE id = :id"),
+            [{"id": row.id, "canonical": canonical_url(row.link)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    # Built after the backfill: one sorted pass instead of index updates per row.
+    op.create_index(
+        "ix_cards_canonical_link", "cards", ["canonical_link", "column_id"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cards_canonical_link", table_name="cards", if_exists=True)
+    # Not batch mode: recreating the table would drop its revision triggers.
+    op.execute("ALTER TABLE cards DROP COLUMN canonical_link")
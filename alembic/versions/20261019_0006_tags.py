@@ -0,0 +1,85 @@
+"""card tags
+
+Revision ID: 20261019_0006
+Revises: 20261019_0005
+Create Date: 2026-10-19 18:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0006"
+down_revision = "20261019_0005"
+branch_labels = None
+depends_on = None
+
+BUMP_BOARD = "UPDATE revisions SET value = value + 1 WHERE name = 'board';"
+IN_DELETED_COLUMN = "SELECT 1 FROM columns WHERE id = OLD.column_id AND deleted"
+
+# Foreign keys are not enforced on these connections, so tag links and counts
+# follow card deletes through triggers. Cards of a tombstoned column stop
+# counting when it is hidden; purging them later changes neither the counts
+# nor the board revision.
+TRIGGERS = {
+    "trg_card_tags_insert": (
+        "AFTER INSERT ON card_tags BEGIN "
+        "UPDATE tags SET card_count = card_count + 1 WHERE id = NEW.tag_id; " + BUMP_BOARD + " END"
+    ),
+    # Untagging a card that still exists; deleted cards are handled below.
+    "trg_card_tags_delete": (
+        "AFTER DELETE ON card_tags "
+        "WHEN EXISTS (SELECT 1 FROM cards WHERE id = OLD.card_id) BEGIN "
+        "UPDATE tags SET card_count = card_count - 1 WHERE id = OLD.tag_id; " + BUMP_BOARD + " END"
+    ),
+    "trg_cards_delete_tags": (
+        "AFTER DELETE ON cards BEGIN "
+        "UPDATE tags SET card_count = card_count - 1 "
+        "WHERE id IN (SELECT tag_id FROM card_tags WHERE card_id = OLD.id) "
+        f"AND NOT EXISTS ({IN_DELETED_COLUMN}); "
+        "DELETE FROM card_tags WHERE card_id = OLD.id; END"
+    ),
+    "trg_columns_tombstone_tags": (
+        "AFTER UPDATE OF deleted ON columns WHEN NEW.deleted AND NOT OLD.deleted BEGIN "
+        "UPDATE tags SET card_count = card_count - ("
+        "SELECT count(*) FROM card_tags JOIN cards ON cards.id = card_tags.card_id "
+        "WHERE cards.column_id = NEW.id AND card_tags.tag_id = tags.id) "
+        "WHERE id IN (SELECT card_tags.tag_id FROM card_tags "
+        "JOIN cards ON cards.id = card_tags.card_id WHERE cards.column_id = NEW.id); END"
+    ),
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("tags"):
+        op.create_table(
+            "tags",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=64), nullable=False),
+            sa.Column("card_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("name"),
+        )
+    if not inspector.has_table("card_tags"):
+        op.create_table(
+            "card_tags",
+            sa.Column("card_id", sa.Integer(), nullable=False),
+            sa.Column("tag_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["card_id"], ["cards.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("card_id", "tag_id"),
+        )
+        op.create_index("ix_card_tags_tag_card", "card_tags", ["tag_id", "card_id"])
+    for name, body in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table("card_tags")
+    op.drop_table("tags")
@@ -0,0 +1,44 @@
+"""card hit counters
+
+Revision ID: 20261019_0007
+Revises: 20261019_0006
+Create Date: 2026-10-19 20:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0007"
+down_revision = "20261019_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Deliberately outside the board revision: clicks must not invalidate cached payloads.
+    if not sa.inspect(op.get_bind()).has_table("card_hits"):
+        op.create_table(
+            "card_hits",
+            sa.Column("card_id", sa.Integer(), nullable=False),
+            sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("score", sa.Float(), nullable=False, server_default="0"),
+            sa.Column("era", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("last_hit", sa.Float(), nullable=True),
+            sa.ForeignKeyConstraint(["card_id"], ["cards.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("card_id"),
+        )
+        op.create_index("ix_card_hits_era_score", "card_hits", ["era", "score"])
+    # Foreign keys are not enforced on these connections.
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_cards_delete_hits AFTER DELETE ON cards "
+        "BEGIN DELETE FROM card_hits WHERE card_id = OLD.id; END"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_cards_delete_hits")
+    op.drop_table("card_hits")
@@ -4,11 +4,21 @@ from flask import Flask
 from werkzeug.exceptions import HTTPException
 
 import app.models  # noqa: F401
+from app.backup import register_backups
 from app.config import get_config
 from app.errors import error_response
 from app.extensions import db, limiter
+from app.jobs import register_jobs
+from app.maintenance import register_maintenance
+from app.metrics import register_metrics
+from app.profiling import register_profiling
+from app.replication import register_replication
+from app.repositories.purge import register_purge
+from app.routes.admin import admin_bp
 from app.routes.api import api_bp
+from app.routes.metrics import metrics_bp
 from app.routes.pages import pages_bp
+from app.routes.uploads import uploads_bp
 from app.security import register_security
 
 
@@ -27,13 +37,24 @@ def create_app(config_name: str | None = None, test_config: dict | None = None)
     elif test_config and "DB_PATH" in test_config and "SQLALCHEMY_DATABASE_URI" not in test_config:
         app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{app.config['DB_PATH']}"
 
-    Path(app.config["UPLOAD_DIR"]).mkdir(parents=True, exist_ok=True)
     db.init_app(app)
     limiter.init_app(app)
 
     app.register_blueprint(pages_bp)
+    app.register_blueprint(uploads_bp)
     app.register_blueprint(api_bp)
+    if app.config.get("BOARDS_ENABLED"):
+        app.register_blueprint(api_bp, url_prefix="/b/<board>/api", name="board_api")
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(admin_bp)
     register_security(app)
+    register_metrics(app)
+    register_profiling(app)
+    register_backups(app)
+    register_replication(app)
+    register_jobs(app)
+    register_maintenance(app)
+    register_purge(app)
     register_error_handlers(app)
 
     return app
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from flask import Flask
+
+from app.repositories.aio import AsyncBoardRepository
+from app.shards import get_shards
+
+EVENTS_PATH = "/api/events"
+BOARD_EVENTS_PATH = re.compile(r"^/b/(?P<board>[^/]+)/api/events$")
+
+
+class BoardEventHub:
+    """Fan out board revision changes to any number of idle SSE subscribers.
+
+    One polling task per process checks the board revision while at least
+    one client is subscribed; each connection only costs a coroutine and a
+    queue, never a thread.
+    """
+
+    def __init__(self, board: AsyncBoardRepository, interval: float):
+        self.board = board
+        self.interval = interval
+        self.revision: str | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+
+    async def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if self.revision is None:
+            self.revision = await self.board.revision()
+        queue.put_nowait(self.revision)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    async def _poll(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            revision = await self.board.revision()
+            if revision == self.revision:
+                continue
+            self.revision = revision
+            for queue in list(self._subscribers):
+                # Slow consumers only need the newest revision.
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(revision)
+        self.revision = None
+
+
+class AsgiApp:
+    """ASGI front end for the Flask app.
+
+    Request bodies are buffered on the event loop (spilling to disk past
+    64 KB), so slow uploads and idle keep-alive sockets hold no thread. Only
+    once a request is complete does it run through the regular Flask WSGI
+    stack on a bounded thread pool, which keeps CRUD behavior identical to
+    the gunicorn deployment. ``/api/events`` (and ``/b/<slug>/api/events``
+    for board shards) is served natively as a Server-Sent Events stream of
+    board revisions.
+    """
+
+    def __init__(self, flask_app: Flask, threads: int | None = None):
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads or flask_app.config["ASGI_THREADS"],
+            thread_name_prefix="asgi-wsgi",
+        )
+        self.board = AsyncBoardRepository(flask_app, self.executor)
+        self.events = BoardEventHub(self.board, flask_app.config["ASGI_EVENTS_POLL_INTERVAL"])
+        self.board_events: dict[str, BoardEventHub] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if scope["method"] == "GET":
+            hub = self._events_hub(scope["path"])
+            if hub is not None:
+                await self._stream_events(hub, receive, send)
+                return
+        await self._call_wsgi(scope, receive, send)
+
+    def _events_hub(self, path: str) -> BoardEventHub | None:
+        if path == EVENTS_PATH:
+            return self.events
+        match = BOARD_EVENTS_PATH.match(path)
+        shards = get_shards(self.flask_app) if match else None
+        if shards is None or not shards.exists(match["board"]):
+            return None  # Flask answers 404
+        board = match["board"]
+        if board not in self.board_events:
+            repo = AsyncBoardRepository(self.flask_app, self.executor, board=board)
+            self.board_events[board] = BoardEventHub(
+                repo, self.flask_app.config["ASGI_EVENTS_POLL_INTERVAL"]
+            )
+        return self.board_events[board]
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for hub in (self.events, *self.board_events.values()):
+                    await hub.close()
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _call_wsgi(self, scope, receive, send) -> None:
+        loop = asyncio.get_running_loop()
+        max_length = self.flask_app.config.get("MAX_CONTENT_LENGTH")
+        with SpooledTemporaryFile(max_size=65536) as body:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                body.write(message.get("body", b""))
+                if max_length is not None and body.tell() > max_length:
+                    await _send_json(send, 413, {"error": {"message": "file too large"}})
+                    return
+                if not message.get("more_body"):
+                    break
+            length = body.tell()
+            body.seek(0)
+            environ = build_environ(scope, body)
+            # The body is fully buffered, so chunked uploads get a real length too.
+            environ["CONTENT_LENGTH"] = str(length)
+
+            def sync_send(message):
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+            await loop.run_in_executor(self.executor, run_wsgi, self.flask_app, environ, sync_send)
+
+    async def _stream_events(self, hub: BoardEventHub, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-content-type-options", b"nosniff"),
+                ],
+            }
+        )
+        queue = await hub.subscribe()
+        disconnected = asyncio.create_task(_wait_disconnect(receive))
+        heartbeat = self.flask_app.config["ASGI_EVENTS_HEARTBEAT"]
+        try:
+            while not disconnected.done():
+                getter = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait(
+                    {getter, disconnected},
+                    timeout=heartbeat,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if getter in done:
+                    payload = json.dumps({"revision": getter.result()})
+                    chunk = f"event: state\ndata: {payload}\n\n".encode()
+                else:
+                    getter.cancel()
+                    if disconnected.done():
+                        break
+                    chunk = b": keepalive\n\n"
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            hub.unsubscribe(queue)
+            disconnected.cancel()
+
+
+async def _send_json(send, status: int, payload: dict) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _wait_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def build_environ(scope, body) -> dict:
+    script_name = scope.get("root_path", "").encode("utf8").decode("latin1")
+    path_info = scope["path"].encode("utf8").decode("latin1")
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name) :]
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": script_name,
+        "PATH_INFO": path_info,
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin1").upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        value = raw_value.decode("latin1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+def run_wsgi(wsgi_app, environ: dict, send) -> None:
+    started: dict = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [
+            (name.lower().encode("latin1"), value.encode("latin1")) for name, value in headers
+        ]
+
+    def send_start():
+        send(
+            {
+                "type": "http.response.start",
+                "status": started["status"],
+                "headers": started["headers"],
+            }
+        )
+
+    result = wsgi_app(environ, start_response)
+    try:
+        first = True
+        for chunk in result:
+            if not chunk:
+                continue
+            if first:
+                send_start()
+                first = False
+            send({"type": "http.response.body", "body": chunk, "more_body": True})
+        if first:
+            send_start()
+        send({"type": "http.response.body", "body": b""})
+    finally:
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+
+
+def create_asgi_app(flask_app: Flask) -> AsgiApp:
+    return AsgiApp(flask_app)
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from datetime import UTC, datetime
+from pathlib import Path
+
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from sqlalchemy.engine import make_url
+
+from app.extensions import ProcessThreads
+from app.metrics import registry
+from app.shards import _alembic_config, get_shards
+
+try:  # POSIX only; without it concurrent backups from several workers are not prevented.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+EXTENSION_KEY = "backups"
+MANIFEST = "manifest.json"
+STAMP_FORMAT = "%Y%m%dT%H%M%S%fZ"
+
+
+class BackupBusy(Exception):
+    """Another process is already writing a backup."""
+
+
+class RestoreError(Exception):
+    pass
+
+
+class _Restarted(Exception):
+    pass
+
+
+class BackupManager:
+    """Consistent copies of the board databases under ``<directory>/<stamp>/``.
+
+    Each database is copied with SQLite's online backup API ``pages_per_step``
+    pages at a time, sleeping ``step_sleep`` between steps, so the read lock is
+    only held briefly and writers get through in between. A write from another
+    connection restarts the copy; after ``max_restarts`` restarts the rest is
+    copied in one step. A backup is written to ``<stamp>.partial`` and renamed
+    once complete, and only directories with a manifest are listed or restored.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        directory: Path,
+        keep: int,
+        pages_per_step: int,
+        step_sleep: float,
+        max_restarts: int,
+    ):
+        self.app = app
+        self.directory = Path(directory)
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+        self._threads = ProcessThreads(self._schedule, "backup")
+
+    def sources(self) -> dict[str, Path]:
+        """Database files to back up, keyed by their path inside a backup."""
+        sources = {"data.db": database_path(self.app.config["SQLALCHEMY_DATABASE_URI"])}
+        shards = get_shards(self.app)
+        if shards is not None:
+            for slug in shards.slugs():
+                sources[f"boards/{slug}.db"] = shards.path(slug)
+        return sources
+
+    def create(self, blocking: bool = True) -> dict:
+        """Write a new backup and prune old ones; returns its manifest."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a+b") as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    raise BackupBusy() from None
+            manifest = self._create()
+            self.prune()
+        return manifest
+
+    def list(self) -> list[dict]:
+        """Manifests of complete backups, newest first."""
+        manifests = []
+        for path in sorted(self.directory.glob(f"*/{MANIFEST}"), reverse=True):
+            try:
+                manifests.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return manifests
+
+    def path(self, name: str) -> Path:
+        path = self.directory / name
+        if "/" in name or name.startswith(".") or not (path / MANIFEST).is_file():
+            raise RestoreError(f"backup not found: {name}")
+        return path
+
+    def prune(self) -> None:
+        for manifest in self.list()[self.keep :]:
+            shutil.rmtree(self.directory / manifest["name"], ignore_errors=True)
+        # Left behind by a process that died mid-backup (we hold the lock).
+        for partial in self.directory.glob("*.partial"):
+            shutil.rmtree(partial, ignore_errors=True)
+
+    def start_schedule(self, interval: float) -> None:
+        """Back up every ``interval`` seconds from one worker per backup directory."""
+        self._threads.start(interval)
+
+    def _schedule(self, interval: float) -> None:
+        while True:
+            latest = self.list()[:1]
+            age = time.time() - latest[0]["created"] if latest else interval
+            if age < interval:
+                time.sleep(min(interval - age, 60.0))
+                continue
+            try:
+                # Every worker runs this loop; whoever holds the lock does the work.
+                self.create(blocking=False)
+            except BackupBusy:
+                time.sleep(min(interval, 60.0))
+            except Exception:  # noqa: BLE001 - keep the schedule alive
+                self.app.logger.exception("Scheduled backup failed")
+                time.sleep(min(interval, 60.0))
+
+    def _create(self) -> dict:
+        started = time.time()
+        name = datetime.fromtimestamp(started, UTC).strftime(STAMP_FORMAT)
+        staging = self.directory / f"{name}.partial"
+        staging.mkdir()
+        files = []
+        try:
+            for relative, source in self.sources().items():
+                if not source.is_file():
+                    raise FileNotFoundError(f"database not found: {source}")
+                target = staging / relative
+                target.parent.mkdir(parents=True, exist_ok=True)
+                stats = copy_database(
+                    source, target, self.pages_per_step, self.step_sleep, self.max_restarts
+                )
+                files.append({"path": relative, "bytes": target.stat().st_size, **stats})
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        duration = time.time() - started
+        manifest = {"name": name, "created": started, "duration": duration, "files": files}
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        staging.rename(self.directory / name)
+        registry.observe("dashboard_backup_seconds", duration)
+        return manifest
+
+
+def copy_database(
+    source: Path, target: Path, pages_per_step: int, step_sleep: float, max_restarts: int
+) -> dict:
+    """Online copy of ``source`` to ``target``; returns copy statistics."""
+    restarts = 0
+    remaining_before: int | None = None
+
+    def progress(_status, remaining, _total):
+        nonlocal restarts, remaining_before
+        if remaining_before is not None and remaining > remaining_before:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _Restarted()
+        remaining_before = remaining
+
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True, timeout=30)
+    dst = sqlite3.connect(target)
+    try:
+        try:
+            src.backup(dst, pages=pages_per_step, progress=progress, sleep=step_sleep)
+            single_step = False
+        except _Restarted:
+            # Busy database: finish in one step (holds the read lock for the copy).
+            src.backup(dst, pages=-1)
+            single_step = True
+        if dst.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+            raise sqlite3.DatabaseError(f"backup of {source} failed quick_check")
+    finally:
+        dst.close()
+        src.close()
+    return {"restarts": restarts, "single_step": single_step}
+
+
+def _raise_revisions(path: Path, current: Path | None) -> None:
+    replaced: dict[str, int] = {}
+    if current is not None and current.is_file():
+        with closing(sqlite3.connect(f"file:{current}?mode=ro", uri=True, timeout=30)) as conn:
+            try:
+                replaced = dict(conn.execute("SELECT name, value FROM revisions"))
+            except sqlite3.OperationalError:
+                pass  # created before the revisions table
+    with closing(sqlite3.connect(path)) as conn, conn:
+        for name, value in conn.execute("SELECT name, value FROM revisions").fetchall():
+            conn.execute(
+                "UPDATE revisions SET value = ? WHERE name = ?",
+                (max(value, replaced.get(name, 0)) + 1, name),
+            )
+
+
+def restore_database(backup_file: Path, output: Path, current: Path | None = None) -> str:
+    """Copy a backed-up database to a new file ``output`` and bring it to the
+    Alembic head; returns the head revision.
+
+    Refuses to overwrite ``output``, databases failing ``integrity_check`` and
+    databases from a revision this code base does not know. Every counter in
+    ``revisions`` ends up above its value in ``current`` (the database being
+    replaced): clients cache ``/theme.css?v=N`` as immutable and hold
+    ``board-N`` ETags, so an N must never come back with other content.
+    """
+    from alembic.script import ScriptDirectory
+    from alembic.util import CommandError
+
+    from alembic import command
+
+    if output.exists():
+        raise RestoreError(f"{output} already exists")
+    cfg = _alembic_config()
+    scripts = ScriptDirectory.from_config(cfg)
+    head = scripts.get_current_head()
+
+    staging = output.with_name(f".{output.name}.restoring")
+    staging.unlink(missing_ok=True)
+    copy_database(backup_file, staging, pages_per_step=-1, step_sleep=0, max_restarts=0)
+    try:
+        conn = sqlite3.connect(staging)
+        try:
+            if conn.execute("PRAGMA integrity_check").fetchone()[0] != "ok":
+                raise RestoreError(f"{backup_file} failed integrity_check")
+            version = conn.execute("SELECT version_num FROM alembic_version").fetchone()
+        except sqlite3.OperationalError as err:
+            raise RestoreError(f"{backup_file} is not a dashboard database: {err}") from None
+        finally:
+            conn.close()
+        try:
+            scripts.get_revision(version[0] if version else None)
+        except CommandError:
+            raise RestoreError(f"unknown schema revision {version[0]!r}") from None
+        if version is None or version[0] != head:
+            cfg.attributes["sqlalchemy.url"] = f"sqlite:///{staging}"
+            command.upgrade(cfg, "head")
+        _raise_revisions(staging, current)
+        os.replace(staging, output)
+    finally:
+        staging.unlink(missing_ok=True)
+    return head
+
+
+def database_path(uri: str) -> Path:
+    url = make_url(uri)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        raise RuntimeError("backups need a file-backed SQLite database")
+    return Path(url.database)
+
+
+def get_backups(app: Flask) -> BackupManager:
+    manager = app.extensions.get(EXTENSION_KEY)
+    if manager is None:
+        manager = app.extensions.setdefault(
+            EXTENSION_KEY,
+            BackupManager(
+                app,
+                app.config["BACKUP_DIR"],
+                keep=app.config["BACKUP_KEEP"],
+                pages_per_step=app.config["BACKUP_PAGES_PER_STEP"],
+                step_sleep=app.config["BACKUP_STEP_SLEEP_MS"] / 1000,
+                max_restarts=app.config["BACKUP_MAX_RESTARTS"],
+            ),
+        )
+    return manager
+
+
+def register_backups(app: Flask) -> None:
+    app.cli.add_command(backup_cli)
+    interval = app.config["BACKUP_INTERVAL"]
+    if interval > 0:
+
+        @app.before_request
+        def ensure_backup_schedule():
+            get_backups(app).start_schedule(interval)
+
+
+@click.group("backup")
+def backup_cli():
+    """Online SQLite backups (BACKUP_DIR)."""
+
+
+@backup_cli.command("create")
+@with_appcontext
+def backup_create_command():
+    """Back up the default database and every board now."""
+    try:
+        manifest = get_backups(current_app).create()
+    except OSError as err:
+        raise click.ClickException(str(err)) from None
+    click.echo(
+        f"{manifest['name']}: {len(manifest['files'])} file(s) in {manifest['duration']:.2f}s"
+    )
+
+
+@backup_cli.command("list")
+@with_appcontext
+def backup_list_command():
+    """List complete backups, newest first."""
+    for manifest in get_backups(current_app).list():
+        size = sum(item["bytes"] for item in manifest["files"])
+        click.echo(f"{manifest['name']}\t{len(manifest['files'])} file(s)\t{size} bytes")
+
+
+@backup_cli.command("restore")
+@click.argument("name")
+@click.option(
+    "--file", "relative", default="data.db", show_default=True, help="File in the backup."
+)
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path),
+    help="New database file (default: next to DB_PATH, named after the backup).",
+)
+@with_appcontext
+def backup_restore_command(name, relative, output):
+    """Restore a backup into a new, migrated database file.
+
+    The running database is not touched: stop the app, then move the new file
+    over DB_PATH and clear PAYLOAD_CACHE_DIR. Revision counters continue from
+    the running database's, so restore after the last write to it.
+    """
+    manager = get_backups(current_app)
+    try:
+        backup_file = manager.path(name) / relative
+        if not backup_file.is_file():
+            raise RestoreError(f"{relative} is not part of backup {name}")
+        if output is None:
+            current = database_path(current_app.config["SQLALCHEMY_DATABASE_URI"])
+            output = current.with_name(f"{Path(relative).stem}.restored-{name}.db")
+        head = restore_database(backup_file, output, manager.sources().get(relative))
+    except RestoreError as err:
+        raise click.ClickException(str(err)) from None
+    click.echo(f"Restored {name}/{relative} to {output} (schema {head})")
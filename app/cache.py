@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from flask import Flask, current_app, g, has_app_context, request
+
+from app.metrics import record_cache
+
+try:  # POSIX only; without it rebuilds are single-flight per process only.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+EXTENSION_KEY = "payload_cache"
+
+
+class SharedPayloadCache:
+    """Serialized payloads shared by every worker process through files.
+
+    Entries live in ``<directory>/<name>.<revision>.json`` and are keyed by the
+    database revision counters, so a write in any worker invalidates every
+    worker's view without messaging: the next reader simply asks for a newer
+    file. Point the directory at tmpfs (``/dev/shm``) and all workers read the
+    same page-cache copy instead of each holding its own.
+
+    Rebuilds are single-flight across processes: the first miss takes an
+    exclusive ``flock`` and builds, the rest wait on the lock and then read the
+    file it wrote. With ``serve_stale`` the waiters return the previous
+    revision instead of blocking.
+    """
+
+    def __init__(self, directory: Path, serve_stale: bool = False):
+        self.directory = Path(directory)
+        self.serve_stale = serve_stale
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def get(self, name: str, revision: int, build: Callable[[], bytes]) -> bytes:
+        path = self._path(name, revision)
+        data = _read(path)
+        if data is not None:
+            record_cache(name, True)
+            return data
+        record_cache(name, False)
+
+        thread_lock = self._thread_lock(name)
+        if not thread_lock.acquire(blocking=False):
+            stale = self._stale(name, revision)
+            if stale is not None:
+                return stale
+            thread_lock.acquire()
+        try:
+            with open(self.directory / f"{name}.lock", "a+b") as lock_file:
+                if not _flock(lock_file, blocking=False):
+                    stale = self._stale(name, revision)
+                    if stale is not None:
+                        return stale
+                    _flock(lock_file, blocking=True)
+                # Whoever held the lock may have built this revision already.
+                data = _read(path)
+                if data is None:
+                    data = build()
+                    self._store(path, data)
+                    self._prune(name, revision)
+                return data  # closing lock_file releases the flock
+        finally:
+            thread_lock.release()
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def _path(self, name: str, revision: int) -> Path:
+        return self.directory / f"{name}.{revision}.json"
+
+    def _revisions(self, name: str) -> list[tuple[int, Path]]:
+        found = []
+        for path in self.directory.glob(f"{name}.*.json"):
+            suffix = path.name[len(name) + 1 : -len(".json")]
+            if suffix.isdigit():
+                found.append((int(suffix), path))
+        return sorted(found)
+
+    def _latest(self, name: str, below: int) -> bytes | None:
+        for revision, path in reversed(self._revisions(name)):
+            if revision < below:
+                data = _read(path)
+                if data is not None:
+                    return data
+        return None
+
+    def _store(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _prune(self, name: str, revision: int) -> None:
+        # Keep the newest older entry around for serve_stale readers.
+        older = [path for rev, path in self._revisions(name) if rev < revision]
+        for path in older[:-1]:
+            path.unlink(missing_ok=True)
+
+    def _thread_lock(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _stale(self, name: str, revision: int) -> bytes | None:
+        return self._latest(name, below=revision) if self.serve_stale else None
+
+
+def _flock(handle, blocking: bool) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def get_payload_cache(app: Flask) -> SharedPayloadCache | None:
+    if not app.config.get("PAYLOAD_CACHE_ENABLED"):
+        return None
+    # One namespace per database (the default one or a board shard).
+    engine = g.get("db_engine") if has_app_context() else None
+    uri = str(engine.url) if engine is not None else app.config["SQLALCHEMY_DATABASE_URI"]
+    caches = app.extensions.setdefault(EXTENSION_KEY, {})
+    cache = caches.get(uri)
+    if cache is None:
+        digest = hashlib.sha1(uri.encode("utf-8"), usedforsecurity=False).hexdigest()[:12]
+        directory = Path(app.config["PAYLOAD_CACHE_DIR"]) / digest
+        directory.mkdir(parents=True, exist_ok=True)
+        cache = caches.setdefault(
+            uri, SharedPayloadCache(directory, serve_stale=app.config["PAYLOAD_CACHE_SERVE_STALE"])
+        )
+    return cache
+
+
+def revision_etag(name: str, revision: int) -> str:
+    return f"{name}-{revision}"
+
+
+def if_match_revision(name: str) -> int | None:
+    """Revision named by the request's ``If-Match`` (an ETag from ``cached_json``).
+
+    ``None`` when the header is absent, ``*`` or names another payload.
+    """
+    prefix = f"{name}-"
+    for tag in request.if_match.as_set():
+        value = tag.removeprefix(prefix)
+        if value != tag and value.isdigit():
+            return int(value)
+    return None
+
+
+def cached_json(name: str, revision: Callable[[], int], build: Callable[[], object]):
+    """JSON response for ``build()``, served from the shared cache when enabled.
+
+    The revision doubles as the ``ETag``, so a client that already holds the
+    current revision gets a bodyless 304 without the payload being built.
+    """
+    app = current_app._get_current_object()
+    current = revision()
+    etag = revision_etag(name, current)
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+
+        def serialize() -> bytes:
+            # Same bytes jsonify would produce, so cached and uncached responses match.
+            return f"{app.json.dumps(build())}\n".encode()
+
+        cache = get_payload_cache(app)
+        data = serialize() if cache is None else cache.get(name, current, serialize)
+        response = app.response_class(data, mimetype=app.json.mimetype)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
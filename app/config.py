@@ -2,6 +2,13 @@ import os
 from pathlib import Path
 
 
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 class BaseConfig:
     BASE_DIR = Path(__file__).resolve().parent.parent
     DB_PATH = Path(os.getenv("DB_PATH", str(BASE_DIR / "storage" / "data.db")))
@@ -11,7 +18,15 @@ class BaseConfig:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", str(BASE_DIR / "static" / "uploads")))
-    MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB
+    MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB (per request, so per chunk for /api/uploads)
+    # Resumable uploads (/api/uploads): parts are assembled here, then moved to UPLOAD_DIR.
+    UPLOAD_TMP_DIR = Path(os.getenv("UPLOAD_TMP_DIR", str(BASE_DIR / "storage" / "uploads-tmp")))
+    UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", str(50 * 1024 * 1024)))
+    UPLOAD_SESSION_TTL = float(os.getenv("UPLOAD_SESSION_TTL", "86400"))
+    # How /static/uploads/* is delivered: sendfile | x-sendfile | x-accel (app/routes/uploads.py).
+    UPLOAD_SERVE_MODE = os.getenv("UPLOAD_SERVE_MODE", "sendfile")
+    UPLOAD_ACCEL_PREFIX = os.getenv("UPLOAD_ACCEL_PREFIX", "/_uploads/")
+    UPLOAD_CACHE_MAX_AGE = int(os.getenv("UPLOAD_CACHE_MAX_AGE", str(365 * 24 * 3600)))
     ALLOWED_UPLOAD_EXTENSIONS = {".png", ".jpg", ".jpeg", ".jfif", ".webp", ".gif"}
     ALLOWED_UPLOAD_MIMETYPES = {
         "image/png",
@@ -23,8 +38,88 @@ class BaseConfig:
     MAX_IMAGE_HEIGHT = int(os.getenv("MAX_IMAGE_HEIGHT", "8192"))
     RATE_LIMIT_MUTATIONS = "60 per minute"
     RATE_LIMIT_UPLOADS = "10 per minute"
+    RATE_LIMIT_UPLOAD_CHUNKS = "600 per minute"
+    RATE_LIMIT_UNFURL = "30 per minute"
+    RATE_LIMIT_HITS = "120 per minute"
     RATELIMIT_ENABLED = True
     RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "memory://")
+    METRICS_ENABLED = env_flag("METRICS_ENABLED", True)
+    # Shared directory for per-worker metric snapshots (gunicorn multi-process).
+    METRICS_DIR = os.getenv("METRICS_DIR") or None
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+    # Enables /admin endpoints and the per-request profiling header when set.
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+    PROFILING_ENABLED = env_flag("PROFILING_ENABLED", False)
+    PROFILING_THRESHOLD_MS = float(os.getenv("PROFILING_THRESHOLD_MS", "250"))
+    PROFILING_DIR = Path(os.getenv("PROFILING_DIR", str(BASE_DIR / "storage" / "profiles")))
+    PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "50"))
+    # ASGI serving mode (asgi.py): thread pool for Flask requests and SSE tuning.
+    ASGI_THREADS = int(os.getenv("ASGI_THREADS", "8"))
+    ASGI_EVENTS_POLL_INTERVAL = float(os.getenv("ASGI_EVENTS_POLL_INTERVAL", "2.0"))
+    ASGI_EVENTS_HEARTBEAT = float(os.getenv("ASGI_EVENTS_HEARTBEAT", "15.0"))
+    # Batch BoardRepository mutations on one writer thread and commit them together.
+    GROUP_COMMIT_ENABLED = env_flag("GROUP_COMMIT_ENABLED", False)
+    GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "5"))
+    GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
+    # Deleted columns are hidden at once; their cards are deleted in chunks in the background.
+    COLUMN_PURGE_CHUNK = int(os.getenv("COLUMN_PURGE_CHUNK", "500"))
+    COLUMN_PURGE_PAUSE_MS = float(os.getenv("COLUMN_PURGE_PAUSE_MS", "10"))
+    # Card click beacons are counted in memory and added to card_hits in batches (app/hits.py).
+    HITS_FLUSH_INTERVAL = float(os.getenv("HITS_FLUSH_INTERVAL", "5"))
+    HITS_HALF_LIFE_DAYS = float(os.getenv("HITS_HALF_LIFE_DAYS", "14"))
+    HITS_MAX_PENDING = int(os.getenv("HITS_MAX_PENDING", "100000"))
+    # Link previews (app/unfurl.py): fetched server-side, cached in a shared SQLite file.
+    UNFURL_ENABLED = env_flag("UNFURL_ENABLED", False)
+    UNFURL_CACHE_PATH = Path(
+        os.getenv("UNFURL_CACHE_PATH", str(BASE_DIR / "storage" / "unfurl-cache.db"))
+    )
+    UNFURL_TTL = float(os.getenv("UNFURL_TTL", str(7 * 86400)))
+    UNFURL_ERROR_TTL = float(os.getenv("UNFURL_ERROR_TTL", "600"))
+    UNFURL_CACHE_MAX_ENTRIES = int(os.getenv("UNFURL_CACHE_MAX_ENTRIES", "20000"))
+    UNFURL_TIMEOUT = float(os.getenv("UNFURL_TIMEOUT", "5"))
+    UNFURL_MAX_BYTES = int(os.getenv("UNFURL_MAX_BYTES", str(512 * 1024)))
+    UNFURL_CONCURRENCY = int(os.getenv("UNFURL_CONCURRENCY", "8"))
+    # Let previews reach loopback/private addresses (off: the server would be an SSRF proxy).
+    UNFURL_ALLOW_PRIVATE = env_flag("UNFURL_ALLOW_PRIVATE", False)
+    # Durable job queue (app/jobs.py): worker threads per app process, 0 = `flask jobs work` only.
+    JOBS_DB_PATH = Path(os.getenv("JOBS_DB_PATH", str(BASE_DIR / "storage" / "jobs.db")))
+    JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "2"))
+    JOBS_LEASE = float(os.getenv("JOBS_LEASE", "300"))
+    JOBS_BACKOFF_BASE = float(os.getenv("JOBS_BACKOFF_BASE", "5"))
+    JOBS_BACKOFF_MAX = float(os.getenv("JOBS_BACKOFF_MAX", "3600"))
+    # Cross-worker cache of serialized /api/state and /api/settings (app/cache.py).
+    PAYLOAD_CACHE_ENABLED = env_flag("PAYLOAD_CACHE_ENABLED", True)
+    PAYLOAD_CACHE_DIR = Path(os.getenv("PAYLOAD_CACHE_DIR", str(BASE_DIR / "storage" / "cache")))
+    PAYLOAD_CACHE_SERVE_STALE = env_flag("PAYLOAD_CACHE_SERVE_STALE", False)
+    # Multi-board hosting: one SQLite file per board under /b/<slug>/ (app/shards.py).
+    BOARDS_ENABLED = env_flag("BOARDS_ENABLED", False)
+    BOARDS_DIR = Path(os.getenv("BOARDS_DIR", str(BASE_DIR / "storage" / "boards")))
+    BOARDS_MAX_OPEN = int(os.getenv("BOARDS_MAX_OPEN", "64"))
+    BOARDS_POOL_SIZE = int(os.getenv("BOARDS_POOL_SIZE", "2"))
+    # Online backups (app/backup.py): BACKUP_INTERVAL seconds between scheduled runs, 0 = off.
+    BACKUP_DIR = Path(os.getenv("BACKUP_DIR", str(BASE_DIR / "storage" / "backups")))
+    BACKUP_INTERVAL = float(os.getenv("BACKUP_INTERVAL", "0"))
+    BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+    BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+    BACKUP_STEP_SLEEP_MS = float(os.getenv("BACKUP_STEP_SLEEP_MS", "5"))
+    BACKUP_MAX_RESTARTS = int(os.getenv("BACKUP_MAX_RESTARTS", "20"))
+    # Database upkeep (app/maintenance.py): a db_maintenance job every MAINTENANCE_INTERVAL
+    # seconds, 0 = only `flask maintenance run`.
+    MAINTENANCE_INTERVAL = float(os.getenv("MAINTENANCE_INTERVAL", "0"))
+    MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv("MAINTENANCE_ANALYSIS_LIMIT", "1000"))
+    MAINTENANCE_VACUUM_PAGES = int(os.getenv("MAINTENANCE_VACUUM_PAGES", "256"))
+    MAINTENANCE_STEP_SLEEP_MS = float(os.getenv("MAINTENANCE_STEP_SLEEP_MS", "20"))
+    # Read replicas (app/replication.py): "primary" publishes snapshots, "follower" applies them.
+    REPLICATION_ROLE = os.getenv("REPLICATION_ROLE") or None
+    REPLICATION_DIR = Path(os.getenv("REPLICATION_DIR", str(BASE_DIR / "storage" / "replication")))
+    REPLICATION_INTERVAL = float(os.getenv("REPLICATION_INTERVAL", "1.0"))
+    REPLICATION_MAX_LAG = float(os.getenv("REPLICATION_MAX_LAG", "10"))
+    REPLICATION_PRIMARY_URL = os.getenv("REPLICATION_PRIMARY_URL") or None
+    REPLICATION_FORWARD_TIMEOUT = float(os.getenv("REPLICATION_FORWARD_TIMEOUT", "10"))
+    # Shared by primary and followers; with it the primary rate-limits forwarded
+    # mutations by the follower's client address instead of the follower's.
+    REPLICATION_FORWARD_TOKEN = os.getenv("REPLICATION_FORWARD_TOKEN") or None
     JSON_SORT_KEYS = False
     DEBUG = False
     TESTING = False
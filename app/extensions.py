@@ -1,6 +1,148 @@
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from __future__ import annotations
+
+import hmac
+import os
+import threading
+from collections.abc import Callable
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+
+
+class RoutedSession(Session):
+    """Session that follows ``g.db_engine`` when a request targets a board shard."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            engine = g.get("db_engine")
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutedSession})
+
+
+class ProcessThreads:
+    """Daemon threads running ``target``, started once per process.
+
+    Threads do not survive fork (gunicorn preload_app), so ``start`` starts
+    them again in a new process, and also replaces them when one died.
+    ``on_start`` runs under the lock right before they start.
+    """
+
+    def __init__(
+        self,
+        target: Callable,
+        name: str,
+        count: int = 1,
+        on_start: Callable[[], None] | None = None,
+    ):
+        self.target = target
+        self.name = name
+        self.count = count
+        self.on_start = on_start
+        self._threads: list[threading.Thread] = []
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def start(self, *args) -> None:
+        if self._running():
+            return
+        with self._lock:
+            if self._running():
+                return
+            if self.on_start is not None:
+                self.on_start()
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(
+                    target=self.target,
+                    args=args,
+                    name=self.name if self.count == 1 else f"{self.name}-{i}",
+                    daemon=True,
+                )
+                for i in range(self.count)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _running(self) -> bool:
+        return self._pid == os.getpid() and all(thread.is_alive() for thread in self._threads)
+
+
+FORWARD_TOKEN_HEADER = "X-Replication-Token"
+
+
+def client_address() -> str:
+    """Address of the client, or of the follower's client for a forwarded mutation.
+
+    ``X-Forwarded-For`` is only trusted with a valid ``REPLICATION_FORWARD_TOKEN``;
+    anyone could send the header otherwise.
+    """
+    token = current_app.config.get("REPLICATION_FORWARD_TOKEN")
+    forwarded = request.headers.get("X-Forwarded-For")
+    supplied = request.headers.get(FORWARD_TOKEN_HEADER, "")
+    if token and forwarded and hmac.compare_digest(supplied, token):
+        return forwarded.rsplit(",", 1)[-1].strip()
+    return request.remote_addr or "127.0.0.1"
+
+
+def rate_limit_key() -> str:
+    """Client address, scoped per board so one team cannot exhaust another's limits."""
+    address = client_address()
+    slug = g.get("board_slug")
+    return f"{slug}:{address}" if slug else address
+
+
+class LazyLimiter:
+    """Flask-Limiter facade that imports the library only when it is enabled.
+
+    ``limit()`` decorations are recorded at import time; the real ``Limiter``
+    is built and applied to them on the first ``init_app`` of an app with
+    ``RATELIMIT_ENABLED``. Until then decorated views call straight through,
+    so apps with rate limiting disabled never pay for the import.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._limiter = None
+        self._pending: list[tuple] = []
+        self._limited: dict = {}
+
+    def limit(self, limit_value, **kwargs):
+        def decorator(view):
+            self._pending.append((view, limit_value, kwargs))
+            if self._limiter is not None:
+                self._apply_pending()
+
+            @wraps(view)
+            def wrapper(*args, **kw):
+                if not current_app.config.get("RATELIMIT_ENABLED", True):
+                    return view(*args, **kw)
+                return self._limited.get(view, view)(*args, **kw)
+
+            return wrapper
+
+        return decorator
+
+    def init_app(self, app) -> None:
+        if not app.config.get("RATELIMIT_ENABLED", True):
+            return
+        if self._limiter is None:
+            from flask_limiter import Limiter
+
+            self._kwargs.setdefault("key_func", rate_limit_key)
+            self._limiter = Limiter(**self._kwargs)
+        self._apply_pending()
+        self._limiter.init_app(app)
+
+    def _apply_pending(self) -> None:
+        while self._pending:
+            view, limit_value, kwargs = self._pending.pop()
+            self._limited[view] = self._limiter.limit(limit_value, **kwargs)(view)
+
 
-db = SQLAlchemy()
-limiter = Limiter(key_func=get_remote_address, default_limits=[])
+limiter = LazyLimiter(default_limits=[])
@@ -0,0 +1,166 @@
+"""Card click counts ("most opened") without a database write per click.
+
+``POST /api/card/<id>/hit`` only appends the id to an in-process deque; no lock
+is held and the database is not touched. A thread per worker drains the deque
+every ``HITS_FLUSH_INTERVAL`` seconds (and once more at exit) and adds the
+totals to ``card_hits`` in one transaction. Every worker adds to the same rows,
+so the table holds the merged counts of all of them. Each flush also bumps the
+``hits`` revision, which no payload cache is keyed by; it only tells the
+replication publisher (app/replication.py) that there is something to ship.
+
+Besides the total, each row holds a frecency ``score``: every hit is worth 1
+when it happens and half as much after each ``HITS_HALF_LIFE_DAYS``. The
+stored value is scaled so that old scores never need rewriting: a hit adds
+``2 ** ((t - era start) / half_life)``, which makes ``ORDER BY score`` the
+decayed order at any moment. After ``ERA_HALF_LIVES`` half-lives (years) a
+new era starts and older rows are rescaled once, keeping the floats in range.
+"""
+
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from collections import Counter, deque
+
+from flask import Flask, g, has_app_context
+from sqlalchemy import text
+
+from app.extensions import ProcessThreads, db
+from app.metrics import registry
+from app.shards import use_board
+
+EXTENSION_KEY = "hit_counter"
+EPOCH = 1767225600.0  # 2026-01-01T00:00:00Z
+ERA_HALF_LIVES = 256
+
+UPSERT = text(
+    "INSERT INTO card_hits (card_id, hits, score, era, last_hit) "
+    "SELECT id, :hits, :score, :era, :now FROM cards WHERE id = :card_id "
+    "ON CONFLICT (card_id) DO UPDATE SET "
+    "hits = hits + excluded.hits, score = score + excluded.score, last_hit = excluded.last_hit"
+)
+BUMP_REVISION = text(
+    "INSERT INTO revisions (name, value) VALUES ('hits', 1) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + 1"
+)
+# Rows written in an earlier era: rescale to the current one (once per era).
+RESCALE = text(
+    "UPDATE card_hits SET score = CASE WHEN era = :era - 1 THEN score * :shrink ELSE 0 END, "
+    "era = :era WHERE era < :era"
+)
+
+
+class HitCounter:
+    def __init__(self, app: Flask, interval: float, half_life: float, max_pending: int):
+        self.app = app
+        self.interval = interval
+        self.half_life = half_life
+        self.max_pending = max_pending
+        # deque.append/popleft are atomic: hit() needs no lock.
+        self._pending: deque[tuple[str | None, int]] = deque()
+        self._threads = ProcessThreads(self._run, "hit-flush", on_start=self._register_atexit)
+        self._flush_lock = threading.Lock()
+        self._eras: dict[str | None, int] = {}
+        # Counts of a failed flush, written with the next one.
+        self._retry: Counter[tuple[str | None, int]] = Counter()
+
+    def hit(self, card_id: int) -> None:
+        # Unlocked, so concurrent hits may overshoot by a few; it only bounds memory
+        # while flushes fail or never run.
+        if len(self._pending) >= self.max_pending:
+            registry.inc("dashboard_hits_dropped_total")
+            return
+        board = g.get("board_slug") if has_app_context() else None
+        self._pending.append((board, card_id))
+        if self.interval > 0:
+            self._threads.start()
+
+    def flush(self) -> int:
+        """Write pending hits now; returns how many were written."""
+        with self._flush_lock:
+            counts, self._retry = self._retry, Counter()
+            pending = self._pending
+            while True:
+                try:
+                    counts[pending.popleft()] += 1
+                except IndexError:
+                    break
+            if not counts:
+                return 0
+            started = time.perf_counter()
+            boards: dict[str | None, dict[int, int]] = {}
+            for (board, card_id), hits in counts.items():
+                boards.setdefault(board, {})[card_id] = hits
+            failed = None
+            for board, hits in boards.items():
+                try:
+                    self._write(board, hits)
+                except Exception as err:  # noqa: BLE001 - kept for the next flush
+                    self._retry.update({(board, card_id): n for card_id, n in hits.items()})
+                    failed = err
+            if failed is not None:
+                raise failed
+            registry.observe("dashboard_hits_flush_seconds", time.perf_counter() - started)
+            return sum(counts.values())
+
+    def era_and_weight(self, now: float) -> tuple[int, float]:
+        """Era of ``now`` and the score a hit at ``now`` adds."""
+        half_lives = (now - EPOCH) / self.half_life
+        era = int(half_lives // ERA_HALF_LIVES)
+        return era, 2.0 ** (half_lives - era * ERA_HALF_LIVES)
+
+    def decayed(self, score: float, era: int, now: float) -> float:
+        """Stored ``score`` as the sum of decayed hits at ``now``."""
+        half_lives = (now - EPOCH) / self.half_life
+        return score * 2.0 ** (era * ERA_HALF_LIVES - half_lives)
+
+    def _write(self, board: str | None, hits: dict[int, int]) -> None:
+        now = time.time()
+        era, weight = self.era_and_weight(now)
+        with self.app.app_context():
+            if board is not None:
+                use_board(board)
+            if self._eras.get(board) != era:
+                db.session.execute(RESCALE, {"era": era, "shrink": 2.0**-ERA_HALF_LIVES})
+                self._eras[board] = era
+            db.session.execute(
+                UPSERT,
+                [
+                    {"card_id": card_id, "hits": n, "score": n * weight, "era": era, "now": now}
+                    for card_id, n in hits.items()
+                ],
+            )
+            db.session.execute(BUMP_REVISION)
+            db.session.commit()
+
+    def _register_atexit(self) -> None:
+        # Once per process, however often the thread is restarted.
+        atexit.unregister(self._flush_quietly)
+        atexit.register(self._flush_quietly)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self._flush_quietly()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:  # noqa: BLE001 - hits are best effort; keep flushing
+            self.app.logger.exception("Flushing card hits failed")
+
+
+def get_hit_counter(app: Flask) -> HitCounter:
+    counter = app.extensions.get(EXTENSION_KEY)
+    if counter is None:
+        counter = app.extensions.setdefault(
+            EXTENSION_KEY,
+            HitCounter(
+                app,
+                interval=app.config["HITS_FLUSH_INTERVAL"],
+                half_life=app.config["HITS_HALF_LIFE_DAYS"] * 86400,
+                max_pending=app.config["HITS_MAX_PENDING"],
+            ),
+        )
+    return counter
@@ -0,0 +1,348 @@
+"""Durable background jobs in a SQLite queue (``JOBS_DB_PATH``).
+
+A request enqueues a job and returns; worker threads started in every app
+process (``JOBS_WORKERS``), or a dedicated ``flask jobs work`` process, run it.
+The queue lives in its own database file, so claiming and finishing jobs never
+waits for the board's write lock, and jobs survive restarts.
+
+Workers claim the ready job with the highest ``priority`` in one ``UPDATE ...
+RETURNING`` and hold it for ``lease`` seconds. A job whose worker died goes
+back to the queue once its lease expires, so handlers must be idempotent.
+A failing job is retried with exponential backoff until it has used
+``max_attempts``; raising ``JobError`` fails it at once. An ``idempotency
+key`` makes enqueueing the same work twice return the first job.
+
+Handlers are registered by kind with ``@handler("kind")`` and called as
+``fn(payload)`` in an app context, on the board the job was enqueued from.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+from flask import Flask, current_app, g, has_app_context
+from flask.cli import with_appcontext
+
+from app.extensions import ProcessThreads
+from app.metrics import registry
+from app.shards import use_board
+
+EXTENSION_KEY = "jobs"
+STATUSES = ("queued", "running", "done", "failed")
+# Finished jobs are kept this long for status lookups, then deleted.
+KEEP_FINISHED = 7 * 86400
+MAINTENANCE_INTERVAL = 30.0
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, board TEXT, "
+    "status TEXT NOT NULL DEFAULT 'queued', priority INTEGER NOT NULL DEFAULT 0, "
+    "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+    "run_at REAL NOT NULL, idempotency_key TEXT UNIQUE, locked_by TEXT, locked_until REAL, "
+    "result TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL)",
+    # Claiming walks this index: ready jobs by priority, oldest first.
+    "CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs (status, priority DESC, run_at)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_lease ON jobs (status, locked_until)",
+)
+CLAIM = (
+    "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = :worker, "
+    "locked_until = :now + :lease, updated = :now "
+    "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' AND run_at <= :now "
+    "ORDER BY priority DESC, run_at LIMIT 1) "
+    "RETURNING id, kind, payload, board, attempts, max_attempts"
+)
+COLUMNS = "id, kind, board, status, priority, attempts, max_attempts, run_at, result, error"
+
+HANDLERS: dict[str, tuple[Callable[[dict], object], int]] = {}
+
+
+class JobError(Exception):
+    """Raised by a handler for a failure that retrying cannot fix."""
+
+
+def handler(kind: str, max_attempts: int = 5):
+    """Register ``fn(payload) -> result`` as the handler of jobs of ``kind``."""
+
+    def register(fn):
+        HANDLERS[kind] = (fn, max_attempts)
+        return fn
+
+    return register
+
+
+class JobQueue:
+    def __init__(
+        self,
+        app: Flask,
+        path: Path,
+        workers: int,
+        poll_interval: float,
+        lease: float,
+        backoff_base: float,
+        backoff_max: float,
+    ):
+        self.app = app
+        self.path = Path(path)
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._threads = ProcessThreads(self.work, "jobs", count=workers)
+        self._maintained = 0.0
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict | None = None,
+        *,
+        priority: int = 0,
+        key: str | None = None,
+        delay: float = 0.0,
+        max_attempts: int | None = None,
+    ) -> dict:
+        """Queue a job; with ``key``, an existing job with that key is returned instead."""
+        if kind not in HANDLERS:
+            raise ValueError(f"unknown job kind {kind!r}")
+        board = g.get("board_slug") if has_app_context() else None
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "INSERT INTO jobs (kind, payload, board, priority, max_attempts, run_at, "
+            "idempotency_key, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (idempotency_key) DO NOTHING RETURNING {COLUMNS}",
+            (
+                kind,
+                json.dumps(payload or {}),
+                board,
+                priority,
+                max_attempts or HANDLERS[kind][1],
+                now + delay,
+                key,
+                now,
+                now,
+            ),
+        ).fetchone()
+        if row is None:
+            row = conn.execute(
+                f"SELECT {COLUMNS} FROM jobs WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        else:
+            registry.inc("dashboard_jobs_total", {"kind": kind, "event": "enqueued"})
+            self._wake.set()
+        return _job_dict(row)
+
+    def get(self, job_id: int) -> dict | None:
+        row = self._conn().execute(f"SELECT {COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def counts(self) -> dict[str, int]:
+        rows = self._conn().execute("SELECT status, count(*) FROM jobs GROUP BY status")
+        return {status: 0 for status in STATUSES} | dict(rows)
+
+    def run_one(self, worker: str | None = None) -> bool:
+        """Claim and run one ready job; False when none is ready."""
+        worker = worker or _worker_id()
+        now = time.time()
+        if now - self._maintained > MAINTENANCE_INTERVAL:
+            self._maintained = now
+            self.maintain()
+        conn = self._conn()
+        row = conn.execute(CLAIM, {"worker": worker, "now": now, "lease": self.lease}).fetchone()
+        if row is None:
+            return False
+        job_id, kind, payload, board, attempts, max_attempts = row
+        fn = HANDLERS.get(kind, (None,))[0]
+        started = time.perf_counter()
+        try:
+            if fn is None:
+                raise JobError(f"unknown job kind {kind!r}")
+            with self.app.app_context():
+                if board is not None:
+                    use_board(board)
+                result = fn(json.loads(payload))
+        except Exception as err:  # noqa: BLE001 - recorded on the job
+            retry = not isinstance(err, JobError) and attempts < max_attempts
+            if retry:
+                # Exponential backoff with jitter, so failed jobs do not retry in lockstep.
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+                run_at = time.time() + delay * random.uniform(0.5, 1.0)
+                event = "retried"
+            else:
+                run_at, event = None, "failed"
+                self.app.logger.warning("Job %s (%s) failed: %s", job_id, kind, err)
+            message = str(err) if isinstance(err, JobError) else f"{type(err).__name__}: {err}"
+            self._finish(job_id, worker, "queued" if retry else "failed", None, message, run_at)
+        else:
+            self._finish(job_id, worker, "done", json.dumps(result), None)
+            event = "done"
+        registry.inc("dashboard_jobs_total", {"kind": kind, "event": event})
+        registry.observe("dashboard_job_seconds", time.perf_counter() - started, {"kind": kind})
+        return True
+
+    def _finish(
+        self,
+        job_id: int,
+        worker: str,
+        status: str,
+        result: str | None,
+        error: str | None,
+        run_at: float | None = None,
+    ) -> None:
+        # Only the worker holding the lease may finish the job; after a lease
+        # expired and another worker claimed it, this update matches nothing.
+        now = time.time()
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, run_at = coalesce(?, run_at), "
+            "locked_by = NULL, locked_until = NULL, updated = ? WHERE id = ? AND locked_by = ?",
+            (status, result, error, run_at, now, job_id, worker),
+        )
+
+    def run_pending(self) -> int:
+        """Run ready jobs until none is left; returns how many ran."""
+        ran = 0
+        while self.run_one():
+            ran += 1
+        return ran
+
+    def maintain(self) -> None:
+        """Requeue jobs whose lease expired (their worker died) and drop old finished jobs.
+
+        A job that has used all its attempts fails instead, so a job that kills
+        its worker (e.g. out of memory) is not retried forever.
+        """
+        now = time.time()
+        conn = self._conn()
+        failed = conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'worker died (lease expired)', "
+            "locked_by = NULL, locked_until = NULL, updated = ? "
+            "WHERE status = 'running' AND locked_until < ? AND attempts >= max_attempts "
+            "RETURNING id, kind",
+            (now, now),
+        ).fetchall()
+        for job_id, kind in failed:
+            self.app.logger.warning("Job %s (%s) failed: worker died", job_id, kind)
+            registry.inc("dashboard_jobs_total", {"kind": kind, "event": "failed"})
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', locked_by = NULL, locked_until = NULL, "
+            "updated = ? WHERE status = 'running' AND locked_until < ?",
+            (now, now),
+        )
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?",
+            (now - KEEP_FINISHED,),
+        )
+
+    def start(self) -> None:
+        """Start ``workers`` threads in this process (once per process)."""
+        self._threads.start()
+
+    def work(self, stop: threading.Event | None = None) -> None:
+        """Run jobs until ``stop`` is set; waits up to ``poll_interval`` when idle."""
+        worker = _worker_id()
+        while stop is None or not stop.is_set():
+            try:
+                if self.run_one(worker):
+                    continue
+            except sqlite3.Error:
+                self.app.logger.exception("Job queue unavailable")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One autocommit connection per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            self._local.conn = conn
+        return conn
+
+
+def _job_dict(row) -> dict:
+    job_id, kind, board, status, priority, attempts, max_attempts, run_at, result, error = row
+    return {
+        "id": job_id,
+        "kind": kind,
+        "board": board,
+        "status": status,
+        "priority": priority,
+        "attempts": attempts,
+        "max_attempts": max_attempts,
+        "run_at": run_at,
+        "result": json.loads(result) if result is not None else None,
+        "error": error,
+    }
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def get_jobs(app: Flask) -> JobQueue:
+    queue = app.extensions.get(EXTENSION_KEY)
+    if queue is None:
+        queue = app.extensions.setdefault(
+            EXTENSION_KEY,
+            JobQueue(
+                app,
+                app.config["JOBS_DB_PATH"],
+                workers=app.config["JOBS_WORKERS"],
+                poll_interval=app.config["JOBS_POLL_INTERVAL"],
+                lease=app.config["JOBS_LEASE"],
+                backoff_base=app.config["JOBS_BACKOFF_BASE"],
+                backoff_max=app.config["JOBS_BACKOFF_MAX"],
+            ),
+        )
+    return queue
+
+
+def register_jobs(app: Flask) -> None:
+    app.cli.add_command(jobs_cli)
+    if app.config["JOBS_WORKERS"] > 0:
+
+        @app.before_request
+        def ensure_job_workers():
+            get_jobs(app).start()
+
+
+@click.group("jobs")
+def jobs_cli():
+    """Background job queue (JOBS_DB_PATH)."""
+
+
+@jobs_cli.command("work")
+@click.option("--once", is_flag=True, help="Run the ready jobs, then exit.")
+@with_appcontext
+def jobs_work_command(once):
+    """Run jobs in this process (alongside or instead of JOBS_WORKERS threads)."""
+    queue = get_jobs(current_app._get_current_object())
+    if once:
+        click.echo(f"ran {queue.run_pending()} job(s)")
+        return
+    try:
+        queue.work()
+    except KeyboardInterrupt:
+        pass
+
+
+@jobs_cli.command("status")
+@with_appcontext
+def jobs_status_command():
+    """Number of jobs per status."""
+    for status, count in get_jobs(current_app._get_current_object()).counts().items():
+        click.echo(f"{status}\t{count}")
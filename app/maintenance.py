@@ -0,0 +1,306 @@
+"""Database upkeep: statistics, incremental vacuum, WAL checkpoints and plan checks.
+
+``flask maintenance run`` (or a ``db_maintenance`` job every
+``MAINTENANCE_INTERVAL`` seconds) does, for the default database and every
+board, only work that leaves writers running:
+
+- ``ANALYZE`` the first time, then ``PRAGMA optimize``, both bounded by
+  ``analysis_limit`` rows per index, so the planner has statistics.
+- ``PRAGMA incremental_vacuum`` in steps of ``vacuum_pages`` pages with a
+  pause between steps, returning free pages left by deletes and reorders.
+  Databases created before incremental vacuuming was enabled need a one-off
+  full ``VACUUM`` (``--convert``), which blocks writers while it runs.
+- A ``PASSIVE`` WAL checkpoint, which never waits for readers or writers.
+
+``flask maintenance report`` shows table, index, free-list and WAL sizes and
+whether the critical ``BoardRepository`` queries still use their indexes
+(``EXPLAIN QUERY PLAN``).
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import time
+from collections.abc import Callable
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from sqlalchemy import literal, select
+from sqlalchemy.dialects import sqlite
+
+from app.backup import database_path
+from app.jobs import get_jobs, handler
+from app.metrics import registry
+from app.models import Card
+from app.repositories import board
+from app.shards import get_shards
+
+INDEX_RE = re.compile(r"\bINDEX (\w+)")
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    name: str
+    query: Callable
+    index: str
+    # The ORDER BY must come from walking the index, not from sorting all rows.
+    no_sort: bool = False
+
+
+PLAN_CHECKS = (
+    PlanCheck(
+        "column cards",
+        lambda: select(Card).where(Card.column_id == 1).order_by(Card.position),
+        "idx_cards_column_position",
+        no_sort=True,
+    ),
+    PlanCheck(
+        "next card position",
+        lambda: select(board._next_card_position(literal(1))),
+        "idx_cards_column_position",
+    ),
+    PlanCheck(
+        "duplicate link lookup",
+        lambda: board._canonical_link_query("https://example.com"),
+        "ix_cards_canonical_link",
+    ),
+    PlanCheck("duplicates report", board._duplicates_query, "ix_cards_canonical_link"),
+    PlanCheck(
+        "frequent cards",
+        lambda: board._frequent_cards_query(20),
+        "ix_card_hits_era_score",
+        no_sort=True,
+    ),
+    PlanCheck(
+        "cards by tags", lambda: board._tagged_cards_query([1, 2], True), "ix_card_tags_tag_card"
+    ),
+    PlanCheck("column purge", lambda: board._purge_chunk_query(1, 500), "ix_cards_column_id"),
+)
+
+
+def databases(app: Flask) -> dict[str, Path]:
+    """Database files to maintain: ``default`` plus one per board."""
+    paths = {"default": database_path(app.config["SQLALCHEMY_DATABASE_URI"])}
+    shards = get_shards(app)
+    if shards is not None:
+        for slug in shards.slugs():
+            paths[f"boards/{slug}"] = shards.path(slug)
+    return paths
+
+
+def check_plans(conn: sqlite3.Connection) -> list[dict]:
+    """``EXPLAIN QUERY PLAN`` of each ``PLAN_CHECKS`` query, and whether it is as intended."""
+    results = []
+    for check in PLAN_CHECKS:
+        sql = str(
+            check.query().compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+        )
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        used = [match for line in plan for match in INDEX_RE.findall(line)]
+        sorted_rows = check.no_sort and any("TEMP B-TREE" in line for line in plan)
+        results.append(
+            {
+                "name": check.name,
+                "ok": check.index in used and not sorted_rows,
+                "index": check.index,
+                "plan": plan,
+            }
+        )
+    return results
+
+
+def report(path: Path) -> dict:
+    """Sizes, settings and plan checks of one database file."""
+    with closing(_connect(path)) as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        objects = dict(conn.execute("SELECT name, type FROM sqlite_master"))
+        tables: dict[str, int] = {}
+        indexes: dict[str, int] = {}
+        try:
+            for name, size in conn.execute("SELECT name, sum(pgsize) FROM dbstat GROUP BY name"):
+                (indexes if objects.get(name) == "index" else tables)[name] = size
+        except sqlite3.OperationalError:
+            pass  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+        wal = path.with_name(f"{path.name}-wal")
+        return {
+            "path": str(path),
+            "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+            "auto_vacuum": AUTO_VACUUM_MODES[conn.execute("PRAGMA auto_vacuum").fetchone()[0]],
+            "analyzed": "sqlite_stat1" in objects,
+            "bytes": page_size * pages,
+            "free_bytes": page_size * free_pages,
+            "wal_bytes": wal.stat().st_size if wal.exists() else 0,
+            "tables": dict(sorted(tables.items(), key=lambda item: -item[1])),
+            "indexes": dict(sorted(indexes.items(), key=lambda item: -item[1])),
+            "plans": check_plans(conn),
+        }
+
+
+def maintain(
+    path: Path,
+    *,
+    analysis_limit: int,
+    vacuum_pages: int,
+    step_sleep: float,
+    analyze: bool = False,
+    convert: bool = False,
+) -> dict:
+    """Run the upkeep steps on one database file; returns what was done."""
+    started = time.perf_counter()
+    with closing(_connect(path)) as conn:
+        result: dict = {"converted": False}
+        if convert and conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # Rewrites the whole file: writers wait until it is done.
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            result["converted"] = True
+
+        # Preparing the checked queries tells PRAGMA optimize which tables they use.
+        check_plans(conn)
+        conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone()
+        if analyze or not has_stats:
+            conn.execute("ANALYZE")
+        else:
+            conn.execute("PRAGMA optimize")
+        result["analyzed"] = bool(analyze or not has_stats)
+        # New statistics can change plans, so check them afterwards.
+        plans = check_plans(conn)
+
+        # One short write transaction per step, so writers get through in between.
+        vacuumed = 0
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            while free := conn.execute("PRAGMA freelist_count").fetchone()[0]:
+                conn.execute(f"PRAGMA incremental_vacuum({min(free, vacuum_pages)})").fetchall()
+                vacuumed += min(free, vacuum_pages)
+                if free <= vacuum_pages:
+                    break
+                time.sleep(step_sleep)
+        result["vacuumed_pages"] = vacuumed
+
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            busy, log, done = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+            result["checkpoint"] = {"busy": bool(busy), "log_pages": log, "checkpointed": done}
+        result["plans_ok"] = all(check["ok"] for check in plans)
+        result["slow_plans"] = [check["name"] for check in plans if not check["ok"]]
+    registry.observe("dashboard_db_maintenance_seconds", time.perf_counter() - started)
+    return result
+
+
+def maintain_all(app: Flask, analyze: bool = False, convert: bool = False) -> dict[str, dict]:
+    results = {}
+    for name, path in databases(app).items():
+        results[name] = maintain(
+            path,
+            analysis_limit=app.config["MAINTENANCE_ANALYSIS_LIMIT"],
+            vacuum_pages=app.config["MAINTENANCE_VACUUM_PAGES"],
+            step_sleep=app.config["MAINTENANCE_STEP_SLEEP_MS"] / 1000,
+            analyze=analyze,
+            convert=convert,
+        )
+        if results[name]["slow_plans"]:
+            app.logger.warning(
+                "Queries not using their index in %s: %s",
+                name,
+                ", ".join(results[name]["slow_plans"]),
+            )
+    return results
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    if not path.is_file():
+        raise FileNotFoundError(f"database not found: {path}")
+    # Autocommit: every statement is its own short transaction.
+    return sqlite3.connect(path, timeout=30, isolation_level=None)
+
+
+@handler("db_maintenance", max_attempts=3)
+def _maintenance_job(payload: dict) -> dict:
+    return maintain_all(current_app._get_current_object())
+
+
+def register_maintenance(app: Flask) -> None:
+    app.cli.add_command(maintenance_cli)
+    interval = app.config["MAINTENANCE_INTERVAL"]
+    if interval > 0:
+        next_slot = 0.0
+
+        @app.before_request
+        def schedule_maintenance():
+            # One job per interval across all workers: the slot is its idempotency key.
+            nonlocal next_slot
+            now = time.time()
+            if now < next_slot:
+                return
+            slot = int(now // interval)
+            next_slot = (slot + 1) * interval
+            get_jobs(app).enqueue("db_maintenance", priority=-20, key=f"maintenance:{slot}")
+
+
+@click.group("maintenance")
+def maintenance_cli():
+    """Database upkeep for the default database and every board."""
+
+
+@maintenance_cli.command("run")
+@click.option("--analyze", is_flag=True, help="Rebuild all statistics with ANALYZE.")
+@click.option(
+    "--convert",
+    is_flag=True,
+    help="Enable incremental vacuum on older files with a full VACUUM (blocks writers).",
+)
+@with_appcontext
+def maintenance_run_command(analyze, convert):
+    """Update statistics, vacuum free pages and checkpoint the WAL."""
+    try:
+        results = maintain_all(current_app._get_current_object(), analyze, convert)
+    except (OSError, sqlite3.Error) as err:
+        raise click.ClickException(str(err)) from None
+    for name, result in results.items():
+        line = f"{name}: {result['vacuumed_pages']} page(s) vacuumed"
+        if result["analyzed"]:
+            line += ", analyzed"
+        if result["converted"]:
+            line += ", converted to incremental vacuum"
+        if "checkpoint" in result:
+            checkpoint = result["checkpoint"]
+            line += f", WAL {checkpoint['checkpointed']}/{checkpoint['log_pages']} checkpointed"
+        if result["slow_plans"]:
+            line += f", NOT USING INDEXES: {', '.join(result['slow_plans'])}"
+        click.echo(line)
+
+
+@maintenance_cli.command("report")
+@click.option("--plans", is_flag=True, help="Print every query plan.")
+@with_appcontext
+def maintenance_report_command(plans):
+    """Sizes of tables, indexes and the WAL, and query plan checks."""
+    for name, path in databases(current_app._get_current_object()).items():
+        try:
+            info = report(path)
+        except (OSError, sqlite3.Error) as err:
+            raise click.ClickException(str(err)) from None
+        click.echo(
+            f"{name}: {info['bytes']} bytes, {info['free_bytes']} free, WAL {info['wal_bytes']}, "
+            f"journal {info['journal_mode']}, auto_vacuum {info['auto_vacuum']}, "
+            f"{'analyzed' if info['analyzed'] else 'no statistics'}"
+        )
+        for kind, sizes in (("table", info["tables"]), ("index", info["indexes"])):
+            for object_name, size in sizes.items():
+                click.echo(f"  {kind}\t{object_name}\t{size}")
+        for check in info["plans"]:
+            status = "ok" if check["ok"] else f"not using {check['index']}"
+            click.echo(f"  plan\t{check['name']}\t{status}")
+            if plans or not check["ok"]:
+                for line in check["plan"]:
+                    click.echo(f"    {line}")
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HELP = {
+    "dashboard_http_requests_total": "HTTP requests by endpoint, method and status.",
+    "dashboard_http_request_duration_seconds": "HTTP request latency by endpoint.",
+    "dashboard_sql_queries_per_request": "SQL statements executed per request.",
+    "dashboard_sql_duration_seconds": "Time spent in SQL statements per request.",
+    "dashboard_db_commit_duration_seconds": "Session commit duration (flush + fsync).",
+    "dashboard_upload_processing_seconds": "Background upload processing time by stage.",
+    "dashboard_cache_requests_total": "Cache lookups by cache name and result.",
+    "dashboard_backup_seconds": "Duration of online database backups.",
+    "dashboard_hits_flush_seconds": "Duration of card hit flushes to the database.",
+    "dashboard_hits_dropped_total": "Card hits dropped because the buffer was full.",
+    "dashboard_unfurl_seconds": "Time to fetch and parse a page for a link preview.",
+    "dashboard_job_seconds": "Background job run time by kind.",
+    "dashboard_jobs_total": "Background jobs by kind and event.",
+    "dashboard_db_maintenance_seconds": "Duration of database maintenance runs per file.",
+}
+
+
+def _key(name: str, labels: dict | None) -> tuple:
+    return name, tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    """Process-local counters and histograms with Prometheus text rendering.
+
+    Each gunicorn worker owns one registry. When ``METRICS_DIR`` is set the
+    registry periodically writes a JSON snapshot there, and ``/metrics`` sums
+    the snapshots of every worker so scrapes see the whole process group.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = {}
+        self._histograms: dict[tuple, dict] = {}
+        self._last_flush = 0.0
+
+    def inc(self, name: str, labels: dict | None = None, value: float = 1.0) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: dict | None = None,
+        buckets: tuple = DEFAULT_BUCKETS,
+    ) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+                self._histograms[key] = hist
+            for idx, bound in enumerate(hist["buckets"]):
+                if value <= bound:
+                    hist["counts"][idx] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "buckets": list(hist["buckets"]),
+                        "counts": list(hist["counts"]),
+                        "sum": hist["sum"],
+                        "count": hist["count"],
+                    }
+                    for (name, labels), hist in self._histograms.items()
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def flush(self, directory: Path, min_interval: float = 0.0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if min_interval and now - self._last_flush < min_interval:
+                return
+            self._last_flush = now
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"worker_{os.getpid()}.json"
+        # Per thread: concurrent flushes (threaded servers, /metrics) must not share it.
+        tmp = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(tmp, target)
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    counters: dict[tuple, float] = {}
+    histograms: dict[tuple, dict] = {}
+    for snap in snapshots:
+        for item in snap.get("counters", []):
+            key = _key(item["name"], item["labels"])
+            counters[key] = counters.get(key, 0.0) + item["value"]
+        for item in snap.get("histograms", []):
+            key = _key(item["name"], item["labels"])
+            merged = histograms.setdefault(
+                key,
+                {
+                    "buckets": item["buckets"],
+                    "counts": [0] * len(item["buckets"]),
+                    "sum": 0.0,
+                    "count": 0,
+                },
+            )
+            merged["counts"] = [
+                a + b for a, b in zip(merged["counts"], item["counts"], strict=True)
+            ]
+            merged["sum"] += item["sum"]
+            merged["count"] += item["count"]
+    return {"counters": counters, "histograms": histograms}
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(merged: dict) -> str:
+    lines: list[str] = []
+    seen: set[str] = set()
+
+    def header(name: str, kind: str) -> None:
+        if name in seen:
+            return
+        seen.add(name)
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in sorted(merged["counters"].items()):
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+
+    for (name, labels), hist in sorted(merged["histograms"].items()):
+        header(name, "histogram")
+        for bound, count in zip(hist["buckets"], hist["counts"], strict=True):
+            le = (("le", _format_number(bound)),)
+            lines.append(f"{name}_bucket{_format_labels(labels, le)} {count}")
+        inf = (("le", "+Inf"),)
+        lines.append(f"{name}_bucket{_format_labels(labels, inf)} {hist['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(hist['sum'])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def collect(app: Flask) -> str:
+    metrics_dir = app.config.get("METRICS_DIR")
+    if not metrics_dir:
+        snapshot = registry.snapshot()
+        return render_prometheus(merge_snapshots([snapshot]))
+
+    directory = Path(metrics_dir)
+    registry.flush(directory)
+    snapshots = []
+    for path in sorted(directory.glob("worker_*.json")):
+        try:
+            snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return render_prometheus(merge_snapshots(snapshots))
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """Accumulate a named duration for the current request's Server-Timing header."""
+    if not has_request_context():
+        return
+    timings = g.setdefault("server_timing", {})
+    timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name: str, labels: dict | None = None, timing: str | None = None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe(name, elapsed, labels)
+        if timing:
+            add_timing(timing, elapsed)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    registry.inc(
+        "dashboard_cache_requests_total", {"cache": cache, "result": "hit" if hit else "miss"}
+    )
+
+
+def _server_timing_header(total: float) -> str:
+    parts = [f"app;dur={total * 1000:.2f}"]
+    sql_count = g.get("sql_count", 0)
+    sql_time = g.get("sql_time", 0.0)
+    parts.append(f'db;dur={sql_time * 1000:.2f};desc="{sql_count} queries"')
+    for name, seconds in g.get("server_timing", {}).items():
+        parts.append(f"{name};dur={seconds * 1000:.2f}")
+    return ", ".join(parts)
+
+
+@event.listens_for(db.session, "before_commit")
+def _before_commit(session):
+    session.info["commit_start"] = time.perf_counter()
+
+
+@event.listens_for(db.session, "after_commit")
+def _after_commit(session):
+    start = session.info.pop("commit_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    registry.observe("dashboard_db_commit_duration_seconds", elapsed)
+    add_timing("commit", elapsed)
+
+
+def instrument_engine(engine) -> None:
+    """Count statements and SQL time per request on ``engine``."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("query_start")
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        if has_request_context():
+            g.sql_count = g.get("sql_count", 0) + 1
+            g.sql_time = g.get("sql_time", 0.0) + elapsed
+
+
+def register_metrics(app: Flask) -> None:
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    with app.app_context():
+        instrument_engine(db.engine)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get("request_start")
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        endpoint = request.endpoint or "unmatched"
+        if endpoint != "metrics.metrics":
+            labels = {"endpoint": endpoint, "method": request.method}
+            registry.observe("dashboard_http_request_duration_seconds", total, labels)
+            registry.inc(
+                "dashboard_http_requests_total",
+                {**labels, "status": str(response.status_code)},
+            )
+            registry.observe(
+                "dashboard_sql_queries_per_request",
+                g.get("sql_count", 0),
+                {"endpoint": endpoint},
+                buckets=COUNT_BUCKETS,
+            )
+            registry.observe(
+                "dashboard_sql_duration_seconds", g.get("sql_time", 0.0), {"endpoint": endpoint}
+            )
+        response.headers["Server-Timing"] = _server_timing_header(total)
+
+        metrics_dir = app.config.get("METRICS_DIR")
+        if metrics_dir:
+            registry.flush(Path(metrics_dir), app.config["METRICS_FLUSH_INTERVAL"])
+        return response
@@ -9,6 +9,8 @@ class Column(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     position = db.Column(db.Integer, nullable=False, default=0)
+    # Tombstone: hidden at once, rows purged in chunks by app/repositories/purge.py.
+    deleted = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     cards = db.relationship(
         "Card",
         back_populates="column",
@@ -26,6 +28,8 @@ class Column(db.Model):
 
 class Card(db.Model):
     __tablename__ = "cards"
+    # Covers duplicate lookups and the duplicates report, live-column filter included.
+    __table_args__ = (db.Index("ix_cards_canonical_link", "canonical_link", "column_id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     column_id = db.Column(
@@ -36,6 +40,8 @@ class Card(db.Model):
     )
     title = db.Column(db.String(200), nullable=False)
     link = db.Column(db.String(2048), nullable=False, default="")
+    # ``app.urls.canonical_url(link)``, kept in step by BoardRepository writes.
+    canonical_link = db.Column(db.String(2048), nullable=False, default="", server_default="")
     description = db.Column(db.String(2000), nullable=False, default="")
     icon = db.Column(db.String(2048), nullable=False, default="")
     position = db.Column(db.Integer, nullable=False, default=0, index=True)
@@ -54,6 +60,42 @@ class Card(db.Model):
         }
 
 
+class Tag(db.Model):
+    """A card label; ``card_count`` is kept current by triggers (migration 20261019_0006)."""
+
+    __tablename__ = "tags"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False, unique=True)
+    card_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "count": self.card_count}
+
+
+class CardTag(db.Model):
+    __tablename__ = "card_tags"
+    # The primary key serves "tags of a card", this index "cards with a tag".
+    __table_args__ = (db.Index("ix_card_tags_tag_card", "tag_id", "card_id"),)
+
+    card_id = db.Column(db.Integer, db.ForeignKey("cards.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+
+
+class CardHit(db.Model):
+    """Merged click counts of a card, written in batches by ``app.hits.HitCounter``."""
+
+    __tablename__ = "card_hits"
+    __table_args__ = (db.Index("ix_card_hits_era_score", "era", "score"),)
+
+    card_id = db.Column(db.Integer, db.ForeignKey("cards.id", ondelete="CASCADE"), primary_key=True)
+    hits = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Frecency, scaled per era (see app/hits.py); comparable within an era.
+    score = db.Column(db.Float, nullable=False, default=0.0, server_default="0")
+    era = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    last_hit = db.Column(db.Float, nullable=True)
+
+
 class Settings(db.Model):
     __tablename__ = "settings"
     __table_args__ = (db.CheckConstraint("id = 1", name="ck_settings_singleton"),)
@@ -81,3 +123,17 @@ class Settings(db.Model):
             "card_bg_color": self.card_bg_color,
             "card_bg_opacity": self.card_bg_opacity,
         }
+
+
+class Revision(db.Model):
+    """Monotonic change counters maintained by SQLite triggers.
+
+    ``board`` is bumped by every write to ``columns``/``cards`` and
+    ``settings`` by writes to ``settings`` (see migration 20261019_0003).
+    ``hits`` is bumped by every flush of card hits (app/hits.py).
+    """
+
+    __tablename__ = "revisions"
+
+    name = db.Column(db.String(32), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
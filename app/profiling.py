@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import json
+import pstats
+import secrets
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+PROFILE_HEADER = "X-Profile-Request"
+
+
+def profile_dir(app: Flask) -> Path:
+    return Path(app.config["PROFILING_DIR"])
+
+
+def list_profiles(app: Flask) -> list[dict]:
+    directory = profile_dir(app)
+    if not directory.is_dir():
+        return []
+    items = []
+    for meta_path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        meta.pop("sql", None)
+        meta.pop("summary", None)
+        items.append(meta)
+    return items
+
+
+def _requested_by_header(app: Flask) -> bool:
+    token = app.config.get("ADMIN_TOKEN")
+    supplied = request.headers.get(PROFILE_HEADER)
+    if not token or not supplied:
+        return False
+    return hmac.compare_digest(supplied, token)
+
+
+def _summary(profiler: cProfile.Profile, limit: int = 40) -> str:
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def _trim(directory: Path, keep: int) -> None:
+    profiles = sorted(directory.glob("*.prof"))
+    for stale in profiles[: max(len(profiles) - keep, 0)]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".json").unlink(missing_ok=True)
+
+
+def _save_profile(app: Flask, profiler: cProfile.Profile, response, elapsed: float) -> str:
+    directory = profile_dir(app)
+    directory.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(UTC)
+    name = f"{now.strftime('%Y%m%dT%H%M%S%f')}_{secrets.token_hex(4)}"
+    profiler.dump_stats(directory / f"{name}.prof")
+    meta = {
+        "name": name,
+        "created_at": now.isoformat(),
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round(elapsed * 1000, 2),
+        "sql": g.get("profile_sql", []),
+        "summary": _summary(profiler),
+    }
+    meta_path = directory / f"{name}.json"
+    tmp = meta_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    tmp.replace(meta_path)
+    _trim(directory, app.config["PROFILING_MAX_FILES"])
+    return name
+
+
+def register_profiling(app: Flask) -> None:
+    if not app.config.get("PROFILING_ENABLED") and not app.config.get("ADMIN_TOKEN"):
+        return
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture_sql(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and g.get("profiler") is not None:
+            g.profile_sql.append(statement)
+
+    @app.before_request
+    def start_profiler():
+        forced = _requested_by_header(app)
+        if not forced and not app.config.get("PROFILING_ENABLED"):
+            return
+        if request.endpoint and request.endpoint.startswith("admin."):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another thread is already being profiled; skip this request.
+            return
+        g.profiler = profiler
+        g.profile_forced = forced
+        g.profile_sql = []
+        g.profile_start = time.perf_counter()
+
+    @app.after_request
+    def stop_profiler(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        elapsed = time.perf_counter() - g.profile_start
+        threshold = app.config["PROFILING_THRESHOLD_MS"] / 1000
+        if g.profile_forced or elapsed >= threshold:
+            name = _save_profile(app, profiler, response, elapsed)
+            app.logger.warning(
+                "Profiled %s %s in %.1fms (%d SQL statements): %s",
+                request.method,
+                request.path,
+                elapsed * 1000,
+                len(g.profile_sql),
+                name,
+            )
+            response.headers["X-Profile-Id"] = name
+        return response
@@ -0,0 +1,311 @@
+"""Read replicas fed by database snapshots in a shared directory.
+
+The primary copies ``data.db`` with the online backup API whenever its
+revision counters change and publishes the copy as
+``<REPLICATION_DIR>/snapshots/<generation>.db``. Every ``REPLICATION_INTERVAL``
+it also rewrites ``primary.json`` (the current generation and when it was last
+confirmed current). Followers copy a new snapshot into their own database in
+one write transaction, so their readers see the old board or the new one,
+never a mix. They serve reads while the data is at most
+``REPLICATION_MAX_LAG`` seconds behind the primary, and forward mutations to
+``REPLICATION_PRIMARY_URL`` (or reject them when it is unset).
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+import os
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import click
+from flask import Flask, current_app, g, request
+from flask.cli import with_appcontext
+
+from app.backup import copy_database, database_path
+from app.errors import error_response
+from app.extensions import FORWARD_TOKEN_HEADER, ProcessThreads, client_address
+
+try:  # POSIX only; without it every worker publishes/applies on its own.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+EXTENSION_KEY = "replication"
+HEARTBEAT = "primary.json"
+ROLES = ("primary", "follower")
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Blueprints that stay local on a follower: they do not read board data.
+LOCAL_BLUEPRINTS = {"admin", "metrics", "uploads"}
+FORWARDED_REQUEST_HEADERS = (
+    "Content-Type",
+    "If-Match",
+    "Authorization",
+    "Upload-Offset",
+    "Upload-Checksum",
+)
+FORWARDED_RESPONSE_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Location",
+    "Retry-After",
+    "Upload-Offset",
+    "Cache-Control",
+)
+
+
+class _Loop(abc.ABC):
+    """Background thread running ``step`` every ``interval`` seconds.
+
+    One worker per lock file does the work; the others retry the lock, so a
+    crashed worker is replaced. ``start`` is called per process.
+    """
+
+    name = "replication"
+
+    def __init__(self, lock_path: Path, interval: float, logger=None):
+        self.lock_path = lock_path
+        self.interval = interval
+        self.logger = logger
+        self._threads = ProcessThreads(self._run, self.name)
+
+    def start(self) -> None:
+        self._threads.start()
+
+    @abc.abstractmethod
+    def step(self) -> None:
+        """One round of work; exceptions are logged and the loop goes on."""
+
+    def _run(self) -> None:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+b") as lock_file:
+            while fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    time.sleep(self.interval)
+            while True:
+                try:
+                    self.step()
+                except Exception:  # noqa: BLE001 - keep replicating
+                    if self.logger is not None:
+                        self.logger.exception("Replication %s step failed", self.name)
+                time.sleep(self.interval)
+
+
+class Publisher(_Loop):
+    name = "replication-primary"
+
+    def __init__(self, directory: Path, source: Path, interval: float, keep: int = 3, logger=None):
+        super().__init__(Path(directory) / "primary.lock", interval, logger)
+        self.directory = Path(directory)
+        self.source = Path(source)
+        self.keep = keep
+
+    def step(self) -> dict:
+        """Publish a snapshot if the database changed; always refresh the heartbeat."""
+        checked = time.time()
+        revisions = _revisions(self.source)
+        heartbeat = read_heartbeat(self.directory) or {"generation": 0, "revisions": None}
+        if revisions != heartbeat["revisions"]:
+            generation = heartbeat["generation"] + 1
+            snapshots = self.directory / "snapshots"
+            snapshots.mkdir(parents=True, exist_ok=True)
+            staging = snapshots / f"{generation}.db.part"
+            staging.unlink(missing_ok=True)
+            # Same pacing as backups, so publishing does not stall writers.
+            copy_database(
+                self.source, staging, pages_per_step=256, step_sleep=0.005, max_restarts=20
+            )
+            # The copy may include writes made after ``revisions`` was read.
+            revisions = _revisions(staging)
+            os.replace(staging, snapshots / f"{generation}.db")
+            heartbeat = {"generation": generation, "revisions": revisions}
+            self._prune(generation)
+        heartbeat["checked"] = checked
+        _write_json(self.directory / HEARTBEAT, heartbeat)
+        return heartbeat
+
+    def _prune(self, generation: int) -> None:
+        # Keep a few: a follower may still be copying the previous one.
+        for path in (self.directory / "snapshots").glob("*.db"):
+            if path.stem.isdigit() and int(path.stem) <= generation - self.keep:
+                path.unlink(missing_ok=True)
+
+
+class Follower(_Loop):
+    name = "replication-follower"
+
+    def __init__(self, directory: Path, target: Path, interval: float, logger=None):
+        target = Path(target)
+        super().__init__(target.with_name(f"{target.name}.replica.lock"), interval, logger)
+        self.directory = Path(directory)
+        self.target = target
+        self.state_path = target.with_name(f"{target.name}.replica.json")
+
+    def step(self) -> dict | None:
+        """Apply the newest snapshot if it is not applied yet; returns the local state."""
+        heartbeat = read_heartbeat(self.directory)
+        if heartbeat is None:
+            return self.state()
+        state = self.state()
+        if state is None or state["generation"] != heartbeat["generation"]:
+            snapshot = self.directory / "snapshots" / f"{heartbeat['generation']}.db"
+            try:
+                src = sqlite3.connect(f"file:{snapshot}?mode=ro", uri=True)
+            except sqlite3.OperationalError:
+                return state  # pruned meanwhile; a newer heartbeat follows
+            dst = sqlite3.connect(self.target, timeout=30)
+            try:
+                # One step is one write transaction: readers wait, then see it all.
+                src.backup(dst)
+            finally:
+                dst.close()
+                src.close()
+        elif state["fresh_as_of"] == heartbeat["checked"]:
+            return state
+        state = {"generation": heartbeat["generation"], "fresh_as_of": heartbeat["checked"]}
+        _write_json(self.state_path, state)
+        return state
+
+    def state(self) -> dict | None:
+        return _read_json(self.state_path)
+
+    def lag(self) -> float | None:
+        """Seconds the local copy may be behind the primary; None before the first sync."""
+        state = self.state()
+        return None if state is None else max(0.0, time.time() - state["fresh_as_of"])
+
+
+def read_heartbeat(directory: Path) -> dict | None:
+    return _read_json(Path(directory) / HEARTBEAT)
+
+
+def _revisions(path: Path) -> dict:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    try:
+        return dict(conn.execute("SELECT name, value FROM revisions ORDER BY name"))
+    finally:
+        conn.close()
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: dict) -> None:
+    staging = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    staging.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(staging, path)
+
+
+def get_replication(app: Flask) -> Publisher | Follower | None:
+    role = app.config.get("REPLICATION_ROLE")
+    if not role:
+        return None
+    loop = app.extensions.get(EXTENSION_KEY)
+    if loop is None:
+        directory = app.config["REPLICATION_DIR"]
+        database = database_path(app.config["SQLALCHEMY_DATABASE_URI"])
+        interval = app.config["REPLICATION_INTERVAL"]
+        if role == "primary":
+            loop = Publisher(directory, database, interval, logger=app.logger)
+        else:
+            loop = Follower(directory, database, interval, logger=app.logger)
+        loop = app.extensions.setdefault(EXTENSION_KEY, loop)
+    return loop
+
+
+def register_replication(app: Flask) -> None:
+    role = app.config.get("REPLICATION_ROLE")
+    if not role:
+        return
+    if role not in ROLES:
+        raise ValueError(f"REPLICATION_ROLE must be one of {', '.join(ROLES)}, not {role!r}")
+    if app.config.get("BOARDS_ENABLED"):
+        raise ValueError("replication covers the default database only; disable BOARDS_ENABLED")
+    app.cli.add_command(replication_cli)
+
+    @app.before_request
+    def replicate():
+        loop = get_replication(app)
+        if loop.interval > 0:
+            loop.start()
+        if role == "primary" or request.blueprint in LOCAL_BLUEPRINTS:
+            return None
+        if request.endpoint == "static":
+            return None
+        if request.method not in SAFE_METHODS:
+            return _forward_to_primary()
+        lag = loop.lag()
+        if lag is None or lag > app.config["REPLICATION_MAX_LAG"]:
+            response, status = error_response("replica is too far behind the primary", 503)
+            response.headers["Retry-After"] = str(max(1, round(loop.interval)))
+            return response, status
+        g.replica_lag = lag
+        return None
+
+    if role == "follower":
+
+        @app.after_request
+        def add_replica_lag(response):
+            lag = g.get("replica_lag")
+            if lag is not None:
+                response.headers["X-Replica-Lag"] = f"{lag:.3f}"
+            return response
+
+
+def _forward_to_primary():
+    primary = current_app.config.get("REPLICATION_PRIMARY_URL")
+    if not primary:
+        return error_response("this instance is a read-only replica", 503)
+    url = primary.rstrip("/") + request.path
+    if request.query_string:
+        url += "?" + request.query_string.decode("latin-1")
+    headers = {
+        name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers
+    }
+    headers["X-Forwarded-For"] = client_address()
+    token = current_app.config.get("REPLICATION_FORWARD_TOKEN")
+    if token:
+        headers[FORWARD_TOKEN_HEADER] = token
+    upstream = urllib.request.Request(
+        url, data=request.get_data(), headers=headers, method=request.method
+    )
+    timeout = current_app.config["REPLICATION_FORWARD_TIMEOUT"]
+    try:
+        with urllib.request.urlopen(upstream, timeout=timeout) as res:
+            status, body, res_headers = res.status, res.read(), res.headers
+    except urllib.error.HTTPError as err:
+        status, body, res_headers = err.code, err.read(), err.headers
+    except OSError:
+        return error_response("primary is unreachable", 502)
+    response = current_app.response_class(body, status=status)
+    for name in FORWARDED_RESPONSE_HEADERS:
+        if name in res_headers:
+            response.headers[name] = res_headers[name]
+    return response
+
+
+@click.group("replication")
+def replication_cli():
+    """Snapshot replication (REPLICATION_ROLE, REPLICATION_DIR)."""
+
+
+@replication_cli.command("sync")
+@with_appcontext
+def replication_sync_command():
+    """Publish (primary) or apply (follower) once, e.g. from cron with REPLICATION_INTERVAL=0."""
+    loop = get_replication(current_app)
+    state = loop.step()
+    if state is None:
+        raise click.ClickException("nothing published yet")
+    click.echo(f"generation {state['generation']}")
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+
+from flask import Flask
+
+from app.repositories.board import BoardRepository
+from app.repositories.settings import SettingsRepository
+from app.shards import use_board
+
+
+class _AsyncRepository:
+    """Run blocking repository calls on an executor inside an app context.
+
+    Each call gets its own app context, so Flask-SQLAlchemy hands it a fresh
+    session that is removed on teardown. ORM objects never leave the worker
+    thread; methods return plain dicts. SQLite allows one writer at a time, so
+    writes are serialized on the event loop instead of piling up on the
+    database lock. With ``board`` set, calls run against that board's shard.
+    """
+
+    def __init__(self, app: Flask, executor: Executor | None = None, board: str | None = None):
+        self.app = app
+        self.executor = executor
+        self.board = board
+        self._write_lock = asyncio.Lock()
+
+    def _call(self, fn, *args, **kwargs):
+        with self.app.app_context():
+            if self.board is not None:
+                use_board(self.board)
+            return fn(*args, **kwargs)
+
+    async def _read(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self._call, fn, *args, **kwargs))
+
+    async def _write(self, fn, *args, **kwargs):
+        async with self._write_lock:
+            return await self._read(fn, *args, **kwargs)
+
+
+class AsyncBoardRepository(_AsyncRepository):
+    def __init__(self, app: Flask, executor: Executor | None = None, board: str | None = None):
+        super().__init__(app, executor, board)
+        self.repo = BoardRepository()
+
+    async def get_state(self) -> dict:
+        return await self._read(self.repo.get_state)
+
+    async def revision(self) -> str:
+        return str(await self._read(self.repo.revision))
+
+    async def add_card(self, **fields) -> dict | None:
+        return await self._write(partial(self.repo.add_card, **fields))
+
+    async def add_unique_card(self, **fields) -> tuple[dict | None, list[dict]]:
+        return await self._write(partial(self.repo.add_unique_card, **fields))
+
+    async def find_duplicates(self) -> dict:
+        return await self._read(self.repo.find_duplicates)
+
+    async def update_card(self, card_id: int, **fields) -> tuple[dict | None, str | None]:
+        return await self._write(partial(self.repo.update_card, card_id, **fields))
+
+    async def delete_card(self, card_id: int) -> None:
+        await self._write(self.repo.delete_card, card_id)
+
+    async def frequent_cards(self, limit: int) -> list[dict]:
+        return await self._read(self.repo.frequent_cards, limit)
+
+    async def list_tags(self) -> dict:
+        return await self._read(self.repo.list_tags)
+
+    async def set_card_tags(self, card_id: int, names: list[str]) -> list[str] | None:
+        return await self._write(self.repo.set_card_tags, card_id, names)
+
+    async def find_cards_by_tags(self, names: list[str], match_all: bool = True) -> dict:
+        return await self._read(self.repo.find_cards_by_tags, names, match_all)
+
+    async def add_column(self, name: str) -> dict:
+        return await self._write(self.repo.add_column, name)
+
+    async def update_column(self, col_id: int, name: str) -> dict | None:
+        return await self._write(self.repo.update_column, col_id, name)
+
+    async def delete_column(self, col_id: int, chunk_size: int) -> bool:
+        return await self._write(self.repo.delete_column, col_id, chunk_size)
+
+    async def reorder_cards(
+        self, col_id: int, order: list[int], expected_revision: int | None = None
+    ) -> tuple[int | None, str | None]:
+        return await self._write(self.repo.reorder_cards, col_id, order, expected_revision)
+
+    async def reorder_columns(
+        self, order: list[int], expected_revision: int | None = None
+    ) -> tuple[int | None, str | None]:
+        return await self._write(self.repo.reorder_columns, order, expected_revision)
+
+
+class AsyncSettingsRepository(_AsyncRepository):
+    def __init__(self, app: Flask, executor: Executor | None = None, board: str | None = None):
+        super().__init__(app, executor, board)
+        self.repo = SettingsRepository()
+
+    async def get(self) -> dict | None:
+        def get():
+            settings = self.repo.get()
+            return settings.to_dict() if settings else None
+
+        return await self._read(get)
+
+    async def update(self, updates: dict) -> dict | None:
+        def update():
+            settings = self.repo.update(updates)
+            return settings.to_dict() if settings else None
+
+        return await self._write(update)
+
+    async def set_background(self, url: str) -> str | None:
+        return await self._write(self.repo.set_background, url)
+
+    async def clear_background(self) -> str | None:
+        return await self._write(self.repo.clear_background)
@@ -1,14 +1,49 @@
 from __future__ import annotations
 
-from sqlalchemy import func, select
+from collections.abc import Callable, Hashable
+
+from flask import current_app
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
 
 from app.extensions import db
-from app.models import Card, Column
+from app.models import Card, CardHit, CardTag, Column, Revision, Tag
+from app.repositories.group_commit import get_writer
+from app.urls import canonical_url
+
+# ``canonical_link`` is internal: payloads match ``Card.to_dict``.
+CARD_COLUMNS = (
+    Card.id,
+    Card.column_id,
+    Card.title,
+    Card.link,
+    Card.description,
+    Card.icon,
+    Card.position,
+)
+# The tombstone flag is internal: payloads match ``Column.to_dict``.
+COLUMN_COLUMNS = (Column.id, Column.name, Column.position)
 
 
 class BoardRepository:
+    """Board reads and mutations.
+
+    Mutations return serialized payloads rather than ORM instances, so they can
+    run either inline or on the group-commit writer thread
+    (``GROUP_COMMIT_ENABLED``). Creates and updates are single
+    ``INSERT``/``UPDATE ... RETURNING`` statements with positions computed in
+    SQL; the payload comes from the returned row, not a reload.
+    """
+
+    def revision(self) -> int:
+        """Board change counter, bumped by triggers on every card/column write."""
+        return db.session.scalar(select(Revision.value).where(Revision.name == "board")) or 0
+
     def get_state(self) -> dict:
-        columns = db.session.scalars(select(Column).order_by(Column.position)).all()
+        columns = db.session.scalars(
+            select(Column).where(Column.deleted.is_(False)).order_by(Column.position)
+        ).all()
         return {"columns": [column.to_dict(include_cards=True) for column in columns]}
 
     def add_card(
@@ -19,22 +54,81 @@ class BoardRepository:
         link: str,
         description: str,
         icon: str,
-    ) -> Card | None:
-        column = db.session.get(Column, column_id)
-        if not column:
-            return None
-        next_pos = self._next_card_position(column_id)
-        card = Card(
-            column_id=column_id,
-            title=title,
-            link=link,
-            description=description,
-            icon=icon,
-            position=next_pos,
+    ) -> dict | None:
+        def op():
+            return self._insert_card(title, column_id, link, description, icon)
+
+        return self._commit(op)
+
+    def add_unique_card(
+        self,
+        *,
+        title: str,
+        column_id: int,
+        link: str,
+        description: str,
+        icon: str,
+    ) -> tuple[dict | None, list[dict]]:
+        """``add_card`` unless the link is already on the board.
+
+        Returns ``(card, [])``, or ``(None, duplicates)`` without inserting.
+        The check is an index lookup in the same transaction as the insert.
+        """
+
+        def op():
+            duplicates = self._cards_with_canonical_link(canonical_url(link))
+            if duplicates:
+                return None, duplicates
+            return self._insert_card(title, column_id, link, description, icon), []
+
+        return self._commit(op)
+
+    def find_by_link(self, link: str) -> list[dict]:
+        """Cards whose link is the same as ``link`` once canonicalized."""
+        return self._cards_with_canonical_link(canonical_url(link))
+
+    def find_duplicates(self) -> dict:
+        """Links on more than one card, with those cards (``GET /api/duplicates``).
+
+        Grouping and counting run on ``ix_cards_canonical_link`` alone; only
+        the cards of duplicated links are read from the table.
+        """
+        rows = db.session.execute(_duplicates_query()).mappings()
+        groups: dict[str, list[dict]] = {}
+        for row in rows:
+            card = dict(row)
+            groups.setdefault(card.pop("canonical_link"), []).append(card)
+        return {"duplicates": [{"link": key, "cards": cards} for key, cards in groups.items()]}
+
+    def _cards_with_canonical_link(self, key: str) -> list[dict]:
+        if not key:
+            return []
+        rows = db.session.execute(_canonical_link_query(key)).mappings()
+        return [dict(row) for row in rows]
+
+    def _insert_card(
+        self, title: str, column_id: int, link: str, description: str, icon: str
+    ) -> dict | None:
+        # One statement: the column must exist and the position is computed in SQL.
+        source = select(
+            Column.id,
+            literal(title),
+            literal(link),
+            literal(canonical_url(link)),
+            literal(description),
+            literal(icon),
+            _next_card_position(Column.id),
+        ).where(Column.id == column_id, Column.deleted.is_(False))
+        stmt = (
+            insert(Card)
+            .from_select(
+                ["column_id", "title", "link", "canonical_link", "description", "icon", "position"],
+                source,
+            )
+            .returning(*CARD_COLUMNS)
         )
-        db.session.add(card)
-        db.session.commit()
-        return card
+        row = db.session.execute(stmt).mappings().first()
+        return dict(row) if row else None
 
     def update_card(
         self,
@@ -45,99 +139,355 @@ class BoardRepository:
         link: str | None,
         description: str | None,
         icon: str | None,
-    ) -> tuple[Card | None, str | None]:
-        card = db.session.get(Card, card_id)
-        if not card:
+    ) -> tuple[dict | None, str | None]:
+        def op():
+            fields = {"title": title, "link": link, "description": description, "icon": icon}
+            values = {key: value for key, value in fields.items() if value is not None}
+            if link is not None:
+                values["canonical_link"] = canonical_url(link)
+            live = Card.column_id.in_(_live_column_ids())
+            stmt = update(Card).where(Card.id == card_id, live)
+            if column_id is not None:
+                values["column_id"] = column_id
+                values["position"] = case(
+                    (Card.column_id == column_id, Card.position),
+                    else_=_next_card_position(column_id),
+                )
+                stmt = stmt.where(literal(column_id).in_(_live_column_ids()))
+            if values:
+                stmt = stmt.values(**values).returning(*CARD_COLUMNS)
+            else:
+                stmt = select(*CARD_COLUMNS).where(Card.id == card_id, live)
+            row = db.session.execute(stmt).mappings().first()
+            if row:
+                return dict(row), None
+            # Failure path only: tell a missing card from a missing target column.
+            card_exists = select(Card.id).where(Card.id == card_id, live).exists()
+            if column_id is not None and db.session.scalar(select(card_exists)):
+                return None, "column_not_found"
             return None, "card_not_found"
 
-        if column_id is not None and column_id != card.column_id:
-            target_column = db.session.get(Column, column_id)
-            if not target_column:
-                return None, "column_not_found"
-            card.position = self._next_card_position(column_id)
-            card.column_id = column_id
-
-        if title is not None:
-            card.title = title
-        if link is not None:
-            card.link = link
-        if description is not None:
-            card.description = description
-        if icon is not None:
-            card.icon = icon
-
-        db.session.commit()
-        return card, None
+        return self._commit(op)
 
     def delete_card(self, card_id: int) -> None:
-        card = db.session.get(Card, card_id)
-        if card:
-            db.session.delete(card)
-            db.session.commit()
-
-    def add_column(self, name: str) -> Column:
-        next_pos = self._next_column_position()
-        column = Column(name=name, position=next_pos)
-        db.session.add(column)
-        db.session.commit()
-        return column
+        def op():
+            db.session.execute(delete(Card).where(Card.id == card_id))
+
+        self._commit(op)
+
+    def add_column(self, name: str) -> dict:
+        def op():
+            source = select(literal(name), func.coalesce(func.max(Column.position), -1) + 1)
+            stmt = (
+                insert(Column).from_select(["name", "position"], source).returning(*COLUMN_COLUMNS)
+            )
+            return dict(db.session.execute(stmt).mappings().one())
+
+        return self._commit(op)
+
+    def update_column(self, col_id: int, name: str) -> dict | None:
+        def op():
+            stmt = (
+                update(Column)
+                .where(Column.id == col_id, Column.deleted.is_(False))
+                .values(name=name)
+                .returning(*COLUMN_COLUMNS)
+            )
+            row = db.session.execute(stmt).mappings().first()
+            return dict(row) if row else None
+
+        return self._commit(op)
+
+    def delete_column(self, col_id: int, chunk_size: int) -> bool:
+        """Hide a column at once and delete up to ``chunk_size`` of its cards.
+
+        Returns True while cards are left; the caller hands those to the
+        background purge (``purge_deleted_columns``) so one request never holds
+        the write lock for a whole column.
+        """
+
+        def op():
+            hidden = db.session.execute(
+                update(Column)
+                .where(Column.id == col_id, Column.deleted.is_(False))
+                .values(deleted=True)
+                .returning(Column.id)
+            ).first()
+            if hidden is None:
+                return False
+            _, purged = self._purge_chunk(col_id, chunk_size)
+            return not purged
+
+        return self._commit(op)
+
+    def purge_deleted_columns(self, chunk_size: int) -> int:
+        """Delete one chunk of cards of tombstoned columns; returns rows deleted.
+
+        A column row is removed once it has no cards left. Zero means there is
+        nothing left to purge. Cards are deleted explicitly rather than through
+        ``ON DELETE CASCADE``: foreign keys are not enforced on these
+        connections, and a cascade would delete the whole column in one
+        statement anyway.
+        """
+
+        def op():
+            col_id = db.session.scalar(select(Column.id).where(Column.deleted.is_(True)).limit(1))
+            if col_id is None:
+                return 0
+            deleted, purged = self._purge_chunk(col_id, chunk_size)
+            return deleted + purged
+
+        return self._commit(op, key=("purge_deleted_columns",))
 
-    def update_column(self, col_id: int, name: str) -> Column | None:
-        column = db.session.get(Column, col_id)
-        if not column:
+    def _purge_chunk(self, col_id: int, chunk_size: int) -> tuple[int, bool]:
+        """Delete up to ``chunk_size`` cards, and the column row once none are left.
+
+        Returns the number of cards deleted and whether the column is gone.
+        """
+        chunk = _purge_chunk_query(col_id, chunk_size)
+        deleted = db.session.execute(delete(Card).where(Card.id.in_(chunk))).rowcount
+        if deleted < chunk_size:
+            db.session.execute(delete(Column).where(Column.id == col_id))
+            return deleted, True
+        return deleted, False
+
+    def frequent_cards(self, limit: int) -> list[dict]:
+        """Most used live cards, best frecency first.
+
+        Rows carry ``hits`` plus the stored ``score`` and ``era``; see
+        ``app.hits.HitCounter.decayed`` for turning those into a frecency. The
+        inner query walks ``ix_card_hits_era_score`` and stops after ``limit``
+        live cards instead of sorting every counted card.
+        """
+        top = _frequent_cards_query(limit).subquery()
+        rows = db.session.execute(
+            select(*CARD_COLUMNS, top.c.hits, top.c.score, top.c.era)
+            .join(top, top.c.card_id == Card.id)
+            .order_by(top.c.era.desc(), top.c.score.desc())
+        ).mappings()
+        return [dict(row) for row in rows]
+
+    def list_tags(self) -> dict:
+        """Tags in use with their card counts; the counts are stored, not counted."""
+        tags = db.session.scalars(select(Tag).where(Tag.card_count > 0).order_by(Tag.name)).all()
+        return {"tags": [tag.to_dict() for tag in tags]}
+
+    def card_tags(self, card_id: int) -> list[str] | None:
+        """Tag names of a card; None if there is no such card."""
+        live = Card.column_id.in_(_live_column_ids())
+        if db.session.scalar(select(Card.id).where(Card.id == card_id, live)) is None:
             return None
-        column.name = name
-        db.session.commit()
-        return column
-
-    def delete_column(self, col_id: int) -> None:
-        column = db.session.get(Column, col_id)
-        if column:
-            db.session.delete(column)
-            db.session.commit()
-
-    def reorder_cards(self, col_id: int, order: list[int]) -> tuple[bool, str | None]:
-        column = db.session.get(Column, col_id)
-        if not column:
-            return False, "column_not_found"
-
-        cards = db.session.scalars(select(Card).where(Card.column_id == col_id)).all()
-        cards_by_id = {card.id: card for card in cards}
-        existing_ids = set(cards_by_id.keys())
-        incoming_ids = set(order)
-
-        if len(order) != len(incoming_ids):
-            return False, "duplicate_ids"
-        if incoming_ids != existing_ids:
-            return False, "incomplete_or_invalid_order"
-
-        for pos, card_id in enumerate(order):
-            cards_by_id[card_id].position = pos
-        db.session.commit()
-        return True, None
+        return list(
+            db.session.scalars(
+                select(Tag.name)
+                .join(CardTag, CardTag.tag_id == Tag.id)
+                .where(CardTag.card_id == card_id)
+                .order_by(Tag.name)
+            )
+        )
+
+    def set_card_tags(self, card_id: int, names: list[str]) -> list[str] | None:
+        """Replace the tags of a card, creating tags as needed; returns the new names.
+
+        Only the difference to the current tags is written; triggers adjust
+        ``tags.card_count`` for each link added or removed.
+        """
+
+        names = tag_names(names)
+
+        def op():
+            live = Card.column_id.in_(_live_column_ids())
+            if db.session.scalar(select(Card.id).where(Card.id == card_id, live)) is None:
+                return None
+            if names:
+                db.session.execute(
+                    sqlite_insert(Tag)
+                    .values([{"name": name} for name in names])
+                    .on_conflict_do_nothing(index_elements=["name"])
+                )
+            wanted = set(
+                db.session.scalars(select(Tag.id).where(Tag.name.in_(names))) if names else ()
+            )
+            current = set(
+                db.session.scalars(select(CardTag.tag_id).where(CardTag.card_id == card_id))
+            )
+            removed = current - wanted
+            if removed:
+                db.session.execute(
+                    delete(CardTag).where(CardTag.card_id == card_id, CardTag.tag_id.in_(removed))
+                )
+                db.session.execute(delete(Tag).where(Tag.id.in_(removed), Tag.card_count <= 0))
+            if wanted - current:
+                db.session.execute(
+                    insert(CardTag),
+                    [{"card_id": card_id, "tag_id": tag_id} for tag_id in wanted - current],
+                )
+            return names
+
+        return self._commit(op)
+
+    def find_cards_by_tags(self, names: list[str], match_all: bool = True) -> dict:
+        """Live cards carrying every (``match_all``) or any of the tags ``names``.
+
+        The filter is a ``card_tags`` lookup on ``ix_card_tags_tag_card``; with
+        ``match_all`` a card qualifies when it matched as many tags as asked for.
+        """
+        names = tag_names(names)
+        tag_ids = list(db.session.scalars(select(Tag.id).where(Tag.name.in_(names))))
+        if not tag_ids or (match_all and len(tag_ids) < len(names)):
+            return {"cards": []}
+        matching = _tagged_cards_query(tag_ids, match_all)
+        rows = db.session.execute(
+            select(*CARD_COLUMNS)
+            .join(Column, Column.id == Card.column_id)
+            .where(Card.id.in_(matching), Column.deleted.is_(False))
+            .order_by(Column.position, Card.position)
+        ).mappings()
+        return {"cards": [dict(row) for row in rows]}
+
+    def reorder_cards(
+        self, col_id: int, order: list[int], expected_revision: int | None = None
+    ) -> tuple[int | None, str | None]:
+        """Set the card order of a column; returns the new board revision.
+
+        ``order`` must list every card of the column; ids of cards from other
+        columns move those cards into it. With ``expected_revision`` the write
+        is refused (``revision_conflict``) if the board changed since then.
+        """
+
+        def op():
+            if expected_revision is not None and self.revision() != expected_revision:
+                return None, "revision_conflict"
+            column = db.session.get(Column, col_id)
+            if not column or column.deleted:
+                return None, "column_not_found"
+
+            cards = db.session.scalars(
+                select(Card).where(
+                    (Card.column_id == col_id)
+                    | (Card.id.in_(order) & Card.column_id.in_(_live_column_ids()))
+                )
+            ).all()
+            cards_by_id = {card.id: card for card in cards}
+            existing_ids = {card.id for card in cards if card.column_id == col_id}
+            incoming_ids = set(order)
+
+            if len(order) != len(incoming_ids):
+                return None, "duplicate_ids"
+            if not existing_ids <= incoming_ids or incoming_ids != set(cards_by_id):
+                return None, "incomplete_or_invalid_order"
 
-    def reorder_columns(self, order: list[int]) -> tuple[bool, str | None]:
-        columns = db.session.scalars(select(Column).where(Column.id.in_(order))).all()
-        columns_by_id = {column.id: column for column in columns}
-        existing_ids = set(db.session.scalars(select(Column.id)).all())
-        incoming_ids = set(order)
+            for pos, card_id in enumerate(order):
+                cards_by_id[card_id].column_id = col_id
+                cards_by_id[card_id].position = pos
+            db.session.flush()
+            return self.revision(), None
 
-        if len(order) != len(incoming_ids):
-            return False, "duplicate_ids"
-        if incoming_ids != existing_ids:
-            return False, "incomplete_or_invalid_order"
+        return self._commit(op, key=_reorder_key(expected_revision, "reorder_cards", col_id))
 
-        for pos, column_id in enumerate(order):
-            columns_by_id[column_id].position = pos
+    def reorder_columns(
+        self, order: list[int], expected_revision: int | None = None
+    ) -> tuple[int | None, str | None]:
+        def op():
+            if expected_revision is not None and self.revision() != expected_revision:
+                return None, "revision_conflict"
+            columns = db.session.scalars(
+                select(Column).where(Column.id.in_(order), Column.deleted.is_(False))
+            ).all()
+            columns_by_id = {column.id: column for column in columns}
+            existing_ids = set(db.session.scalars(_live_column_ids()).all())
+            incoming_ids = set(order)
+
+            if len(order) != len(incoming_ids):
+                return None, "duplicate_ids"
+            if incoming_ids != existing_ids:
+                return None, "incomplete_or_invalid_order"
+
+            for pos, column_id in enumerate(order):
+                columns_by_id[column_id].position = pos
+            db.session.flush()
+            return self.revision(), None
+
+        return self._commit(op, key=_reorder_key(expected_revision, "reorder_columns"))
+
+    def _commit(self, op: Callable, key: Hashable | None = None):
+        writer = get_writer(current_app._get_current_object())
+        if writer is not None:
+            return writer.submit(op, key)
+        result = op()
         db.session.commit()
-        return True, None
+        return result
 
-    def _next_column_position(self) -> int:
-        value = db.session.scalar(select(func.max(Column.position)))
-        return (value or -1) + 1
 
-    def _next_card_position(self, column_id: int) -> int:
-        value = db.session.scalar(
-            select(func.max(Card.position)).where(Card.column_id == column_id)
-        )
-        return (value or -1) + 1
+def tag_names(names: list[str]) -> list[str]:
+    """Tags are case-insensitive: stripped, lowercased, deduplicated and sorted."""
+    return sorted({name.strip().lower() for name in names} - {""})
+
+
+def _reorder_key(expected_revision: int | None, *key) -> tuple | None:
+    # A conditional reorder must run to see its conflict; coalescing it into a
+    # newer one would acknowledge an order that was never applied.
+    return key if expected_revision is None else None
+
+
+def _live_column_ids():
+    """Ids of columns that are not tombstoned."""
+    return select(Column.id).where(Column.deleted.is_(False))
+
+
+def _canonical_link_query(key: str):
+    return (
+        select(*CARD_COLUMNS)
+        .where(Card.canonical_link == key, Card.column_id.in_(_live_column_ids()))
+        .order_by(Card.id)
+    )
+
+
+def _duplicates_query():
+    live = Card.column_id.in_(_live_column_ids())
+    duplicated = (
+        select(Card.canonical_link)
+        .where(Card.canonical_link != "", live)
+        .group_by(Card.canonical_link)
+        .having(func.count() > 1)
+    )
+    return (
+        select(Card.canonical_link, *CARD_COLUMNS)
+        .where(Card.canonical_link.in_(duplicated), live)
+        .order_by(Card.canonical_link, Card.id)
+    )
+
+
+def _frequent_cards_query(limit: int):
+    live = (
+        select(Card.id)
+        .where(Card.id == CardHit.card_id, Card.column_id.in_(_live_column_ids()))
+        .exists()
+    )
+    return (
+        select(CardHit.card_id, CardHit.hits, CardHit.score, CardHit.era)
+        .where(live)
+        .order_by(CardHit.era.desc(), CardHit.score.desc())
+        .limit(limit)
+    )
+
+
+def _tagged_cards_query(tag_ids: list[int], match_all: bool):
+    matching = select(CardTag.card_id).where(CardTag.tag_id.in_(tag_ids))
+    if match_all:
+        matching = matching.group_by(CardTag.card_id).having(func.count() == len(tag_ids))
+    return matching
+
+
+def _purge_chunk_query(col_id: int, chunk_size: int):
+    return select(Card.id).where(Card.column_id == col_id).limit(chunk_size)
+
+
+def _next_card_position(column_id):
+    """Scalar subquery for the next free position in a column."""
+    cards = aliased(Card)
+    return (
+        select(func.coalesce(func.max(cards.position), -1) + 1)
+        .where(cards.column_id == column_id)
+        .scalar_subquery()
+    )
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import queue
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+
+from flask import Flask, g, has_app_context
+
+from app.extensions import ProcessThreads, db
+from app.shards import use_board
+
+EXTENSION_KEY = "group_commit"
+
+
+class _Job:
+    __slots__ = ("op", "key", "board", "futures", "superseded")
+
+    def __init__(self, op: Callable, key: Hashable | None, board: str | None = None):
+        self.op = op
+        self.key = None if key is None else (board, key)
+        self.board = board
+        self.futures: list[Future] = [Future()]
+        # Older jobs with the same key, oldest first; they only run if this one refuses.
+        self.superseded: list[_Job] = []
+
+
+class GroupCommitWriter:
+    """Single writer thread that batches repository mutations into one commit.
+
+    Mutations are queued as callables that change ``db.session`` without
+    committing. The writer waits up to ``window`` seconds after the first job
+    for more to arrive, runs them in order and commits once, so a burst of
+    edits pays for one SQLite fsync. Jobs that share a coalescing ``key``
+    (e.g. reorders of the same column) collapse into the newest one; every
+    superseded caller receives the newest job's result. If the newest job
+    refuses (returns ``(value, error)`` with an error, like an invalid
+    reorder), the superseded jobs run after all, in order, and every caller
+    gets its own result. Callers block until the batch is committed, so an
+    acknowledgment is always durable. Jobs for different board shards
+    (``g.board_slug``) are committed per shard.
+    """
+
+    def __init__(self, app: Flask, window: float, max_batch: int):
+        self.app = app
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: queue.Queue[_Job] = queue.Queue()
+        self._threads = ProcessThreads(self._run, "group-commit", on_start=self._reset_queue)
+
+    def submit(self, op: Callable, key: Hashable | None = None):
+        self._threads.start()
+        job = _Job(op, key, g.get("board_slug") if has_app_context() else None)
+        self._queue.put(job)
+        return job.futures[0].result()
+
+    def _reset_queue(self) -> None:
+        self._queue = queue.Queue()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            jobs = _coalesce(batch)
+            try:
+                self._execute(jobs)
+            except Exception as err:
+                # Never let the writer die with callers waiting on it.
+                for job in jobs:
+                    for future in _futures(job):
+                        if not future.done():
+                            future.set_exception(err)
+
+    def _execute(self, jobs: list[_Job]) -> None:
+        boards: dict[str | None, list[_Job]] = {}
+        for job in jobs:
+            boards.setdefault(job.board, []).append(job)
+        for board, board_jobs in boards.items():
+            self._execute_board(board, board_jobs)
+
+    def _execute_board(self, board: str | None, jobs: list[_Job]) -> None:
+        with self.app.app_context():
+            if board is not None:
+                use_board(board)
+            try:
+                results = [pair for job in jobs for pair in _apply(job)]
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+            else:
+                for futures, result in results:
+                    _resolve(futures, result)
+                return
+
+            # Something in the batch failed: isolate it by committing one by one.
+            for job in jobs:
+                try:
+                    results = _apply(job)
+                    db.session.commit()
+                except Exception as err:
+                    db.session.rollback()
+                    for future in _futures(job):
+                        future.set_exception(err)
+                else:
+                    for futures, result in results:
+                        _resolve(futures, result)
+
+
+def _coalesce(batch: list[_Job]) -> list[_Job]:
+    latest: dict[Hashable, _Job] = {}
+    superseded: set[int] = set()
+    for job in batch:
+        if job.key is None:
+            continue
+        previous = latest.get(job.key)
+        if previous is not None:
+            job.superseded = [*previous.superseded, previous]
+            previous.superseded = []
+            superseded.add(id(previous))
+        latest[job.key] = job
+    return [job for job in batch if id(job) not in superseded]
+
+
+def _apply(job: _Job) -> list[tuple[list[Future], object]]:
+    """Run a job; returns ``(futures, result)`` pairs to resolve once committed."""
+    result = job.op()
+    if not job.superseded or not _refused(result):
+        return [(_futures(job), result)]
+    # A refusal returns before changing anything, so replaying the superseded
+    # jobs first gives every caller what it would have got without coalescing.
+    replayed = [(old.futures, old.op()) for old in job.superseded]
+    return [*replayed, (job.futures, job.op())]
+
+
+def _refused(result) -> bool:
+    return isinstance(result, tuple) and len(result) == 2 and result[1] is not None
+
+
+def _futures(job: _Job) -> list[Future]:
+    return [*job.futures, *(future for old in job.superseded for future in old.futures)]
+
+
+def _resolve(futures: list[Future], result) -> None:
+    for future in futures:
+        future.set_result(result)
+
+
+def get_writer(app: Flask) -> GroupCommitWriter | None:
+    if not app.config.get("GROUP_COMMIT_ENABLED"):
+        return None
+    writer = app.extensions.get(EXTENSION_KEY)
+    if writer is None:
+        writer = app.extensions.setdefault(
+            EXTENSION_KEY,
+            GroupCommitWriter(
+                app,
+                window=app.config["GROUP_COMMIT_WINDOW_MS"] / 1000,
+                max_batch=app.config["GROUP_COMMIT_MAX_BATCH"],
+            ),
+        )
+    return writer
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+from flask import Flask, g, has_app_context
+
+from app.backup import database_path
+from app.extensions import ProcessThreads
+from app.shards import get_shards, use_board
+
+EXTENSION_KEY = "column_purge"
+# Also sweep now and then, so a failed purge is retried.
+SWEEP_INTERVAL = 60.0
+
+
+class ColumnPurger:
+    """Background thread deleting the cards of tombstoned columns in chunks.
+
+    ``BoardRepository.delete_column`` hides a column in one small write and
+    hands large columns to ``wake``. Each chunk of ``chunk_size`` cards is
+    its own commit, followed by ``pause`` seconds in which other writers get
+    the SQLite write lock. Reads already skip tombstoned columns, so the purge
+    is invisible to clients. Boards (``g.board_slug``) are purged one by one.
+    """
+
+    def __init__(self, app: Flask, chunk_size: int, pause: float):
+        self.app = app
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self._pending: set[str | None] = {None}
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = ProcessThreads(self._run, "column-purge")
+
+    def wake(self) -> None:
+        self.resume({g.get("board_slug") if has_app_context() else None})
+
+    def resume(self, boards: set[str | None]) -> None:
+        """Purge ``boards`` now, e.g. ones a previous process left unfinished."""
+        with self._lock:
+            self._pending.update(boards)
+        self._threads.start()
+        self._wake.set()
+
+    def purge(self, board: str | None = None) -> int:
+        """Purge every tombstoned column of one board now; returns rows deleted."""
+        from app.repositories.board import BoardRepository
+
+        repo = BoardRepository()
+        total = 0
+        with self.app.app_context():
+            if board is not None:
+                use_board(board)
+            while deleted := repo.purge_deleted_columns(self.chunk_size):
+                total += deleted
+                time.sleep(self.pause)
+        return total
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                boards = list(self._pending)
+                self._pending = {None}
+            for board in boards:
+                try:
+                    self.purge(board)
+                except Exception:  # noqa: BLE001 - the tombstone stays; retried on next sweep
+                    self.app.logger.exception("Purging deleted columns failed (board %s)", board)
+                    with self._lock:
+                        self._pending.add(board)
+            self._wake.wait(SWEEP_INTERVAL)
+            self._wake.clear()
+
+
+def get_purger(app: Flask) -> ColumnPurger:
+    purger = app.extensions.get(EXTENSION_KEY)
+    if purger is None:
+        purger = app.extensions.setdefault(
+            EXTENSION_KEY,
+            ColumnPurger(
+                app,
+                chunk_size=app.config["COLUMN_PURGE_CHUNK"],
+                pause=app.config["COLUMN_PURGE_PAUSE_MS"] / 1000,
+            ),
+        )
+    return purger
+
+
+def register_purge(app: Flask) -> None:
+    if app.config.get("REPLICATION_ROLE") == "follower":
+        return  # the primary purges; followers copy its snapshots
+    boards = _unfinished_boards(app)
+    if not boards:
+        return
+    started_in: int | None = None
+
+    @app.before_request
+    def resume_column_purge():
+        # A process that died mid-purge left tombstones nobody wakes the purger
+        # for. Resume them once per process (threads do not survive fork).
+        nonlocal started_in
+        if started_in != os.getpid():
+            started_in = os.getpid()
+            get_purger(app).resume(boards)
+
+
+def _unfinished_boards(app: Flask) -> set[str | None]:
+    """Boards (``None`` for the default database) that still have tombstoned columns."""
+    paths: dict[str | None, Path] = {}
+    try:
+        paths[None] = database_path(app.config["SQLALCHEMY_DATABASE_URI"])
+    except RuntimeError:
+        pass  # in-memory database: nothing survives a restart
+    shards = get_shards(app)
+    if shards is not None:
+        paths.update((slug, shards.path(slug)) for slug in shards.slugs())
+    boards = set()
+    for board, path in paths.items():
+        try:
+            with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+                if conn.execute("SELECT 1 FROM columns WHERE deleted LIMIT 1").fetchone():
+                    boards.add(board)
+        except sqlite3.Error:
+            pass  # not created or not migrated yet
+    return boards
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from sqlalchemy import select
+
 from app.extensions import db
-from app.models import Settings
+from app.models import Revision, Settings
 
 
 class SettingsRepository:
+    def revision(self) -> int:
+        return db.session.scalar(select(Revision.value).where(Revision.name == "settings")) or 0
+
     def get(self) -> Settings | None:
         return db.session.get(Settings, 1)
 
@@ -0,0 +1,93 @@
+import sqlite3
+
+from flask import Blueprint, current_app, jsonify, request, send_from_directory
+
+from app.backup import BackupBusy, get_backups
+from app.errors import error_response
+from app.maintenance import databases, report
+from app.profiling import list_profiles, profile_dir
+from app.schemas import BOARD_CREATE
+from app.security import admin_required
+from app.shards import SLUG_RE, get_shards
+from app.validators import ValidationError
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
+
+
+@admin_bp.route("/profiles")
+@admin_required
+def admin_list_profiles():
+    return jsonify({"profiles": list_profiles(current_app)})
+
+
+@admin_bp.route("/profiles/<name>")
+@admin_required
+def admin_download_profile(name):
+    directory = profile_dir(current_app)
+    if not (directory / f"{name}.prof").is_file():
+        return error_response("profile not found", 404)
+    return send_from_directory(directory, f"{name}.prof", as_attachment=True)
+
+
+@admin_bp.route("/profiles/<name>/summary")
+@admin_required
+def admin_profile_summary(name):
+    directory = profile_dir(current_app)
+    if not (directory / f"{name}.json").is_file():
+        return error_response("profile not found", 404)
+    return send_from_directory(directory, f"{name}.json", mimetype="application/json")
+
+
+@admin_bp.route("/boards")
+@admin_required
+def admin_list_boards():
+    shards = get_shards(current_app)
+    if shards is None:
+        return error_response("boards are disabled", 404)
+    return jsonify({"boards": shards.slugs()})
+
+
+@admin_bp.route("/boards", methods=["POST"])
+@admin_required
+def admin_create_board():
+    shards = get_shards(current_app)
+    if shards is None:
+        return error_response("boards are disabled", 404)
+    try:
+        slug = BOARD_CREATE.load(request.get_json(silent=True))["slug"]
+    except ValidationError as err:
+        return error_response(err.message, err.status, err.details)
+    if not SLUG_RE.match(slug):
+        return error_response("slug must be lowercase letters, digits and dashes", 400)
+    if not shards.create(slug):
+        return error_response("board already exists", 409)
+    return jsonify({"slug": slug, "url": f"/b/{slug}/"}), 201
+
+
+@admin_bp.route("/backups")
+@admin_required
+def admin_list_backups():
+    return jsonify({"backups": get_backups(current_app).list()})
+
+
+@admin_bp.route("/backups", methods=["POST"])
+@admin_required
+def admin_create_backup():
+    try:
+        manifest = get_backups(current_app).create(blocking=False)
+    except BackupBusy:
+        return error_response("a backup is already running", 409)
+    return jsonify(manifest), 201
+
+
+@admin_bp.route("/db")
+@admin_required
+def admin_database_report():
+    results = {}
+    for name, path in databases(current_app._get_current_object()).items():
+        try:
+            results[name] = report(path)
+        except (OSError, sqlite3.Error) as err:
+            # One missing or damaged board file must not hide the others.
+            results[name] = {"path": str(path), "error": str(err)}
+    return jsonify({"databases": results})
@@ -1,41 +1,41 @@
+import base64
 import os
 import secrets
+import time
 from pathlib import Path
 
-from flask import Blueprint, current_app, jsonify, request
-from PIL import Image, UnidentifiedImageError
+from flask import Blueprint, current_app, g, jsonify, request
 from werkzeug.utils import secure_filename
 
+from app.cache import cached_json, if_match_revision, revision_etag
 from app.errors import error_response
 from app.extensions import limiter
+from app.hits import get_hit_counter
+from app.jobs import JobError, get_jobs, handler
+from app.metrics import timed
 from app.repositories import BoardRepository, SettingsRepository
-from app.validators import (
-    ValidationError,
-    list_of_ints,
-    optional_float,
-    optional_hex_color,
-    optional_int,
-    optional_string,
-    optional_url,
-    require_dict,
-    require_int,
-    require_string,
+from app.repositories.purge import get_purger
+from app.schemas import (
+    CARD_CREATE,
+    CARD_CREATE_UNFURL,
+    CARD_TAGS,
+    CARD_UPDATE,
+    COLUMN,
+    REORDER,
+    SETTINGS_UPDATE,
+    UNFURL,
+    UNFURL_BATCH,
+    UPLOAD_CREATE,
 )
+from app.shards import use_board
+from app.unfurl import UnfurlError, get_unfurler
+from app.uploads import BLOCK_SIZE as UPLOAD_BLOCK_SIZE
+from app.uploads import UploadError, get_upload_sessions, move_into
+from app.urls import canonical_url
+from app.validators import ValidationError
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
-SETTINGS_FIELDS = (
-    "dashboard_title",
-    "dashboard_bg_image",
-    "cols_per_row",
-    "column_width",
-    "card_height",
-    "column_bg_color",
-    "column_bg_opacity",
-    "card_bg_color",
-    "card_bg_opacity",
-)
-
 board_repo = BoardRepository()
 settings_repo = SettingsRepository()
 FORMAT_TO_MIME = {
@@ -66,14 +66,33 @@ def upload_limit() -> str:
     return current_app.config["RATE_LIMIT_UPLOADS"]
 
 
+def upload_chunk_limit() -> str:
+    return current_app.config["RATE_LIMIT_UPLOAD_CHUNKS"]
+
+
+def unfurl_limit() -> str:
+    return current_app.config["RATE_LIMIT_UNFURL"]
+
+
+def hit_limit() -> str:
+    return current_app.config["RATE_LIMIT_HITS"]
+
+
+@api_bp.url_value_preprocessor
+def select_board(_endpoint, values):
+    # Set by the /b/<board>/api registration (BOARDS_ENABLED); /api is the default board.
+    if values and "board" in values:
+        use_board(values.pop("board"))
+
+
 @api_bp.errorhandler(ValidationError)
 def handle_validation_error(err):
-    return error_response(err.message, status=err.status)
+    return error_response(err.message, status=err.status, details=err.details)
 
 
 @api_bp.route("/state")
 def api_state():
-    return jsonify(board_repo.get_state())
+    return cached_json("board", board_repo.revision, board_repo.get_state)
 
 
 @api_bp.route("/settings")
@@ -81,53 +100,15 @@ def api_get_settings():
     settings = settings_repo.get()
     if not settings:
         return error_response("settings not found", 404)
-    return jsonify(settings.to_dict())
+    return cached_json("settings", settings_repo.revision, settings.to_dict)
 
 
 @api_bp.route("/settings", methods=["PUT"])
 @limiter.limit(mutation_limit)
 def api_update_settings():
-    data = require_dict(request.get_json(silent=True) or {}, message="invalid settings payload")
-    unknown = set(data.keys()) - set(SETTINGS_FIELDS)
-    if unknown:
-        return error_response("unsupported settings fields", 400, {"fields": sorted(unknown)})
-
-    updates = {}
-    title = optional_string(data, "dashboard_title", max_len=120)
-    if title is not None:
-        updates["dashboard_title"] = title or "Start Dashboard"
-
-    bg_url = optional_url(data, "dashboard_bg_image", max_len=2048)
-    if bg_url is not None:
-        updates["dashboard_bg_image"] = bg_url
-
-    cols_per_row = optional_int(data, "cols_per_row", min_value=1, max_value=10)
-    if cols_per_row is not None:
-        updates["cols_per_row"] = cols_per_row
-
-    column_width = optional_int(data, "column_width", min_value=200, max_value=1200)
-    if column_width is not None:
-        updates["column_width"] = column_width
-
-    card_height = optional_int(data, "card_height", min_value=0, max_value=2000)
-    if card_height is not None:
-        updates["card_height"] = card_height
-
-    column_bg_color = optional_hex_color(data, "column_bg_color")
-    if column_bg_color is not None:
-        updates["column_bg_color"] = column_bg_color
-
-    column_bg_opacity = optional_float(data, "column_bg_opacity", min_value=0.0, max_value=1.0)
-    if column_bg_opacity is not None:
-        updates["column_bg_opacity"] = column_bg_opacity
-
-    card_bg_color = optional_hex_color(data, "card_bg_color")
-    if card_bg_color is not None:
-        updates["card_bg_color"] = card_bg_color
-
-    card_bg_opacity = optional_float(data, "card_bg_opacity", min_value=0.0, max_value=1.0)
-    if card_bg_opacity is not None:
-        updates["card_bg_opacity"] = card_bg_opacity
+    updates = SETTINGS_UPDATE.load(request.get_json(silent=True) or {})
+    if "dashboard_title" in updates:
+        updates["dashboard_title"] = updates["dashboard_title"] or "Start Dashboard"
 
     if not updates:
         return error_response("no fields provided", 400)
@@ -141,23 +122,67 @@ def api_update_settings():
 @api_bp.route("/card", methods=["POST"])
 @limiter.limit(mutation_limit)
 def api_add_card():
-    data = require_dict(request.get_json(silent=True) or {}, message="invalid card payload")
-    title = require_string(data, "title", max_len=200)
-    column_id = require_int(data, "column_id", min_value=1)
-    link = optional_url(data, "link", max_len=2048) or ""
-    description = optional_string(data, "description", max_len=2000) or ""
-    icon = optional_url(data, "icon", max_len=2048) or ""
-
-    card = board_repo.add_card(
-        title=title,
-        column_id=column_id,
-        link=link,
-        description=description,
-        icon=icon,
-    )
+    payload = request.get_json(silent=True) or {}
+    if request.args.get("unfurl") in {"1", "true"}:
+        data = _fill_from_preview(CARD_CREATE_UNFURL.load(payload))
+    else:
+        data = CARD_CREATE.load(payload)
+    if request.args.get("unique") in {"1", "true"}:
+        card, duplicates = board_repo.add_unique_card(**data)
+        if duplicates:
+            return error_response(
+                "link is already on the board", 409, details={"duplicates": duplicates}
+            )
+    else:
+        card = board_repo.add_card(**data)
     if not card:
         return error_response("column not found", 404)
-    return jsonify(card.to_dict()), 201
+    return jsonify(card), 201
+
+
+@api_bp.route("/unfurl", methods=["GET", "POST"])
+@limiter.limit(unfurl_limit)
+def api_unfurl():
+    unfurler = get_unfurler(current_app._get_current_object())
+    if unfurler is None:
+        return error_response("link previews are disabled", 404)
+    if request.method == "POST":
+        data = UNFURL_BATCH.load(request.get_json(silent=True) or {})
+        return jsonify({"results": unfurler.unfurl_many(data["urls"])})
+    url = UNFURL.load(request.args.to_dict())["url"]
+    try:
+        return jsonify(unfurler.unfurl(url))
+    except UnfurlError as err:
+        return error_response(f"could not preview link: {err}", 502)
+
+
+def _fill_from_preview(data: dict) -> dict:
+    """Blank title, description and icon taken from the link preview, if there is one."""
+    unfurler = get_unfurler(current_app._get_current_object())
+    if (
+        unfurler is not None
+        and data["link"]
+        and not all(data[key] for key in ("title", "description", "icon"))
+    ):
+        try:
+            preview = unfurler.unfurl(data["link"])
+        except UnfurlError:
+            preview = {}
+        for key in ("title", "description", "icon"):
+            data[key] = data[key] or preview.get(key, "")
+    if not data["title"]:
+        raise ValidationError(
+            "'title' is required", details={"errors": {"title": "'title' is required"}}
+        )
+    return data
+
+
+@api_bp.route("/duplicates")
+def api_duplicates():
+    link = request.args.get("link")
+    if link is not None:
+        return jsonify({"link": canonical_url(link), "cards": board_repo.find_by_link(link)})
+    return cached_json("duplicates", board_repo.revision, board_repo.find_duplicates)
 
 
 @api_bp.route("/card/<int:card_id>", methods=["PUT", "DELETE"])
@@ -167,35 +192,81 @@ def api_modify_card(card_id):
         board_repo.delete_card(card_id)
         return ("", 204)
 
-    data = require_dict(request.get_json(silent=True) or {}, message="invalid card payload")
-    title = optional_string(data, "title", max_len=200)
-    column_id = optional_int(data, "column_id", min_value=1)
-    link = optional_url(data, "link", max_len=2048)
-    description = optional_string(data, "description", max_len=2000)
-    icon = optional_url(data, "icon", max_len=2048)
-
+    data = CARD_UPDATE.load(request.get_json(silent=True) or {})
     card, err = board_repo.update_card(
         card_id,
-        title=title,
-        column_id=column_id,
-        link=link,
-        description=description,
-        icon=icon,
+        title=data.get("title"),
+        column_id=data.get("column_id"),
+        link=data.get("link"),
+        description=data.get("description"),
+        icon=data.get("icon"),
     )
     if err == "card_not_found":
         return error_response("card not found", 404)
     if err == "column_not_found":
         return error_response("target column not found", 404)
-    return jsonify(card.to_dict())
+    return jsonify(card)
+
+
+@api_bp.route("/card/<int:card_id>/tags")
+def api_card_tags(card_id):
+    tags = board_repo.card_tags(card_id)
+    if tags is None:
+        return error_response("card not found", 404)
+    return jsonify({"card_id": card_id, "tags": tags})
+
+
+@api_bp.route("/card/<int:card_id>/tags", methods=["PUT"])
+@limiter.limit(mutation_limit)
+def api_set_card_tags(card_id):
+    data = CARD_TAGS.load(request.get_json(silent=True) or {})
+    tags = board_repo.set_card_tags(card_id, data["tags"])
+    if tags is None:
+        return error_response("card not found", 404)
+    return jsonify({"card_id": card_id, "tags": tags})
+
+
+@api_bp.route("/card/<int:card_id>/hit", methods=["POST"])
+@limiter.limit(hit_limit)
+def api_card_hit(card_id):
+    # Beacon (navigator.sendBeacon): counted in memory, written in batches.
+    get_hit_counter(current_app._get_current_object()).hit(card_id)
+    return ("", 204)
+
+
+@api_bp.route("/cards/frequent")
+def api_frequent_cards():
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    counter = get_hit_counter(current_app._get_current_object())
+    now = time.time()
+    cards = []
+    for card in board_repo.frequent_cards(limit):
+        score, era = card.pop("score"), card.pop("era")
+        cards.append({**card, "frecency": round(counter.decayed(score, era, now), 4)})
+    return jsonify({"cards": cards})
+
+
+@api_bp.route("/tags")
+def api_tags():
+    return cached_json("tags", board_repo.revision, board_repo.list_tags)
+
+
+@api_bp.route("/cards")
+def api_cards_by_tags():
+    names = [name for name in request.args.get("tags", "").split(",") if name.strip()]
+    match = request.args.get("match", "all")
+    if not names:
+        return error_response("'tags' is required")
+    if match not in {"all", "any"}:
+        return error_response("'match' must be 'all' or 'any'")
+    return jsonify(board_repo.find_cards_by_tags(names, match_all=match == "all"))
 
 
 @api_bp.route("/column", methods=["POST"])
 @limiter.limit(mutation_limit)
 def api_add_column():
-    data = require_dict(request.get_json(silent=True) or {}, message="invalid column payload")
-    name = require_string(data, "name", max_len=120)
-    column = board_repo.add_column(name)
-    payload = column.to_dict(include_cards=False)
+    name = COLUMN.load(request.get_json(silent=True) or {})["name"]
+    payload = board_repo.add_column(name)
     payload["cards"] = []
     return jsonify(payload), 201
 
@@ -204,15 +275,14 @@ def api_add_column():
 @limiter.limit(mutation_limit)
 def api_modify_column(col_id):
     if request.method == "DELETE":
-        board_repo.delete_column(col_id)
+        if board_repo.delete_column(col_id, current_app.config["COLUMN_PURGE_CHUNK"]):
+            get_purger(current_app._get_current_object()).wake()
         return ("", 204)
 
-    data = require_dict(request.get_json(silent=True) or {}, message="invalid column payload")
-    name = require_string(data, "name", max_len=120)
-    column = board_repo.update_column(col_id, name)
-    if not column:
+    name = COLUMN.load(request.get_json(silent=True) or {})["name"]
+    payload = board_repo.update_column(col_id, name)
+    if not payload:
         return error_response("column not found", 404)
-    payload = column.to_dict(include_cards=False)
     payload["cards"] = []
     return jsonify(payload)
 
@@ -220,29 +290,44 @@ def api_modify_column(col_id):
 @api_bp.route("/column/<int:col_id>/reorder-cards", methods=["POST"])
 @limiter.limit(mutation_limit)
 def api_reorder_cards(col_id):
-    data = require_dict(request.get_json(silent=True) or {}, message="invalid reorder payload")
-    order = list_of_ints(data, "order")
-    _, err = board_repo.reorder_cards(col_id, order)
+    order = REORDER.load(request.get_json(silent=True) or {})["order"]
+    revision, err = board_repo.reorder_cards(col_id, order, if_match_revision("board"))
+    if err == "revision_conflict":
+        return _revision_conflict()
     if err == "column_not_found":
         return error_response("column not found", 404)
     if err == "duplicate_ids":
         return error_response("order must not contain duplicate ids", 400)
     if err == "incomplete_or_invalid_order":
         return error_response("order must contain all cards in this column exactly once", 400)
-    return ("", 204)
+    return _reordered(revision)
 
 
 @api_bp.route("/column/reorder", methods=["POST"])
 @limiter.limit(mutation_limit)
 def api_reorder_columns():
-    data = require_dict(request.get_json(silent=True) or {}, message="invalid reorder payload")
-    order = list_of_ints(data, "order")
-    _, err = board_repo.reorder_columns(order)
+    order = REORDER.load(request.get_json(silent=True) or {})["order"]
+    revision, err = board_repo.reorder_columns(order, if_match_revision("board"))
+    if err == "revision_conflict":
+        return _revision_conflict()
     if err == "duplicate_ids":
         return error_response("order must not contain duplicate ids", 400)
     if err == "incomplete_or_invalid_order":
         return error_response("order must contain all columns exactly once", 400)
-    return ("", 204)
+    return _reordered(revision)
+
+
+def _reordered(revision: int):
+    # The new board ETag lets the client chain the next reorder with If-Match.
+    response = current_app.response_class(status=204)
+    response.set_etag(revision_etag("board", revision))
+    return response
+
+
+def _revision_conflict():
+    response, status = error_response("board was changed by another request", 412)
+    response.set_etag(revision_etag("board", board_repo.revision()))
+    return response, status
 
 
 @api_bp.route("/upload-bg", methods=["POST"])
@@ -256,76 +341,249 @@ def api_upload_bg():
         return error_response("empty filename", 400)
 
     ext = Path(file.filename).suffix.lower()
-    allowed_ext = current_app.config["ALLOWED_UPLOAD_EXTENSIONS"]
-    allowed_mime = current_app.config["ALLOWED_UPLOAD_MIMETYPES"]
-    if ext not in allowed_ext:
+    if ext not in current_app.config["ALLOWED_UPLOAD_EXTENSIONS"]:
         return error_response("unsupported file extension", 400)
-    image_format, width, height = _inspect_image(file)
-    if not image_format:
-        return error_response("invalid image content", 400)
-    expected_mime = FORMAT_TO_MIME.get(image_format)
-    accepted_mimes = FORMAT_MIME_ALIASES.get(image_format, {expected_mime})
-    expected_exts = FORMAT_TO_EXTS.get(image_format, set())
-    if expected_mime not in allowed_mime:
-        return error_response("unsupported image format", 400)
-    # Browsers may send aliases (image/jpg, image/pjpeg) or generic
-    # application/octet-stream; rely on decoded content + extension in that case.
-    client_mime = (file.mimetype or "").lower()
-    if (
-        client_mime
-        and client_mime != "application/octet-stream"
-        and client_mime not in accepted_mimes
-    ):
-        return error_response("mime type does not match image content", 400)
-    if ext not in expected_exts:
-        return error_response("file extension does not match image content", 400)
-    if (
-        width > current_app.config["MAX_IMAGE_WIDTH"]
-        or height > current_app.config["MAX_IMAGE_HEIGHT"]
-    ):
-        return error_response("image dimensions exceed allowed limit", 400)
+    with timed("dashboard_upload_processing_seconds", {"stage": "inspect"}, timing="upload"):
+        image = _inspect_image(file.stream)
+    error = _image_error(image, ext, file.mimetype)
+    if error:
+        return error_response(error, 400)
 
-    original_name = secure_filename(file.filename)
-    stem = Path(original_name).stem[:50] or "bg"
-    safe_name = f"{stem}_{secrets.token_hex(8)}{ext}"
+    safe_name = _background_name(file.filename, secrets.token_hex(8))
     upload_dir = Path(current_app.config["UPLOAD_DIR"])
     upload_dir.mkdir(parents=True, exist_ok=True)
-    destination = upload_dir / safe_name
-    file.save(destination)
-    url = f"/static/uploads/{safe_name}"
+    with timed("dashboard_upload_processing_seconds", {"stage": "save"}, timing="upload"):
+        file.save(upload_dir / safe_name)
+    return jsonify({"url": _use_background(safe_name)})
 
-    prev_url = settings_repo.set_background(url)
-    _remove_old_background_file(prev_url, upload_dir)
-    return jsonify({"url": url})
+
+@api_bp.route("/uploads", methods=["POST"])
+@limiter.limit(upload_limit)
+def api_create_upload():
+    data = UPLOAD_CREATE.load(request.get_json(silent=True) or {})
+    filename, size, mimetype = data["filename"], data["size"], data["mimetype"]
+    if Path(filename).suffix.lower() not in current_app.config["ALLOWED_UPLOAD_EXTENSIONS"]:
+        return error_response("unsupported file extension", 400)
+
+    upload_id = get_upload_sessions(current_app).create(filename, size, mimetype)
+    response = jsonify({"id": upload_id, "offset": 0, "size": size})
+    response.headers["Location"] = f"{request.path}/{upload_id}"
+    return response, 201
+
+
+@api_bp.route("/uploads/<upload_id>", methods=["HEAD", "PATCH", "DELETE"])
+@limiter.limit(upload_chunk_limit)
+def api_upload_chunk(upload_id):
+    sessions = get_upload_sessions(current_app)
+    if request.method == "DELETE":
+        sessions.info(upload_id)
+        sessions.discard(upload_id)
+        return ("", 204)
+    if request.method == "HEAD":
+        return _upload_offset_response(sessions.info(upload_id))
+
+    offset = request.headers.get("Upload-Offset", type=int)
+    if offset is None or offset < 0:
+        return error_response("Upload-Offset header is required", 400)
+    checksum = _chunk_checksum(request.headers.get("Upload-Checksum"))
+    with timed("dashboard_upload_processing_seconds", {"stage": "chunk"}, timing="upload"):
+        new_offset = sessions.append(upload_id, offset, _request_blocks(), checksum)
+    response = current_app.response_class(status=204)
+    response.headers["Upload-Offset"] = str(new_offset)
+    return response
+
+
+@api_bp.route("/uploads/<upload_id>/finalize", methods=["POST"])
+@limiter.limit(upload_limit)
+def api_finalize_upload(upload_id):
+    if "respond-async" not in request.headers.get("Prefer", ""):
+        return jsonify({"url": _finalize_upload(upload_id)})
+    # Hashing and decoding a large image continue in a job; the client polls Location.
+    get_upload_sessions(current_app).info(upload_id)
+    job = get_jobs(current_app._get_current_object()).enqueue(
+        "finalize_upload", {"upload_id": upload_id}, priority=10, key=f"finalize:{upload_id}"
+    )
+    response = jsonify(job)
+    response.headers["Location"] = f"{request.path.rsplit('/uploads/', 1)[0]}/jobs/{job['id']}"
+    return response, 202
+
+
+def _finalize_upload(upload_id: str) -> str:
+    """Validate a completed upload and make it the background; returns its URL."""
+    sessions = get_upload_sessions(current_app)
+    with timed("dashboard_upload_processing_seconds", {"stage": "hash"}, timing="upload"):
+        path, meta, digest = sessions.complete(upload_id)
+
+    ext = Path(meta["filename"]).suffix.lower()
+    with timed("dashboard_upload_processing_seconds", {"stage": "inspect"}, timing="upload"):
+        with open(path, "rb") as stream:
+            image = _inspect_image(stream)
+    error = _image_error(image, ext, meta["mimetype"])
+    if error:
+        sessions.discard(upload_id)
+        raise UploadError(error)
+
+    # Named by content hash: re-uploading the same image reuses the name. Boards
+    # share UPLOAD_DIR, so the slug keeps one board's removals off another's file.
+    slug = g.get("board_slug")
+    safe_name = _background_name(meta["filename"], f"{slug}-{digest[:16]}" if slug else digest[:16])
+    upload_dir = Path(current_app.config["UPLOAD_DIR"])
+    with timed("dashboard_upload_processing_seconds", {"stage": "save"}, timing="upload"):
+        try:
+            move_into(path, upload_dir, safe_name)
+        except FileNotFoundError:
+            # A concurrent finalize of the same upload already moved it.
+            raise UploadError("upload not found", 404) from None
+    sessions.discard(upload_id)
+    return _use_background(safe_name)
+
+
+@handler("finalize_upload", max_attempts=3)
+def _finalize_upload_job(payload: dict) -> dict:
+    try:
+        return {"url": _finalize_upload(payload["upload_id"])}
+    except UploadError as err:
+        raise JobError(err.message) from None
+
+
+@api_bp.route("/jobs/<int:job_id>", methods=["GET"])
+def api_job(job_id):
+    job = get_jobs(current_app._get_current_object()).get(job_id)
+    if job is None or job["board"] != g.get("board_slug"):
+        return error_response("job not found", 404)
+    response = jsonify(job)
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@api_bp.errorhandler(UploadError)
+def handle_upload_error(err):
+    response, status = error_response(err.message, status=err.status)
+    if err.offset is not None:
+        response.headers["Upload-Offset"] = str(err.offset)
+    return response, status
 
 
 @api_bp.route("/settings/bg", methods=["DELETE"])
 @limiter.limit(mutation_limit)
 def api_reset_bg():
-    upload_dir = Path(current_app.config["UPLOAD_DIR"])
     prev_url = settings_repo.clear_background()
-    _remove_old_background_file(prev_url, upload_dir)
+    _schedule_removal(prev_url)
     return ("", 204)
 
 
-def _remove_old_background_file(prev_url: str | None, upload_dir: Path) -> None:
+def _use_background(safe_name: str) -> str:
+    url = f"/static/uploads/{safe_name}"
+    prev_url = settings_repo.set_background(url)
+    if prev_url != url:
+        _schedule_removal(prev_url)
+    return url
+
+
+def _background_name(filename: str, suffix: str) -> str:
+    original = Path(secure_filename(filename))
+    stem = original.stem[:50] or "bg"
+    return f"{stem}_{suffix}{Path(filename).suffix.lower()}"
+
+
+def _upload_offset_response(meta: dict):
+    response = current_app.response_class(status=200)
+    response.headers["Upload-Offset"] = str(meta["offset"])
+    response.headers["Upload-Length"] = str(meta["size"])
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def _chunk_checksum(header: str | None) -> bytes | None:
+    # tus checksum extension: "sha256 <base64 digest>".
+    if not header:
+        return None
+    algorithm, _, value = header.partition(" ")
+    if algorithm.lower() != "sha256":
+        raise UploadError("unsupported checksum algorithm")
+    try:
+        return base64.b64decode(value, validate=True)
+    except ValueError:
+        raise UploadError("invalid checksum") from None
+
+
+def _request_blocks():
+    # Read the body in fixed blocks; werkzeug bounds the stream by Content-Length.
+    stream = request.stream
+    while block := stream.read(UPLOAD_BLOCK_SIZE):
+        yield block
+
+
+def _schedule_removal(prev_url: str | None) -> None:
+    if prev_url and prev_url.startswith("/static/uploads/"):
+        get_jobs(current_app._get_current_object()).enqueue(
+            "remove_upload", {"url": prev_url}, priority=-10
+        )
+
+
+@handler("remove_upload")
+def _remove_upload_job(payload: dict) -> dict:
+    # Content-hash names are reused within a board: the file may have become its
+    # background again. Other boards never share the name (see _finalize_upload).
+    settings = settings_repo.get()
+    if settings is not None and settings.dashboard_bg_image == payload["url"]:
+        return {"removed": False}
+    upload_dir = Path(current_app.config["UPLOAD_DIR"])
+    return {"removed": _remove_old_background_file(payload["url"], upload_dir)}
+
+
+def _remove_old_background_file(prev_url: str | None, upload_dir: Path) -> bool:
     if not prev_url or not prev_url.startswith("/static/uploads/"):
-        return
+        return False
     prev_name = Path(prev_url).name
     prev_path = upload_dir / prev_name
     if prev_path.exists() and prev_path.is_file():
         os.remove(prev_path)
+        return True
+    return False
 
 
-def _inspect_image(file) -> tuple[str | None, int, int]:
+def _inspect_image(stream) -> tuple[str | None, int, int]:
+    # Pillow is only needed for uploads; keep it out of worker start-up.
+    from PIL import Image, UnidentifiedImageError
+
     try:
-        file.stream.seek(0)
-        with Image.open(file.stream) as img:
+        stream.seek(0)
+        with Image.open(stream) as img:
             fmt = (img.format or "").upper()
             width, height = img.size
             img.load()
-        file.stream.seek(0)
+        stream.seek(0)
         return fmt, width, height
     except (UnidentifiedImageError, OSError):
-        file.stream.seek(0)
+        stream.seek(0)
         return None, 0, 0
+
+
+def _image_error(image: tuple[str | None, int, int], ext: str, client_mime: str) -> str | None:
+    """Why an inspected upload is rejected, or ``None`` if it is acceptable."""
+    image_format, width, height = image
+    if not image_format:
+        return "invalid image content"
+    expected_mime = FORMAT_TO_MIME.get(image_format)
+    accepted_mimes = FORMAT_MIME_ALIASES.get(image_format, {expected_mime})
+    expected_exts = FORMAT_TO_EXTS.get(image_format, set())
+    if expected_mime not in current_app.config["ALLOWED_UPLOAD_MIMETYPES"]:
+        return "unsupported image format"
+    # Browsers may send aliases (image/jpg, image/pjpeg) or generic
+    # application/octet-stream; rely on decoded content + extension in that case.
+    client_mime = (client_mime or "").lower()
+    if (
+        client_mime
+        and client_mime != "application/octet-stream"
+        and client_mime not in accepted_mimes
+    ):
+        return "mime type does not match image content"
+    if ext not in expected_exts:
+        return "file extension does not match image content"
+    if (
+        width > current_app.config["MAX_IMAGE_WIDTH"]
+        or height > current_app.config["MAX_IMAGE_HEIGHT"]
+    ):
+        return "image dimensions exceed allowed limit"
+    return None
@@ -0,0 +1,10 @@
+from flask import Blueprint, Response, current_app
+
+from app.metrics import collect
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    return Response(collect(current_app), mimetype="text/plain; version=0.0.4")
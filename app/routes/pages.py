@@ -1,8 +1,49 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, render_template, send_from_directory
+
+from app.repositories import SettingsRepository
+from app.shards import use_board
+from app.theme import theme_href, theme_response
 
 pages_bp = Blueprint("pages", __name__)
 
+settings_repo = SettingsRepository()
+
+
+def _render_index(prefix: str):
+    settings = settings_repo.get()
+    title = settings.dashboard_title if settings else "Start Dashboard"
+    return render_template(
+        "index.html", api_base=f"{prefix}/api", theme_href=theme_href(prefix), title=title
+    )
+
 
 @pages_bp.route("/")
 def index():
-    return render_template("index.html")
+    return _render_index("")
+
+
+@pages_bp.route("/b/<board>/")
+def board_index(board):
+    use_board(board)
+    return _render_index(f"/b/{board}")
+
+
+@pages_bp.route("/theme.css")
+def theme():
+    return theme_response()
+
+
+@pages_bp.route("/b/<board>/theme.css")
+def board_theme(board):
+    use_board(board)
+    return theme_response()
+
+
+@pages_bp.route("/sw.js")
+def service_worker():
+    # Served from the root so the worker's scope covers the whole site.
+    response = send_from_directory(
+        current_app.static_folder, "sw.js", mimetype="application/javascript", max_age=0
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    return response
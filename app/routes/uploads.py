@@ -0,0 +1,62 @@
+import mimetypes
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from flask import Blueprint, abort, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.utils import send_from_directory
+
+uploads_bp = Blueprint("uploads", __name__)
+
+SERVE_MODES = ("sendfile", "x-sendfile", "x-accel")
+
+
+@uploads_bp.route("/static/uploads/<path:filename>")
+def serve_upload(filename):
+    """Uploaded backgrounds from ``UPLOAD_DIR``; takes precedence over ``/static``.
+
+    Upload names are unique (random or content hash), so responses are cached
+    as immutable. ``UPLOAD_SERVE_MODE`` picks who moves the bytes:
+
+    - ``sendfile``: the WSGI server's file wrapper (zero-copy ``sendfile`` under
+      gunicorn), with ranges and conditional requests handled by werkzeug;
+    - ``x-sendfile``: an ``X-Sendfile`` header with the absolute path
+      (Apache ``mod_xsendfile``, lighttpd);
+    - ``x-accel``: an ``X-Accel-Redirect`` to ``UPLOAD_ACCEL_PREFIX`` (nginx
+      ``internal`` location). Python only checks the path.
+    """
+    config = current_app.config
+    upload_dir = Path(config["UPLOAD_DIR"])
+    mode = config["UPLOAD_SERVE_MODE"]
+    max_age = config["UPLOAD_CACHE_MAX_AGE"]
+
+    if mode == "x-accel":
+        path = safe_join(str(upload_dir), filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response = current_app.response_class(mimetype=mimetype)
+        prefix = config["UPLOAD_ACCEL_PREFIX"].rstrip("/")
+        response.headers["X-Accel-Redirect"] = f"{prefix}/{quote(filename)}"
+        # nginx keeps Content-Type and Cache-Control from this response.
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response = send_from_directory(
+            upload_dir,
+            filename,
+            request.environ,
+            max_age=max_age,
+            use_x_sendfile=mode == "x-sendfile",
+            response_class=current_app.response_class,
+        )
+    response.cache_control.immutable = True
+    return response
+
+
+@uploads_bp.record_once
+def check_serve_mode(state):
+    mode = state.app.config["UPLOAD_SERVE_MODE"]
+    if mode not in SERVE_MODES:
+        raise ValueError(f"UPLOAD_SERVE_MODE must be one of {', '.join(SERVE_MODES)}: {mode!r}")
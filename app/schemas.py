@@ -0,0 +1,80 @@
+"""Request payload schemas, compiled once at import (see ``app.validators.Schema``)."""
+
+from app.validators import Float, HexColor, Int, ListOf, Schema, String, Url
+
+CARD_CREATE = Schema(
+    {
+        "title": String(max_len=200, required=True),
+        "column_id": Int(min_value=1, required=True),
+        "link": Url(max_len=2048, default=""),
+        "description": String(max_len=2000, default=""),
+        "icon": Url(max_len=2048, default=""),
+    },
+    message="invalid card payload",
+)
+
+# POST /api/card?unfurl=1: blank fields are filled from the link preview.
+CARD_CREATE_UNFURL = Schema(
+    {**CARD_CREATE.fields, "title": String(max_len=200, default="")},
+    message="invalid card payload",
+)
+
+CARD_UPDATE = Schema(
+    {
+        "title": String(max_len=200),
+        "column_id": Int(min_value=1),
+        "link": Url(max_len=2048),
+        "description": String(max_len=2000),
+        "icon": Url(max_len=2048),
+    },
+    message="invalid card payload",
+)
+
+COLUMN = Schema({"name": String(max_len=120, required=True)}, message="invalid column payload")
+
+CARD_TAGS = Schema(
+    {"tags": ListOf(String(max_len=64, required=True), max_items=50, required=True)},
+    message="invalid tags payload",
+)
+
+# Drops send the whole column, and virtualized columns hold many thousands of
+# cards; MAX_CONTENT_LENGTH still bounds the body.
+REORDER = Schema(
+    {"order": ListOf(Int(), max_items=100_000, required=True)},
+    message="invalid reorder payload",
+)
+
+SETTINGS_UPDATE = Schema(
+    {
+        "dashboard_title": String(max_len=120),
+        "dashboard_bg_image": Url(max_len=2048),
+        "cols_per_row": Int(min_value=1, max_value=10),
+        "column_width": Int(min_value=200, max_value=1200),
+        "card_height": Int(min_value=0, max_value=2000),
+        "column_bg_color": HexColor(),
+        "column_bg_opacity": Float(min_value=0.0, max_value=1.0),
+        "card_bg_color": HexColor(),
+        "card_bg_opacity": Float(min_value=0.0, max_value=1.0),
+    },
+    message="invalid settings payload",
+    unknown="reject",
+    unknown_message="unsupported settings fields",
+)
+
+UPLOAD_CREATE = Schema(
+    {
+        "filename": String(max_len=255, required=True),
+        "size": Int(min_value=1, required=True),
+        "mimetype": String(max_len=100, default=""),
+    },
+    message="invalid upload payload",
+)
+
+BOARD_CREATE = Schema({"slug": String(max_len=63, required=True)})
+
+UNFURL = Schema({"url": Url(max_len=2048, required=True)}, message="invalid unfurl request")
+
+UNFURL_BATCH = Schema(
+    {"urls": ListOf(Url(max_len=2048, required=True), max_items=100, required=True)},
+    message="invalid unfurl request",
+)
@@ -1,4 +1,28 @@
-from flask import Flask, request
+import hmac
+from functools import wraps
+
+from flask import Flask, current_app, request
+
+from app.errors import error_response
+
+
+def admin_required(view):
+    """Guard an admin view with ``Authorization: Bearer <ADMIN_TOKEN>``.
+
+    Admin endpoints are hidden (404) while no ``ADMIN_TOKEN`` is configured.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get("ADMIN_TOKEN")
+        if not token:
+            return error_response("not found", 404)
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {token}"):
+            return error_response("unauthorized", 401)
+        return view(*args, **kwargs)
+
+    return wrapper
 
 
 def register_security(app: Flask) -> None:
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from flask import Flask, abort, current_app, g
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+try:  # POSIX only; without it concurrent first opens rely on Alembic being idempotent.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+EXTENSION_KEY = "board_shards"
+ROOT = Path(__file__).resolve().parent.parent
+SLUG_RE = re.compile(r"^[a-z0-9][a-z0-9-]{0,62}$")
+
+
+class ShardRegistry:
+    """Per-board SQLite files (``<directory>/<slug>.db``) behind an LRU of engines.
+
+    At most ``max_open`` engines are kept; the least recently used one is
+    disposed when another board is opened, which bounds open file handles to
+    roughly ``max_open * pool_size``. A board file is brought to the Alembic
+    head the first time this process opens it, under a per-file ``flock`` so
+    concurrent workers migrate it once. Every board has its own file and so
+    its own SQLite write lock.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_open: int,
+        pool_size: int,
+        on_open: Callable[[Engine], None] | None = None,
+    ):
+        self.directory = Path(directory)
+        self.max_open = max_open
+        self.pool_size = pool_size
+        self.on_open = on_open
+        self._engines: OrderedDict[str, Engine] = OrderedDict()
+        self._lock = threading.Lock()
+        self._head: str | None = None
+
+    def path(self, slug: str) -> Path:
+        return self.directory / f"{slug}.db"
+
+    def exists(self, slug: str) -> bool:
+        return bool(SLUG_RE.match(slug)) and self.path(slug).is_file()
+
+    def slugs(self) -> list[str]:
+        return sorted(path.stem for path in self.directory.glob("*.db") if SLUG_RE.match(path.stem))
+
+    def create(self, slug: str) -> bool:
+        """Create and migrate a new board file; False if it already exists."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            self.path(slug).touch(exist_ok=False)
+        except FileExistsError:
+            return False
+        self._migrate(slug)
+        return True
+
+    def engine(self, slug: str) -> Engine | None:
+        with self._lock:
+            engine = self._engines.get(slug)
+            if engine is not None:
+                self._engines.move_to_end(slug)
+                return engine
+        if not self.exists(slug):
+            return None
+
+        engine = create_engine(
+            f"sqlite:///{self.path(slug)}", pool_size=self.pool_size, max_overflow=self.pool_size
+        )
+        if self._revision(engine) != self.head():
+            self._migrate(slug)
+        if self.on_open is not None:
+            self.on_open(engine)
+
+        with self._lock:
+            current = self._engines.setdefault(slug, engine)
+            self._engines.move_to_end(slug)
+            evicted = []
+            while len(self._engines) > self.max_open:
+                evicted.append(self._engines.popitem(last=False)[1])
+        if current is not engine:
+            evicted.append(engine)  # another thread opened it first
+        for stale in evicted:
+            # Checked-out connections stay usable; idle ones are closed now.
+            stale.dispose()
+        return current
+
+    def dispose_all(self) -> None:
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose()
+
+    def head(self) -> str:
+        if self._head is None:
+            from alembic.script import ScriptDirectory
+
+            self._head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+        return self._head
+
+    def _revision(self, engine: Engine) -> str | None:
+        with engine.connect() as conn:
+            if not conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alembic_version'"
+            ).first():
+                return None
+            return conn.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+
+    def _migrate(self, slug: str) -> None:
+        from alembic import command
+
+        path = self.path(slug)
+        cfg = _alembic_config()
+        cfg.attributes["sqlalchemy.url"] = f"sqlite:///{path}"
+        with open(path.with_name(f"{path.name}.lock"), "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            command.upgrade(cfg, "head")  # no-op if another worker got here first
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    # Running inside the app: keep the app's logging configuration.
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def get_shards(app: Flask) -> ShardRegistry | None:
+    if not app.config.get("BOARDS_ENABLED"):
+        return None
+    shards = app.extensions.get(EXTENSION_KEY)
+    if shards is None:
+        from app.metrics import instrument_engine
+
+        shards = app.extensions.setdefault(
+            EXTENSION_KEY,
+            ShardRegistry(
+                app.config["BOARDS_DIR"],
+                max_open=app.config["BOARDS_MAX_OPEN"],
+                pool_size=app.config["BOARDS_POOL_SIZE"],
+                on_open=instrument_engine if app.config.get("METRICS_ENABLED", True) else None,
+            ),
+        )
+    return shards
+
+
+def use_board(slug: str) -> None:
+    """Point ``db.session`` in the current app context at a board's database."""
+    shards = get_shards(current_app)
+    engine = shards.engine(slug) if shards is not None and SLUG_RE.match(slug) else None
+    if engine is None:
+        abort(404)
+    g.board_slug = slug
+    g.db_engine = engine
@@ -0,0 +1,104 @@
+"""Theme stylesheet rendered from the settings row.
+
+The same custom properties ``applySettingsToDom`` sets at runtime, so the
+page gets its final layout from the first style pass. ``/theme.css?v=<rev>``
+is immutable: a settings change bumps the revision and therefore the URL.
+"""
+
+from flask import current_app, request
+
+from app.cache import revision_etag
+from app.repositories import SettingsRepository
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Text colours picked for light ("dark" text) and dark ("light" text) cards.
+CARD_TEXT = {
+    "dark": {
+        "--card-text-color": "#0f172a",
+        "--card-text-muted": "#475569",
+        "--card-link-color": "#2563eb",
+        "--card-menu-color": "#1f2937",
+    },
+    "light": {
+        "--card-text-color": "#f1f5f9",
+        "--card-text-muted": "#cbd5e1",
+        "--card-link-color": "#60a5fa",
+        "--card-menu-color": "#e0e7ff",
+    },
+}
+
+settings_repo = SettingsRepository()
+
+
+def theme_css(settings: dict) -> str:
+    card_height = settings["card_height"]
+    props = {
+        "--cols-per-row": str(settings["cols_per_row"]),
+        "--column-width": f"{settings['column_width']}px",
+        "--card-height": f"{card_height}px" if card_height > 0 else "auto",
+        "--column-bg": _rgba(settings["column_bg_color"], settings["column_bg_opacity"]),
+        "--card-bg": _rgba(settings["card_bg_color"], settings["card_bg_opacity"]),
+        **CARD_TEXT[_contrast_text(settings["card_bg_color"])],
+    }
+    lines = [":root {", *(f"  {name}: {value};" for name, value in props.items()), "}"]
+
+    image = (settings.get("dashboard_bg_image") or "").strip()
+    if image:
+        # Same effect as the #bg.has-custom-bg rules the settings preview uses.
+        lines += [
+            "#bg {",
+            f"  background: url({_css_string(image)}) center center / cover no-repeat fixed;",
+            "  animation: none;",
+            "}",
+            "#bg::before {",
+            "  display: none;",
+            "}",
+            "#bg::after {",
+            "  opacity: 0.3;",
+            "}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def theme_href(prefix: str = "") -> str:
+    """Fingerprinted stylesheet URL for the current settings revision."""
+    return f"{prefix}/theme.css?v={settings_repo.revision()}"
+
+
+def theme_response():
+    revision = settings_repo.revision()
+    settings = settings_repo.get()
+    css = theme_css(settings.to_dict()) if settings else ""
+    response = current_app.response_class(css, mimetype="text/css")
+    response.set_etag(revision_etag("theme", revision))
+    # Only the URL naming the current revision may be cached forever; an older
+    # fingerprint (e.g. from a cached page) gets the current theme, revalidated.
+    if request.args.get("v") == str(revision):
+        response.headers["Cache-Control"] = IMMUTABLE
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def _rgba(color: str, opacity: float) -> str:
+    red, green, blue = _hex_to_rgb(color)
+    return f"rgba({red}, {green}, {blue}, {float(opacity):g})"
+
+
+def _hex_to_rgb(color: str) -> tuple[int, int, int]:
+    value = color.lstrip("#")
+    if len(value) == 3:
+        value = "".join(ch * 2 for ch in value)
+    number = int(value, 16)
+    return (number >> 16) & 255, (number >> 8) & 255, number & 255
+
+
+def _contrast_text(color: str) -> str:
+    red, green, blue = _hex_to_rgb(color)
+    return "dark" if red * 0.299 + green * 0.587 + blue * 0.114 > 128 else "light"
+
+
+def _css_string(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return '"' + "".join(ch for ch in escaped if ch not in "\r\n\f") + '"'
@@ -0,0 +1,402 @@
+"""Link previews: page title, description and icon for a URL (``UNFURL_ENABLED``).
+
+A page is read in ``BLOCK_SIZE`` blocks and parsed as it arrives; reading
+stops at ``</head>`` (or ``<body>``), so a large page costs about as much as
+its head. The network is reached only through a *fetcher*, a callable
+``fetch(url, timeout, max_bytes) -> FetchResult``; tests pass their own.
+
+Results, failures included, are stored in a SQLite file shared by all workers,
+kept for ``ttl`` seconds (``error_ttl`` for failures) and evicted least
+recently used first beyond ``max_entries``. Concurrent lookups of one URL in a
+process share a single fetch.
+"""
+
+from __future__ import annotations
+
+import codecs
+import http.client
+import ipaddress
+import json
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from flask import Flask
+
+from app.metrics import registry
+
+EXTENSION_KEY = "unfurler"
+BLOCK_SIZE = 16 * 1024
+MAX_TEXT = 2000
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+# Evict in batches: one DELETE per this many inserts rather than one per insert.
+EVICT_EVERY = 64
+
+
+class UnfurlError(Exception):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str  # after redirects
+    content_type: str
+    charset: str | None
+    blocks: Iterator[bytes]
+    close: Callable[[], None] | None = None
+
+
+Fetcher = Callable[[str, float, int], FetchResult]
+
+
+class _HeadParser(HTMLParser):
+    """Collects title, description and icon links; stops at the end of ``<head>``."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self.title = ""
+        self.meta: dict[str, str] = {}
+        self.icons: list[tuple[str, str]] = []
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:  # the rest of the block that contained </head>
+            return
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key in {"og:title", "og:description", "description", "twitter:description"}:
+                self.meta.setdefault(key, attrs.get("content", ""))
+        elif tag == "link" and attrs.get("href"):
+            rel = attrs.get("rel", "").lower().split()
+            if "icon" in rel or "apple-touch-icon" in rel:
+                self.icons.append((" ".join(rel), attrs["href"]))
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_title and len(self.title) < MAX_TEXT:
+            self.title += data
+
+
+def parse_head(result: FetchResult, max_bytes: int) -> dict:
+    """Title, description and absolute icon URL from the page's ``<head>``."""
+    parser = _HeadParser()
+    decoder = codecs.getincrementaldecoder(_codec(result.charset))(errors="replace")
+    received = 0
+    for block in result.blocks:
+        received += len(block)
+        parser.feed(decoder.decode(block))
+        if parser.done or received >= max_bytes:
+            break
+    meta = parser.meta
+    title = " ".join((meta.get("og:title") or parser.title).split())
+    description = " ".join(
+        (
+            meta.get("og:description")
+            or meta.get("description")
+            or meta.get("twitter:description")
+            or ""
+        ).split()
+    )
+    # Prefer a plain favicon over touch icons; fall back to the conventional path.
+    icons = sorted(parser.icons, key=lambda icon: "apple-touch-icon" in icon[0])
+    icon = urljoin(result.url, icons[0][1] if icons else "/favicon.ico")
+    return {
+        "url": result.url,
+        "title": title[:200],
+        "description": description[:MAX_TEXT],
+        "icon": icon if urlsplit(icon).scheme in {"http", "https"} else "",
+    }
+
+
+class Unfurler:
+    def __init__(
+        self,
+        cache_path: Path,
+        fetcher: Fetcher,
+        ttl: float,
+        error_ttl: float,
+        max_entries: int,
+        timeout: float,
+        max_bytes: int,
+        concurrency: int,
+    ):
+        self.cache_path = Path(cache_path)
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.concurrency = concurrency
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+
+    def unfurl(self, url: str) -> dict:
+        """Preview of ``url``; raises ``UnfurlError`` if the page could not be read."""
+        entry = self._cached(url)
+        if entry is None:
+            with self._lock:
+                future = self._inflight.get(url)
+                owner = future is None
+                if owner:
+                    future = self._inflight[url] = Future()
+            if owner:
+                try:
+                    entry = self._cached(url) or self._fetch(url)
+                    future.set_result(entry)
+                except BaseException as err:
+                    future.set_exception(err)
+                    raise
+                finally:
+                    with self._lock:
+                        del self._inflight[url]
+            else:
+                registry.inc(
+                    "dashboard_cache_requests_total", {"cache": "unfurl", "result": "shared"}
+                )
+                entry = future.result()
+        if "error" in entry:
+            raise UnfurlError(entry["error"])
+        return entry
+
+    def unfurl_many(self, urls: Iterable[str]) -> dict[str, dict]:
+        """Previews of many URLs, at most ``concurrency`` fetches at a time.
+
+        Failures are reported per URL as ``{"error": message}``.
+        """
+        urls = list(dict.fromkeys(urls))
+
+        def one(url: str) -> dict:
+            try:
+                return self.unfurl(url)
+            except UnfurlError as err:
+                return {"error": str(err)}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(urls)))) as pool:
+            return dict(zip(urls, pool.map(one, urls), strict=True))
+
+    def _fetch(self, url: str) -> dict:
+        started = time.perf_counter()
+        try:
+            entry, ttl = self._read(url), self.ttl
+        except (UnfurlError, OSError, ValueError, http.client.HTTPException) as err:
+            entry, ttl = {"error": str(err) or type(err).__name__}, self.error_ttl
+        registry.observe("dashboard_unfurl_seconds", time.perf_counter() - started)
+        self._store(url, entry, ttl)
+        return entry
+
+    def _read(self, url: str) -> dict:
+        result = self.fetcher(url, self.timeout, self.max_bytes)
+        try:
+            if result.content_type not in HTML_TYPES:
+                raise UnfurlError(f"not an HTML page ({result.content_type or 'unknown type'})")
+            return parse_head(result, self.max_bytes)
+        finally:
+            # Also when the parser stopped early: the rest of the body is never read.
+            if result.close is not None:
+                result.close()
+
+    def _cached(self, url: str) -> dict | None:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT data FROM unfurl_cache WHERE url = ? AND expires > ?", (url, now)
+        ).fetchone()
+        result = "hit" if row else "miss"
+        registry.inc("dashboard_cache_requests_total", {"cache": "unfurl", "result": result})
+        if row is None:
+            return None
+        conn.execute("UPDATE unfurl_cache SET used = ? WHERE url = ?", (now, url))
+        return json.loads(row[0])
+
+    def _store(self, url: str, entry: dict, ttl: float) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO unfurl_cache (url, data, expires, used) VALUES (?, ?, ?, ?)",
+            (url, json.dumps(entry), now + ttl, now),
+        )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 1
+        if evict:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then the least recently used beyond ``max_entries``."""
+        conn = self._conn()
+        conn.execute("DELETE FROM unfurl_cache WHERE expires <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM unfurl_cache WHERE url IN (SELECT url FROM unfurl_cache "
+            "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # One autocommit connection per thread; the file is shared by every worker.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.cache_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS unfurl_cache (url TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_unfurl_cache_used ON unfurl_cache (used)")
+            self._local.conn = conn
+        return conn
+
+
+def urllib_fetcher(allow_private: bool = False) -> Fetcher:
+    """Fetcher over ``urllib``; refuses non-public addresses unless ``allow_private``.
+
+    The address is checked where the socket is connected, for the first request
+    and every redirect alike, and the connection goes to the address that was
+    checked: a second DNS lookup (rebinding) cannot swap in a private one.
+    Proxies from the environment are not used, since they would be connected
+    to instead.
+    """
+
+    class CheckedRedirects(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, req, fp, code, msg, headers, newurl):
+            _check_target(newurl)
+            return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+    handlers: list = [CheckedRedirects]
+    if not allow_private:
+        handlers += [
+            urllib.request.ProxyHandler({}),
+            _PublicHTTPHandler(),
+            _PublicHTTPSHandler(),
+        ]
+    opener = urllib.request.build_opener(*handlers)
+
+    def fetch(url: str, timeout: float, max_bytes: int) -> FetchResult:
+        _check_target(url)
+        request = urllib.request.Request(
+            url, headers={"User-Agent": "StartDashboard/1.0 (link preview)", "Accept": "text/html"}
+        )
+        try:
+            response = opener.open(request, timeout=timeout)
+        except urllib.error.HTTPError as err:
+            raise UnfurlError(f"HTTP {err.code}") from None
+
+        def blocks() -> Iterator[bytes]:
+            read = 0
+            while read < max_bytes and (block := response.read(min(BLOCK_SIZE, max_bytes - read))):
+                read += len(block)
+                yield block
+
+        return FetchResult(
+            url=response.geturl(),
+            content_type=response.headers.get_content_type(),
+            charset=response.headers.get_content_charset(),
+            blocks=blocks(),
+            close=response.close,
+        )
+
+    return fetch
+
+
+def _check_target(url: str) -> None:
+    parts = urlsplit(url)
+    if parts.scheme not in {"http", "https"} or not parts.hostname:
+        raise UnfurlError("only http(s) URLs can be previewed")
+
+
+def _connect_public(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    """``socket.create_connection`` that only connects to public addresses."""
+    host, port = address
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise UnfurlError(f"cannot resolve {host}") from None
+    addresses = [info[4][0] for info in infos]
+    for ip in addresses:
+        if not ipaddress.ip_address(ip.split("%", 1)[0]).is_global:
+            raise UnfurlError(f"{host} is not a public address")
+    error: OSError | None = None
+    for ip in dict.fromkeys(addresses):
+        try:
+            return socket.create_connection((ip, port), timeout, source_address)
+        except OSError as err:
+            error = err
+    raise error or OSError(f"cannot connect to {host}")
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # connect() resolves through this hook; HTTPS keeps ``host`` for SNI and
+        # certificate checks, and the Host header still comes from the URL.
+        self._create_connection = _connect_public
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _connect_public
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+def _codec(charset: str | None) -> str:
+    try:
+        return codecs.lookup(charset or "utf-8").name
+    except LookupError:
+        return "utf-8"
+
+
+def get_unfurler(app: Flask) -> Unfurler | None:
+    if not app.config.get("UNFURL_ENABLED"):
+        return None
+    unfurler = app.extensions.get(EXTENSION_KEY)
+    if unfurler is None:
+        fetcher = app.config.get("UNFURL_FETCHER") or urllib_fetcher(
+            allow_private=app.config["UNFURL_ALLOW_PRIVATE"]
+        )
+        unfurler = app.extensions.setdefault(
+            EXTENSION_KEY,
+            Unfurler(
+                app.config["UNFURL_CACHE_PATH"],
+                fetcher,
+                ttl=app.config["UNFURL_TTL"],
+                error_ttl=app.config["UNFURL_ERROR_TTL"],
+                max_entries=app.config["UNFURL_CACHE_MAX_ENTRIES"],
+                timeout=app.config["UNFURL_TIMEOUT"],
+                max_bytes=app.config["UNFURL_MAX_BYTES"],
+                concurrency=app.config["UNFURL_CONCURRENCY"],
+            ),
+        )
+    return unfurler
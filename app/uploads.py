@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import errno
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from flask import Flask
+
+try:  # POSIX only; without it concurrent PATCHes of one upload are not rejected.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+EXTENSION_KEY = "upload_sessions"
+ID_LENGTH = 32
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, status: int = 400, offset: int | None = None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.offset = offset
+
+
+class UploadSessions:
+    """Resumable uploads assembled in ``<directory>/<id>.part``.
+
+    A session is created with the final size, then filled by appending chunks
+    at the current offset (the size of the part file), so an interrupted
+    transfer resumes from whatever reached the disk. Chunks are streamed in
+    ``BLOCK_SIZE`` blocks and hashed as they arrive; memory use does not depend
+    on the chunk or file size. State lives in files, so any worker can serve
+    any request of a session.
+
+    The SHA-256 of the whole upload is also kept up to date as chunks arrive,
+    so finalizing does not read the file again. hashlib state cannot be
+    written to disk, so it is held per process next to the offset it covers;
+    when a session moved between workers, ``complete`` hashes the file instead.
+    """
+
+    def __init__(self, directory: Path, max_size: int, ttl: float):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._digests: dict[str, tuple[int, hashlib._Hash]] = {}
+
+    def create(self, filename: str, size: int, mimetype: str) -> str:
+        if size <= 0:
+            raise UploadError("upload size must be positive")
+        if size > self.max_size:
+            raise UploadError("file too large", 413)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prune()
+        upload_id = secrets.token_hex(ID_LENGTH // 2)
+        meta = {"filename": filename, "size": size, "mimetype": mimetype, "created": time.time()}
+        self._meta_path(upload_id).write_text(json.dumps(meta), encoding="utf-8")
+        self._part_path(upload_id).touch()
+        return upload_id
+
+    def info(self, upload_id: str) -> dict:
+        """Session metadata plus the current ``offset``."""
+        if len(upload_id) != ID_LENGTH or not upload_id.isalnum():
+            raise UploadError("upload not found", 404)
+        try:
+            meta = json.loads(self._meta_path(upload_id).read_text(encoding="utf-8"))
+            meta["offset"] = self._part_path(upload_id).stat().st_size
+        except (OSError, ValueError):
+            raise UploadError("upload not found", 404) from None
+        return meta
+
+    def append(
+        self, upload_id: str, offset: int, blocks: Iterator[bytes], checksum: bytes | None = None
+    ) -> int:
+        """Write a chunk at ``offset``; returns the new offset.
+
+        The offset must match what is already stored (409 otherwise, with the
+        stored offset attached). With ``checksum`` (SHA-256 of the chunk) a
+        mismatching chunk is discarded. A chunk cut short by a dropped
+        connection is kept up to the last block received.
+        """
+        meta = self.info(upload_id)
+        with open(self._part_path(upload_id), "r+b") as handle:
+            if not _try_lock(handle):
+                raise UploadError("upload is busy", 409, meta["offset"])
+            current = os.fstat(handle.fileno()).st_size
+            if offset != current:
+                raise UploadError("offset does not match upload", 409, current)
+            handle.seek(current)
+            running = self._running_digest(upload_id, current)
+            base = running.copy() if running is not None else None
+            digest = hashlib.sha256()
+            stored = current
+            try:
+                for block in blocks:
+                    if stored + len(block) > meta["size"]:
+                        raise UploadError("chunk exceeds declared upload size", 413, current)
+                    digest.update(block)
+                    if running is not None:
+                        running.update(block)
+                    handle.write(block)
+                    stored += len(block)
+                if checksum is not None and digest.digest() != checksum:
+                    raise UploadError("checksum mismatch", 400, current)
+            except UploadError:
+                handle.truncate(current)
+                stored, running = current, base
+                raise
+            finally:
+                handle.flush()
+                if running is not None:
+                    self._digests[upload_id] = (stored, running)
+            return stored
+
+    def complete(self, upload_id: str) -> tuple[Path, dict, str]:
+        """Path, metadata and SHA-256 hex digest of a fully received upload."""
+        meta = self.info(upload_id)
+        if meta["offset"] != meta["size"]:
+            raise UploadError("upload is incomplete", 409, meta["offset"])
+        path = self._part_path(upload_id)
+        with open(path, "rb") as handle:
+            if not _try_lock(handle):
+                raise UploadError("upload is busy", 409, meta["offset"])
+            digest = self._running_digest(upload_id, meta["offset"])
+            if digest is None:
+                digest = hashlib.sha256()
+                while block := handle.read(BLOCK_SIZE):
+                    digest.update(block)
+        return path, meta, digest.hexdigest()
+
+    def discard(self, upload_id: str) -> None:
+        self._digests.pop(upload_id, None)
+        for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+            path.unlink(missing_ok=True)
+
+    def prune(self) -> None:
+        """Drop sessions older than ``ttl``."""
+        for upload_id in list(self._digests):
+            if not self._meta_path(upload_id).exists():
+                self._digests.pop(upload_id, None)
+        cutoff = time.time() - self.ttl
+        for meta_path in self.directory.glob("*.json"):
+            try:
+                if meta_path.stat().st_mtime < cutoff:
+                    self.discard(meta_path.stem)
+            except OSError:
+                continue
+
+    def _running_digest(self, upload_id: str, offset: int) -> hashlib._Hash | None:
+        """This process's digest of the first ``offset`` bytes, if it has one."""
+        stored, digest = self._digests.pop(upload_id, (0, None))
+        if digest is not None and stored == offset:
+            return digest
+        return hashlib.sha256() if offset == 0 else None
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.part"
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.json"
+
+
+def move_into(source: Path, directory: Path, name: str) -> Path:
+    """Move ``source`` to ``directory/name`` so the name appears atomically.
+
+    Falls back to copying into a hidden temp file next to the destination when
+    the two directories are on different filesystems.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    destination = directory / name
+    try:
+        os.replace(source, destination)
+    except OSError as err:
+        if err.errno != errno.EXDEV:
+            raise
+        staging = directory / f".{name}.tmp"
+        shutil.copyfile(source, staging)
+        os.replace(staging, destination)
+        source.unlink()
+    return destination
+
+
+def _try_lock(handle) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def get_upload_sessions(app: Flask) -> UploadSessions:
+    sessions = app.extensions.get(EXTENSION_KEY)
+    if sessions is None:
+        sessions = app.extensions.setdefault(
+            EXTENSION_KEY,
+            UploadSessions(
+                app.config["UPLOAD_TMP_DIR"],
+                max_size=app.config["UPLOAD_MAX_SIZE"],
+                ttl=app.config["UPLOAD_SESSION_TTL"],
+            ),
+        )
+    return sessions
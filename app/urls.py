@@ -0,0 +1,47 @@
+"""Canonical form of card links, used to find the same link added twice.
+
+Two links that lead to the same page should get the same key: scheme and host
+are lowercased, default ports and trailing slashes dropped, and tracking
+parameters (``utm_*``, ``fbclid``, ...) removed from the query. The remaining
+query keeps its order; anything else (path case, fragments) is left alone,
+since a server may well treat it as significant.
+"""
+
+from __future__ import annotations
+
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = frozenset(
+    {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga"}
+)
+TRACKING_PREFIXES = ("utm_",)
+
+
+def canonical_url(link: str) -> str:
+    """Duplicate-detection key for ``link``; ``""`` for an empty link."""
+    link = link.strip()
+    if not link:
+        return ""
+    try:
+        parts = urlsplit(link)
+        port = parts.port
+    except ValueError:
+        return link
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username is not None:
+        userinfo = parts.netloc.rpartition("@")[0]
+        host = f"{userinfo}@{host}"
+    path = parts.path.rstrip("/")
+    query = "&".join(param for param in parts.query.split("&") if param and not _is_tracking(param))
+    return urlunsplit((scheme, host, path, query, parts.fragment))
+
+
+def _is_tracking(param: str) -> bool:
+    name = param.split("=", 1)[0].lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
@@ -1,116 +1,314 @@
 import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Any
 from urllib.parse import urlparse
 
+HEX_COLOR_RE = re.compile(r"#[0-9a-fA-F]{6}")
+
 
 class ValidationError(Exception):
-    def __init__(self, message: str, status: int = 400):
+    def __init__(self, message: str, status: int = 400, details: dict | None = None):
         super().__init__(message)
         self.message = message
         self.status = status
+        self.details = details
+
+
+# A ``Schema`` describes a payload once; its constructor compiles the fields
+# into plain closures, so validating a request is one pass over the payload's
+# keys with no per-call setup. A checker returns the cleaned value or an
+# ``_Invalid`` holding every error below it, keyed by relative path; paths
+# (``cards[3].link``) and messages are only built when something failed, so
+# valid payloads cost no string formatting.
+
+UNSUPPORTED = "is not supported"
+# Per list: stop checking items after this many invalid ones.
+MAX_ITEM_ERRORS = 20
+# Fast path for ``Url``; anything else goes through ``urlparse``.
+PLAIN_URL_RE = re.compile(r"https?://[^/?#\s\[\]]+(?:[/?#]\S*)?")
+
+_MISSING = object()
+
+Checker = Callable[[Any], Any]
+
+
+class _Invalid:
+    __slots__ = ("errors",)
+
+    def __init__(self, errors: dict[str, str]):
+        self.errors = errors  # relative path -> message without the path
+
+
+def _fail(message: str) -> _Invalid:
+    return _Invalid({"": message})
+
+
+def _join(parent: str, child: str) -> str:
+    if not child:
+        return parent
+    return parent + child if child.startswith("[") else f"{parent}.{child}"
+
+
+class Field(ABC):
+    """One payload value; ``compile`` returns ``check(value) -> value | _Invalid``."""
+
+    # Optional strings treat an explicit null as absent.
+    null_is_missing = False
+
+    def __init__(self, *, required: bool = False, default: Any = _MISSING):
+        self.required = required
+        self.default = default
+
+    @abstractmethod
+    def compile(self) -> Checker:
+        """Build the checker; called once, when the enclosing ``Schema`` is created."""
+
+
+class String(Field):
+    """A string; stripped and non-empty when required, taken as is otherwise."""
+
+    null_is_missing = True
+
+    def __init__(self, *, max_len: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_len = max_len
+
+    def compile(self) -> Checker:
+        max_len = self.max_len if self.max_len is not None else float("inf")
+        required = self.required
+        not_string = _fail("must be a string")
+        empty = _fail("is required")
+        too_long = _fail(f"exceeds max length {self.max_len}")
+
+        def check(value):
+            if not isinstance(value, str):
+                return not_string
+            if required:
+                value = value.strip()
+                if not value:
+                    return empty
+            if len(value) > max_len:
+                return too_long
+            return value
+
+        return check
+
+
+class Url(String):
+    """An http(s) URL; the empty string is allowed when optional."""
+
+    def __init__(self, *, max_len: int = 1024, **kwargs):
+        super().__init__(max_len=max_len, **kwargs)
+
+    def compile(self) -> Checker:
+        string = super().compile()
+        plain = PLAIN_URL_RE.fullmatch
+        bad_scheme = _fail("must be an http/https URL")
+        bad_url = _fail("must be a valid URL")
+
+        def check(value):
+            value = string(value)
+            if type(value) is _Invalid or value == "" or plain(value):
+                return value
+            parsed = urlparse(value)
+            if parsed.scheme not in {"http", "https"}:
+                return bad_scheme
+            if not parsed.netloc:
+                return bad_url
+            return value
 
+        return check
 
-def require_dict(value, message="invalid JSON payload"):
-    if not isinstance(value, dict):
-        raise ValidationError(message)
-    return value
-
-
-def require_string(data: dict, key: str, max_len: int | None = None, min_len: int = 1) -> str:
-    value = data.get(key)
-    if not isinstance(value, str):
-        raise ValidationError(f"'{key}' must be a string")
-    value = value.strip()
-    if len(value) < min_len:
-        raise ValidationError(f"'{key}' is required")
-    if max_len is not None and len(value) > max_len:
-        raise ValidationError(f"'{key}' exceeds max length {max_len}")
-    return value
-
-
-def optional_string(data: dict, key: str, max_len: int | None = None) -> str | None:
-    value = data.get(key)
-    if value is None:
-        return None
-    if not isinstance(value, str):
-        raise ValidationError(f"'{key}' must be a string")
-    if max_len is not None and len(value) > max_len:
-        raise ValidationError(f"'{key}' exceeds max length {max_len}")
-    return value
-
-
-def require_int(
-    data: dict, key: str, min_value: int | None = None, max_value: int | None = None
-) -> int:
-    value = data.get(key)
-    try:
-        int_value = int(value)
-    except (TypeError, ValueError):
-        raise ValidationError(f"'{key}' must be an integer") from None
-    if min_value is not None and int_value < min_value:
-        raise ValidationError(f"'{key}' must be >= {min_value}")
-    if max_value is not None and int_value > max_value:
-        raise ValidationError(f"'{key}' must be <= {max_value}")
-    return int_value
-
-
-def optional_int(
-    data: dict, key: str, min_value: int | None = None, max_value: int | None = None
-) -> int | None:
-    if key not in data:
-        return None
-    return require_int(data, key, min_value=min_value, max_value=max_value)
-
-
-def optional_float(
-    data: dict, key: str, min_value: float | None = None, max_value: float | None = None
-) -> float | None:
-    if key not in data:
-        return None
-    value = data.get(key)
-    try:
-        float_value = float(value)
-    except (TypeError, ValueError):
-        raise ValidationError(f"'{key}' must be a number") from None
-    if min_value is not None and float_value < min_value:
-        raise ValidationError(f"'{key}' must be >= {min_value}")
-    if max_value is not None and float_value > max_value:
-        raise ValidationError(f"'{key}' must be <= {max_value}")
-    return float_value
-
-
-def optional_url(data: dict, key: str, max_len: int = 1024) -> str | None:
-    value = optional_string(data, key, max_len=max_len)
-    if value is None or value == "":
-        return value
-    parsed = urlparse(value)
-    if parsed.scheme not in {"http", "https"}:
-        raise ValidationError(f"'{key}' must be an http/https URL")
-    if not parsed.netloc:
-        raise ValidationError(f"'{key}' must be a valid URL")
-    return value
-
-
-def list_of_ints(data: dict, key: str, max_items: int = 1000) -> list[int]:
-    value = data.get(key)
-    if not isinstance(value, list):
-        raise ValidationError(f"'{key}' must be a list")
-    if len(value) > max_items:
-        raise ValidationError(f"'{key}' exceeds max size {max_items}")
-    items = []
-    for item in value:
+
+class Int(Field):
+    def __init__(self, *, min_value: int | None = None, max_value: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def compile(self) -> Checker:
+        return _number_checker(int, "an integer", self.min_value, self.max_value)
+
+
+class Float(Field):
+    def __init__(self, *, min_value: float | None = None, max_value: float | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def compile(self) -> Checker:
+        return _number_checker(float, "a number", self.min_value, self.max_value)
+
+
+class HexColor(Field):
+    """``#rrggbb``, returned lowercased."""
+
+    def compile(self) -> Checker:
+        fullmatch = HEX_COLOR_RE.fullmatch
+        not_string = _fail("must be a string")
+        not_color = _fail("must be a hex color like #ffffff")
+
+        def check(value):
+            if not isinstance(value, str):
+                return not_string
+            if not fullmatch(value):
+                return not_color
+            return value.lower()
+
+        return check
+
+
+class ListOf(Field):
+    """A list of up to ``max_items`` values, each checked by ``item``.
+
+    Unbounded ``Int`` items are converted in one pass and reported as a whole
+    (``'order' contains non-integer value``); other items get per-item paths.
+    """
+
+    def __init__(self, item: Field, *, max_items: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self.item = item
+        self.max_items = max_items
+
+    def compile(self) -> Checker:
+        check_item = self.item.compile()
+        max_items = self.max_items
+        not_list = _fail("must be a list")
+        too_many = _fail(f"exceeds max size {max_items}")
+        not_ints = _fail("contains non-integer value")
+        # Unbounded ints convert in one C-level pass.
+        plain_ints = (
+            type(self.item) is Int and self.item.min_value is None and self.item.max_value is None
+        )
+
+        def check(value):
+            if not isinstance(value, list):
+                return not_list
+            if len(value) > max_items:
+                return too_many
+            if plain_ints:
+                try:
+                    return list(map(int, value))
+                except (TypeError, ValueError):
+                    return not_ints
+            items = []
+            errors = None
+            for index, item in enumerate(value):
+                item = check_item(item)
+                if type(item) is _Invalid:
+                    errors = errors or {}
+                    for path, message in item.errors.items():
+                        errors[_join(f"[{index}]", path)] = message
+                    if len(errors) >= MAX_ITEM_ERRORS:
+                        break
+                items.append(item)
+            return items if errors is None else _Invalid(errors)
+
+        return check
+
+
+class Schema(Field):
+    """A JSON object with known ``fields``; ``load`` validates a request payload.
+
+    Absent optional fields are left out of the result (or set to their
+    ``default``). With ``unknown="reject"`` keys outside ``fields`` fail with
+    ``unknown_message`` and the sorted key list in ``details["fields"]``;
+    otherwise they are ignored.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, Field],
+        *,
+        message: str = "invalid JSON payload",
+        unknown: str = "ignore",
+        unknown_message: str = "unsupported fields",
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if unknown not in ("ignore", "reject"):
+            raise ValueError(f"unknown must be 'ignore' or 'reject', not {unknown!r}")
+        self.fields = fields
+        self.message = message
+        self.unknown = unknown
+        self.unknown_message = unknown_message
+        self._check = self.compile()
+
+    def compile(self) -> Checker:
+        checks = {
+            key: (field.compile(), field.null_is_missing and not field.required)
+            for key, field in self.fields.items()
+        }
+        required = [(key, checks[key][0]) for key, field in self.fields.items() if field.required]
+        defaults = {
+            key: field.default
+            for key, field in self.fields.items()
+            if field.default is not _MISSING
+        }
+        reject = self.unknown == "reject"
+        not_object = _fail("must be an object")
+
+        def check(value):
+            if not isinstance(value, dict):
+                return not_object
+            result = dict(defaults)
+            errors = None
+            for key, item in value.items():
+                entry = checks.get(key)
+                if entry is None:
+                    if reject:
+                        errors = errors or {}
+                        errors[key] = UNSUPPORTED
+                    continue
+                if item is None and entry[1]:
+                    continue
+                item = entry[0](item)
+                if type(item) is _Invalid:
+                    errors = errors or {}
+                    for path, message in item.errors.items():
+                        errors[_join(key, path)] = message
+                else:
+                    result[key] = item
+            for key, check_field in required:
+                if key not in value:
+                    errors = errors or {}
+                    for path, message in check_field(None).errors.items():
+                        errors[_join(key, path)] = message
+            return result if errors is None else _Invalid(errors)
+
+        return check
+
+    def load(self, payload) -> dict:
+        """Validated copy of ``payload``; raises ``ValidationError`` listing every error."""
+        if not isinstance(payload, dict):
+            raise ValidationError(self.message)
+        result = self._check(payload)
+        if type(result) is not _Invalid:
+            return result
+        unsupported = sorted(key for key in payload if result.errors.get(key) is UNSUPPORTED)
+        if unsupported:
+            raise ValidationError(self.unknown_message, details={"fields": unsupported})
+        errors = {path: f"'{path}' {message}" for path, message in result.errors.items()}
+        raise ValidationError(next(iter(errors.values())), details={"errors": errors})
+
+
+def _number_checker(kind: type, noun: str, min_value, max_value) -> Checker:
+    not_number = _fail(f"must be {noun}")
+    too_small = _fail(f"must be >= {min_value}")
+    too_large = _fail(f"must be <= {max_value}")
+    low = min_value if min_value is not None else float("-inf")
+    high = max_value if max_value is not None else float("inf")
+
+    def check(value):
         try:
-            items.append(int(item))
+            number = kind(value)
         except (TypeError, ValueError):
-            raise ValidationError(f"'{key}' contains non-integer value") from None
-    return items
-
-
-def optional_hex_color(data: dict, key: str) -> str | None:
-    if key not in data:
-        return None
-    value = data.get(key)
-    if not isinstance(value, str):
-        raise ValidationError(f"'{key}' must be a string")
-    if not re.fullmatch(r"#[0-9a-fA-F]{6}", value):
-        raise ValidationError(f"'{key}' must be a hex color like #ffffff")
-    return value.lower()
+            return not_number
+        if number < low:
+            return too_small
+        if number > high:
+            return too_large
+        return number
+
+    return check
@@ -0,0 +1,127 @@
+"""Write latency while an online backup of the board database is running.
+
+Fills a database with ``--cards`` cards, then adds cards through the API in a
+loop while a backup thread copies the file: not at all (baseline), in steps
+of ``--pages`` pages with ``--sleep-ms`` between them (what BackupManager
+does), and in one step (a plain copy holding the read lock throughout).
+
+    python benchmarks/backup_latency.py --cards 50000 --pages 256 --sleep-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from alembic.config import Config  # noqa: E402
+
+from alembic import command  # noqa: E402
+from app import create_app  # noqa: E402
+from app.backup import copy_database  # noqa: E402
+
+
+def migrate(db_path: Path) -> None:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(cfg, "head")
+
+
+def make_app(workdir: Path, db_path: Path):
+    return create_app(
+        "testing",
+        test_config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "UPLOAD_DIR": workdir / "uploads",
+            "PAYLOAD_CACHE_DIR": workdir / "cache",
+            "METRICS_ENABLED": False,
+            "RATELIMIT_ENABLED": False,
+        },
+    )
+
+
+def seed(db_path: Path, cards: int) -> int:
+    conn = sqlite3.connect(db_path)
+    col_id = conn.execute("INSERT INTO columns (name, position) VALUES ('Bulk', 0)").lastrowid
+    conn.executemany(
+        "INSERT INTO cards (column_id, title, link, description, position) VALUES (?, ?, ?, ?, ?)",
+        ((col_id, f"Card {i}", f"https://example.com/{i}", "x" * 200, i) for i in range(cards)),
+    )
+    conn.commit()
+    conn.close()
+    return col_id
+
+
+def run(workdir: Path, db_path: Path, col_id: int, mode: str, pages: int, sleep: float, n: int):
+    app = make_app(workdir, db_path)
+    client = app.test_client()
+    done = threading.Event()
+    backup_seconds = []
+
+    def backup():
+        while not done.is_set():
+            target = workdir / f"backup-{mode}.db"
+            target.unlink(missing_ok=True)
+            start = time.perf_counter()
+            if mode == "stepped":
+                copy_database(db_path, target, pages, sleep, max_restarts=1_000_000)
+            else:
+                copy_database(db_path, target, -1, 0, max_restarts=0)
+            backup_seconds.append(time.perf_counter() - start)
+
+    thread = threading.Thread(target=backup) if mode != "none" else None
+    if thread is not None:
+        thread.start()
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        res = client.post("/api/card", json={"title": f"Write {i}", "column_id": col_id})
+        latencies.append(time.perf_counter() - start)
+        assert res.status_code == 201, res.get_data(as_text=True)
+    done.set()
+    if thread is not None:
+        thread.join()
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "max": latencies[-1],
+        "backup": statistics.median(backup_seconds) if backup_seconds else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=50000)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=256)
+    parser.add_argument("--sleep-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        db_path = workdir / "data.db"
+        migrate(db_path)
+        col_id = seed(db_path, args.cards)
+        size = db_path.stat().st_size / 1024 / 1024
+        print(f"{args.writes} card inserts, {args.cards} cards ({size:.1f} MB)")
+        print(f"{'backup':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'copy s':>8}")
+        for mode in ("none", "stepped", "single"):
+            row = run(workdir, db_path, col_id, mode, args.pages, args.sleep_ms / 1000, args.writes)
+            print(
+                f"{mode:<10} {row['p50'] * 1000:>8.2f} {row['p99'] * 1000:>8.2f} "
+                f"{row['max'] * 1000:>8.2f} {row['backup']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
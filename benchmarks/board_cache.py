@@ -0,0 +1,134 @@
+"""Thundering herd on /api/state with and without the shared payload cache.
+
+``--workers`` forked processes (standing in for gunicorn workers) share one
+SQLite file with ``--cards`` cards. Each round the parent renames a column,
+then every worker fires ``--burst`` concurrent GETs at once. Reports how many
+times the board was serialized per write and the request latency.
+
+    python benchmarks/board_cache.py --workers 4 --cards 2000 --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from alembic.config import Config  # noqa: E402
+
+from alembic import command  # noqa: E402
+from app import create_app  # noqa: E402
+from app.routes import api  # noqa: E402
+
+
+def migrate(db_path: Path) -> None:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(cfg, "head")
+
+
+def make_app(workdir: Path, db_path: Path, cached: bool):
+    return create_app(
+        "testing",
+        test_config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "UPLOAD_DIR": workdir / "uploads",
+            "PAYLOAD_CACHE_ENABLED": cached,
+            "PAYLOAD_CACHE_DIR": workdir / "cache",
+            "METRICS_ENABLED": False,
+        },
+    )
+
+
+def worker(workdir, db_path, cached, rounds, burst, barrier, builds, results) -> None:
+    app = make_app(workdir, db_path, cached)
+    get_state = api.board_repo.get_state
+
+    def counted_get_state():
+        with builds.get_lock():
+            builds.value += 1
+        return get_state()
+
+    api.board_repo.get_state = counted_get_state
+
+    def fetch(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        assert client.get("/api/state").status_code == 200
+        return time.perf_counter() - start
+
+    latencies = []
+    with ThreadPoolExecutor(max_workers=burst) as pool:
+        for _ in range(rounds):
+            barrier.wait()  # parent has written
+            latencies.extend(pool.map(fetch, range(burst)))
+            barrier.wait()  # round done
+    results.put(latencies)
+
+
+def run(workdir: Path, cached: bool, workers: int, cards: int, rounds: int, burst: int) -> dict:
+    db_path = workdir / f"herd_{cached}.db"
+    migrate(db_path)
+    app = make_app(workdir, db_path, cached)
+    client = app.test_client()
+    col_id = client.post("/api/column", json={"name": "Herd"}).get_json()["id"]
+    for i in range(cards):
+        client.post("/api/card", json={"title": f"Card {i}", "column_id": col_id})
+
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(workers + 1)
+    builds = ctx.Value("i", 0)
+    results = ctx.Queue()
+    args = (workdir, db_path, cached, rounds, burst, barrier, builds, results)
+    procs = [ctx.Process(target=worker, args=args) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    for i in range(rounds):
+        client.put(f"/api/column/{col_id}", json={"name": f"Herd {i}"})
+        barrier.wait()
+        barrier.wait()
+    latencies = [value for _ in procs for value in results.get()]
+    for proc in procs:
+        proc.join()
+    latencies.sort()
+    return {
+        "builds": builds.value / rounds,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--burst", type=int, default=4)
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{args.workers} workers x {args.burst} concurrent GETs after each of "
+        f"{args.rounds} writes, {args.cards} cards"
+    )
+    print(f"{'mode':<10} {'builds/write':>13} {'p50 ms':>8} {'p95 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for cached in (False, True):
+            row = run(Path(tmp), cached, args.workers, args.cards, args.rounds, args.burst)
+            label = "shared" if cached else "uncached"
+            print(
+                f"{label:<10} {row['builds']:>13.1f} {row['p50'] * 1000:>8.2f} "
+                f"{row['p95'] * 1000:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Mutation throughput with and without the group-commit writer.
+
+``--threads`` clients each add ``--ops`` cards and reorder their column after
+every add, against a fresh migrated SQLite file, first with per-request
+commits and then with ``GROUP_COMMIT_ENABLED``.
+
+    python benchmarks/group_commit.py --threads 8 --ops 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from alembic.config import Config  # noqa: E402
+
+from alembic import command  # noqa: E402
+from app import create_app  # noqa: E402
+from app.metrics import registry  # noqa: E402
+
+
+def migrate(db_path: Path) -> None:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(cfg, "head")
+
+
+def commit_count() -> int:
+    for item in registry.snapshot()["histograms"]:
+        if item["name"] == "dashboard_db_commit_duration_seconds":
+            return item["count"]
+    return 0
+
+
+def run(workdir: Path, enabled: bool, threads: int, ops: int, window_ms: float) -> dict:
+    db_path = workdir / f"group_{enabled}.db"
+    migrate(db_path)
+    app = create_app(
+        "testing",
+        test_config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "UPLOAD_DIR": workdir / "uploads",
+            "GROUP_COMMIT_ENABLED": enabled,
+            "GROUP_COMMIT_WINDOW_MS": window_ms,
+        },
+    )
+    columns = [
+        app.test_client().post("/api/column", json={"name": f"Bench {i}"}).get_json()["id"]
+        for i in range(threads)
+    ]
+    registry.reset()
+    barrier = threading.Barrier(threads)
+
+    def worker(col_id: int) -> int:
+        client = app.test_client()
+        order: list[int] = []
+        barrier.wait()
+        for i in range(ops):
+            res = client.post("/api/card", json={"title": f"Card {i}", "column_id": col_id})
+            order.insert(0, res.get_json()["id"])
+            client.post(f"/api/column/{col_id}/reorder-cards", json={"order": order})
+        return ops * 2
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        total = sum(pool.map(worker, columns))
+    elapsed = time.perf_counter() - start
+    return {"ops": total, "seconds": elapsed, "commits": commit_count()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=50)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.ops} (add + reorder), window {args.window_ms} ms")
+    print(f"{'mode':<14} {'ops/s':>9} {'commits':>8} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for enabled in (False, True):
+            row = run(Path(tmp), enabled, args.threads, args.ops, args.window_ms)
+            label = "group-commit" if enabled else "per-request"
+            print(
+                f"{label:<14} {row['ops'] / row['seconds']:>9.1f} {row['commits']:>8} "
+                f"{row['seconds']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
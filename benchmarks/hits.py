@@ -0,0 +1,106 @@
+"""Click beacons: buffered counters against an UPDATE per click.
+
+``--threads`` clients send ``--hits`` beacons each to ``/api/card/<id>/hit``
+against a fresh migrated SQLite file, then the buffer is flushed once. The
+baseline does what the beacon avoids: one ``UPDATE card_hits`` and commit per
+click.
+
+    python benchmarks/hits.py --threads 8 --hits 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from alembic import command  # noqa: E402
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.hits import get_hit_counter  # noqa: E402
+
+
+def migrate(db_path: Path) -> None:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(cfg, "head")
+
+
+def make_app(db_path: Path):
+    migrate(db_path)
+    return create_app(
+        "testing",
+        test_config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "UPLOAD_DIR": db_path.parent / "uploads",
+            "HITS_FLUSH_INTERVAL": 0,
+        },
+    )
+
+
+def run(app, threads: int, hits: int, per_click_update: bool) -> float:
+    client = app.test_client()
+    column_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    cards = [
+        client.post("/api/card", json={"title": f"Card {i}", "column_id": column_id}).get_json()
+        for i in range(threads)
+    ]
+    barrier = threading.Barrier(threads)
+
+    def beacon(card_id: int) -> None:
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(hits):
+            client.post(f"/api/card/{card_id}/hit")
+
+    def update(card_id: int) -> None:
+        barrier.wait()
+        with app.app_context():
+            for _ in range(hits):
+                db.session.execute(
+                    text(
+                        "INSERT INTO card_hits (card_id, hits) VALUES (:id, 1) "
+                        "ON CONFLICT (card_id) DO UPDATE SET hits = hits + 1"
+                    ),
+                    {"id": card_id},
+                )
+                db.session.commit()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(update if per_click_update else beacon, [card["id"] for card in cards]))
+    if not per_click_update:
+        get_hit_counter(app).flush()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--hits", type=int, default=500)
+    args = parser.parse_args()
+
+    total = args.threads * args.hits
+    print(f"{args.threads} threads x {args.hits} clicks")
+    print(f"{'mode':<18} {'clicks/s':>10} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for per_click_update in (True, False):
+            app = make_app(Path(tmp) / f"hits_{per_click_update}.db")
+            seconds = run(app, args.threads, args.hits, per_click_update)
+            label = "UPDATE per click" if per_click_update else "beacon + flush"
+            print(f"{label:<18} {total / seconds:>10.0f} {seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+/**
+ * Column render time and DOM size with and without card virtualization.
+ *
+ * Renders one column of 100 / 1,000 / 10,000 cards in jsdom, once with every
+ * card in the DOM and once through VirtualCardList, then patches it with a
+ * fresh copy of the same cards (a refresh that changed nothing in the column)
+ * and with the cards reversed (a worst-case reorder).
+ *
+ *     npm --prefix benchmarks install
+ *     node benchmarks/render_cards.mjs --runs 5
+ */
+
+import { parseArgs } from "node:util";
+import { JSDOM } from "jsdom";
+
+const { values } = parseArgs({
+  options: {
+    runs: { type: "string", default: "5" },
+    sizes: { type: "string", default: "100,1000,10000" },
+  },
+});
+const runs = Number(values.runs);
+const sizes = values.sizes.split(",").map(Number);
+
+const dom = new JSDOM(
+  '<!doctype html><html><body data-api-base="/api"><main id="board"></main></body></html>',
+  { url: "http://localhost/", pretendToBeVisual: true },
+);
+for (const key of [
+  "window",
+  "document",
+  "navigator",
+  "getComputedStyle",
+  "requestAnimationFrame",
+  "cancelAnimationFrame",
+  "CustomEvent",
+]) {
+  Object.defineProperty(globalThis, key, {
+    value: key === "window" ? dom.window : dom.window[key],
+    configurable: true,
+    writable: true,
+  });
+}
+
+const { createColumnElement } = await import("../static/js/column-renderer.js");
+const board = document.getElementById("board");
+
+function makeCards(count) {
+  return Array.from({ length: count }, (_, i) => ({
+    id: i + 1,
+    title: `Bookmark ${i}`,
+    link: `https://example.com/${i}`,
+    description: i % 3 ? "" : `Notes for https://example.com/${i}/docs`,
+    icon: "",
+  }));
+}
+
+function median(samples) {
+  const sorted = [...samples].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+function measure(count, virtualThreshold) {
+  const column = { id: 1, name: "Bench", cards: makeCards(count) };
+  const render = [];
+  const refresh = [];
+  const reorder = [];
+  let nodes = 0;
+  for (let run = 0; run < runs; run += 1) {
+    let start = performance.now();
+    const element = createColumnElement(column, () => {}, { virtualThreshold });
+    board.appendChild(element);
+    render.push(performance.now() - start);
+    nodes = element.getElementsByTagName("*").length;
+
+    start = performance.now();
+    element._cardList.setItems(column.cards.map((card) => ({ ...card })));
+    refresh.push(performance.now() - start);
+
+    start = performance.now();
+    element._cardList.setItems([...column.cards].reverse());
+    reorder.push(performance.now() - start);
+    element.remove();
+  }
+  return {
+    render: median(render),
+    refresh: median(refresh),
+    reorder: median(reorder),
+    nodes,
+  };
+}
+
+console.log(`median of ${runs} runs (jsdom, no layout)`);
+console.log(
+  `${"cards".padStart(7)} ${"mode".padEnd(8)} ${"render ms".padStart(10)} ` +
+    `${"refresh ms".padStart(11)} ${"reorder ms".padStart(11)} ` +
+    `${"DOM nodes".padStart(10)}`,
+);
+for (const count of sizes) {
+  for (const [mode, threshold] of [
+    ["full", Infinity],
+    ["virtual", 0],
+  ]) {
+    const row = measure(count, threshold);
+    console.log(
+      `${String(count).padStart(7)} ${mode.padEnd(8)} ${row.render.toFixed(1).padStart(10)} ` +
+        `${row.refresh.toFixed(1).padStart(11)} ` +
+        `${row.reorder.toFixed(1).padStart(11)} ${String(row.nodes).padStart(10)}`,
+    );
+  }
+}
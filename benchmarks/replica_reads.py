@@ -0,0 +1,126 @@
+"""Read throughput and staleness of snapshot read replicas.
+
+A primary process renames a column to the current time every ``--write-every``
+seconds and publishes snapshots every ``--interval`` seconds. ``--followers``
+forked processes, each with its own database file, apply the snapshots and
+read /api/state in a loop. Reports reads per second and how long a write took
+to become visible on the followers.
+
+    python benchmarks/replica_reads.py --followers 4 --seconds 10 --interval 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from alembic.config import Config  # noqa: E402
+
+from alembic import command  # noqa: E402
+from app import create_app  # noqa: E402
+from app.replication import get_replication  # noqa: E402
+
+
+def migrate(db_path: Path) -> None:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(cfg, "head")
+
+
+def make_app(workdir: Path, role: str, db_path: Path, interval: float):
+    return create_app(
+        "testing",
+        test_config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "UPLOAD_DIR": workdir / "uploads",
+            "PAYLOAD_CACHE_DIR": workdir / f"cache-{db_path.stem}",
+            "METRICS_ENABLED": False,
+            "RATELIMIT_ENABLED": False,
+            "REPLICATION_ROLE": role,
+            "REPLICATION_DIR": workdir / "replication",
+            "REPLICATION_INTERVAL": interval,
+        },
+    )
+
+
+def follower(workdir, index, interval, seconds, col_id, results) -> None:
+    app = make_app(workdir, "follower", workdir / f"follower-{index}.db", interval)
+    get_replication(app).start()
+    client = app.test_client()
+    seen: dict[str, float] = {}
+    reads = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        res = client.get("/api/state")
+        if res.status_code != 200:
+            time.sleep(0.01)
+            continue
+        reads += 1
+        for column in res.get_json()["columns"]:
+            if column["id"] == col_id and column["name"] not in seen:
+                seen[column["name"]] = time.time()
+    delays = [when - float(name) for name, when in seen.items() if name != "Clock"]
+    results.put((reads, delays))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--followers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.5)
+    parser.add_argument("--write-every", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        db_path = workdir / "primary.db"
+        migrate(db_path)
+        primary = make_app(workdir, "primary", db_path, args.interval)
+        client = primary.test_client()
+        col_id = client.post("/api/column", json={"name": "Clock"}).get_json()["id"]
+        get_replication(primary).start()
+
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=follower,
+                args=(workdir, i, args.interval, args.seconds, col_id, results),
+            )
+            for i in range(args.followers)
+        ]
+        for proc in procs:
+            proc.start()
+        deadline = time.time() + args.seconds
+        while time.time() < deadline:
+            client.put(f"/api/column/{col_id}", json={"name": repr(time.time())})
+            time.sleep(args.write_every)
+        rows = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+    reads = sum(count for count, _ in rows)
+    delays = sorted(delay for _, found in rows for delay in found)
+    print(
+        f"{args.followers} followers, snapshots every {args.interval}s, "
+        f"a write every {args.write_every}s for {args.seconds}s"
+    )
+    print(f"reads/s: {reads / args.seconds:.0f}")
+    if delays:
+        print(
+            f"write visible after: p50 {statistics.median(delays) * 1000:.0f} ms, "
+            f"max {delays[-1] * 1000:.0f} ms ({len(delays)} observations)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Compare gunicorn sync (wsgi.py) and ASGI (asgi.py) serving under idle/slow connections.
+
+For each mode a single worker is started against a fresh migrated database.
+The benchmark then opens ``--slow`` connections that send request headers and
+a partial upload body without ever finishing it, plus ``--idle`` keep-alive
+sockets, and measures ``GET /api/state`` latency from ``--concurrency`` normal
+clients while those connections are held open.
+
+    python benchmarks/serving_modes.py --slow 50 --idle 1000 --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from alembic.config import Config  # noqa: E402
+
+from alembic import command  # noqa: E402
+
+MODES = {
+    "wsgi": lambda port: [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        "1",
+        "--threads",
+        "4",
+        "--timeout",
+        "120",
+        "wsgi:app",
+    ],
+    "asgi": lambda port: [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "asgi:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        "--timeout-keep-alive",
+        "120",
+    ],
+}
+
+
+def migrate(db_path: Path) -> None:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(cfg, "head")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/state")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def open_slow_uploads(port: int, count: int) -> list[socket.socket]:
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall(
+            b"POST /api/column HTTP/1.1\r\n"
+            b"Host: localhost\r\n"
+            b"Content-Type: application/json\r\n"
+            b"Content-Length: 1000\r\n\r\n"
+            b'{"name": "'
+        )
+        sockets.append(sock)
+    return sockets
+
+
+def open_idle(port: int, count: int) -> list[socket.socket]:
+    return [socket.create_connection(("127.0.0.1", port)) for _ in range(count)]
+
+
+def timed_get(port: int) -> float | None:
+    start = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", "/api/state")
+        res = conn.getresponse()
+        res.read()
+        conn.close()
+        if res.status != 200:
+            return None
+    except OSError:
+        return None
+    return time.perf_counter() - start
+
+
+def run_mode(mode: str, args, workdir: Path) -> dict:
+    db_path = workdir / f"{mode}.db"
+    migrate(db_path)
+    port = free_port()
+    env = {
+        **os.environ,
+        "APP_ENV": "production",
+        "DB_PATH": str(db_path),
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+        "UPLOAD_DIR": str(workdir / "uploads"),
+        "METRICS_ENABLED": "false",
+    }
+    proc = subprocess.Popen(
+        MODES[mode](port), cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    held: list[socket.socket] = []
+    try:
+        wait_ready(port)
+        held += open_slow_uploads(port, args.slow)
+        held += open_idle(port, args.idle)
+        time.sleep(0.5)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda _: timed_get(port), range(args.requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        for sock in held:
+            sock.close()
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    ok = sorted(r for r in results if r is not None)
+    return {
+        "mode": mode,
+        "ok": len(ok),
+        "failed": len(results) - len(ok),
+        "rps": len(ok) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(ok) * 1000 if ok else float("nan"),
+        "p95_ms": ok[int(len(ok) * 0.95) - 1] * 1000 if ok else float("nan"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slow", type=int, default=20, help="held partial uploads")
+    parser.add_argument("--idle", type=int, default=500, help="held idle connections")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    print(f"slow uploads={args.slow} idle sockets={args.idle} GET /api/state x{args.requests}")
+    print(f"{'mode':<6} {'ok':>5} {'failed':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            row = run_mode(mode, args, Path(tmp))
+            print(
+                f"{row['mode']:<6} {row['ok']:>5} {row['failed']:>7} {row['rps']:>8.1f} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure time from a cold interpreter import to the first served request.
+
+Each run starts a fresh Python process that imports ``app``, calls
+``create_app`` against a migrated SQLite file and serves ``GET /api/state``
+through the test client, reporting the three phases separately.
+
+    python benchmarks/startup.py --runs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from alembic.config import Config  # noqa: E402
+
+from alembic import command  # noqa: E402
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+res = app.test_client().get("/api/state")
+t3 = time.perf_counter()
+assert res.status_code == 200, res.status_code
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "first_request": t3 - t2}))
+"""
+
+
+def migrate(db_path: Path) -> None:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(cfg, "head")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--env", default="production", help="APP_ENV for the probe")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "startup.db"
+        migrate(db_path)
+        env = {
+            **os.environ,
+            "APP_ENV": args.env,
+            "DB_PATH": str(db_path),
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "UPLOAD_DIR": str(Path(tmp) / "uploads"),
+        }
+        samples = []
+        for _ in range(args.runs):
+            out = subprocess.run(
+                [sys.executable, "-c", PROBE],
+                cwd=ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"APP_ENV={args.env}, {args.runs} cold starts (median ms)")
+    total = [sum(sample.values()) for sample in samples]
+    for phase in ("import", "create_app", "first_request"):
+        print(f"  {phase:<14} {statistics.median(s[phase] for s in samples) * 1000:8.1f}")
+    print(f"  {'total':<14} {statistics.median(total) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Compiled request schemas against per-field validator helpers.
+
+Validates the same payloads both ways: a full settings update, a card, a
+5000-item reorder and a batch of 5000 cards (the helper version loops over
+the items in Python, as a batch endpoint built on them would). The helpers
+are the ones routes used before ``app.schemas`` and are kept here as the
+baseline.
+
+    python benchmarks/validators.py --rounds 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.schemas import CARD_CREATE, SETTINGS_UPDATE  # noqa: E402
+from app.validators import HEX_COLOR_RE, Int, ListOf, Schema, ValidationError  # noqa: E402
+
+SETTINGS = {
+    "dashboard_title": "Home",
+    "dashboard_bg_image": "https://example.com/bg.jpg",
+    "cols_per_row": 4,
+    "column_width": 320,
+    "card_height": 100,
+    "column_bg_color": "#AABBCC",
+    "column_bg_opacity": 0.5,
+    "card_bg_color": "#ffffff",
+    "card_bg_opacity": 0.8,
+}
+CARD = {
+    "title": "Docs",
+    "column_id": 3,
+    "link": "https://example.com/docs",
+    "description": "Reference",
+    "icon": "https://example.com/favicon.ico",
+}
+ORDER = {"order": list(range(5000))}
+BATCH = {"cards": [dict(CARD, title=f"Card {i}") for i in range(5000)]}
+CARD_BATCH = Schema({"cards": ListOf(CARD_CREATE, max_items=5000)})
+ORDERS = Schema({"order": ListOf(Int(), max_items=5000)})
+
+
+def require_dict(value, message="invalid JSON payload"):
+    if not isinstance(value, dict):
+        raise ValidationError(message)
+    return value
+
+
+def require_string(data: dict, key: str, max_len: int | None = None, min_len: int = 1) -> str:
+    value = data.get(key)
+    if not isinstance(value, str):
+        raise ValidationError(f"'{key}' must be a string")
+    value = value.strip()
+    if len(value) < min_len:
+        raise ValidationError(f"'{key}' is required")
+    if max_len is not None and len(value) > max_len:
+        raise ValidationError(f"'{key}' exceeds max length {max_len}")
+    return value
+
+
+def optional_string(data: dict, key: str, max_len: int | None = None) -> str | None:
+    value = data.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValidationError(f"'{key}' must be a string")
+    if max_len is not None and len(value) > max_len:
+        raise ValidationError(f"'{key}' exceeds max length {max_len}")
+    return value
+
+
+def require_int(
+    data: dict, key: str, min_value: int | None = None, max_value: int | None = None
+) -> int:
+    value = data.get(key)
+    try:
+        int_value = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"'{key}' must be an integer") from None
+    if min_value is not None and int_value < min_value:
+        raise ValidationError(f"'{key}' must be >= {min_value}")
+    if max_value is not None and int_value > max_value:
+        raise ValidationError(f"'{key}' must be <= {max_value}")
+    return int_value
+
+
+def optional_int(
+    data: dict, key: str, min_value: int | None = None, max_value: int | None = None
+) -> int | None:
+    if key not in data:
+        return None
+    return require_int(data, key, min_value=min_value, max_value=max_value)
+
+
+def optional_float(
+    data: dict, key: str, min_value: float | None = None, max_value: float | None = None
+) -> float | None:
+    if key not in data:
+        return None
+    value = data.get(key)
+    try:
+        float_value = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"'{key}' must be a number") from None
+    if min_value is not None and float_value < min_value:
+        raise ValidationError(f"'{key}' must be >= {min_value}")
+    if max_value is not None and float_value > max_value:
+        raise ValidationError(f"'{key}' must be <= {max_value}")
+    return float_value
+
+
+def optional_url(data: dict, key: str, max_len: int = 1024) -> str | None:
+    value = optional_string(data, key, max_len=max_len)
+    if value is None or value == "":
+        return value
+    parsed = urlparse(value)
+    if parsed.scheme not in {"http", "https"}:
+        raise ValidationError(f"'{key}' must be an http/https URL")
+    if not parsed.netloc:
+        raise ValidationError(f"'{key}' must be a valid URL")
+    return value
+
+
+def list_of_ints(data: dict, key: str, max_items: int = 1000) -> list[int]:
+    value = data.get(key)
+    if not isinstance(value, list):
+        raise ValidationError(f"'{key}' must be a list")
+    if len(value) > max_items:
+        raise ValidationError(f"'{key}' exceeds max size {max_items}")
+    items = []
+    for item in value:
+        try:
+            items.append(int(item))
+        except (TypeError, ValueError):
+            raise ValidationError(f"'{key}' contains non-integer value") from None
+    return items
+
+
+def optional_hex_color(data: dict, key: str) -> str | None:
+    if key not in data:
+        return None
+    value = data.get(key)
+    if not isinstance(value, str):
+        raise ValidationError(f"'{key}' must be a string")
+    if not HEX_COLOR_RE.fullmatch(value):
+        raise ValidationError(f"'{key}' must be a hex color like #ffffff")
+    return value.lower()
+
+
+def settings_helpers(data):
+    data = require_dict(data)
+    return {
+        "dashboard_title": optional_string(data, "dashboard_title", max_len=120),
+        "dashboard_bg_image": optional_url(data, "dashboard_bg_image", max_len=2048),
+        "cols_per_row": optional_int(data, "cols_per_row", min_value=1, max_value=10),
+        "column_width": optional_int(data, "column_width", min_value=200, max_value=1200),
+        "card_height": optional_int(data, "card_height", min_value=0, max_value=2000),
+        "column_bg_color": optional_hex_color(data, "column_bg_color"),
+        "column_bg_opacity": optional_float(data, "column_bg_opacity", 0.0, 1.0),
+        "card_bg_color": optional_hex_color(data, "card_bg_color"),
+        "card_bg_opacity": optional_float(data, "card_bg_opacity", 0.0, 1.0),
+    }
+
+
+def card_helpers(data):
+    data = require_dict(data)
+    return {
+        "title": require_string(data, "title", max_len=200),
+        "column_id": require_int(data, "column_id", min_value=1),
+        "link": optional_url(data, "link", max_len=2048) or "",
+        "description": optional_string(data, "description", max_len=2000) or "",
+        "icon": optional_url(data, "icon", max_len=2048) or "",
+    }
+
+
+def batch_helpers(data):
+    return [card_helpers(item) for item in data["cards"]]
+
+
+CASES = [
+    ("settings", lambda: settings_helpers(SETTINGS), lambda: SETTINGS_UPDATE.load(SETTINGS), 1),
+    ("card", lambda: card_helpers(CARD), lambda: CARD_CREATE.load(CARD), 1),
+    ("order x5000", lambda: list_of_ints(ORDER, "order", 5000), lambda: ORDERS.load(ORDER), 100),
+    ("cards x5000", lambda: batch_helpers(BATCH), lambda: CARD_BATCH.load(BATCH), 1000),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'payload':<12} {'helpers us':>11} {'schema us':>10} {'speedup':>8}")
+    for name, helpers, schema, divisor in CASES:
+        rounds = max(1, args.rounds // divisor)
+        old = min(timeit.repeat(helpers, number=rounds, repeat=5)) / rounds
+        new = min(timeit.repeat(schema, number=rounds, repeat=5)) / rounds
+        print(f"{name:<12} {old * 1e6:>11.1f} {new * 1e6:>10.1f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+# Loaded automatically by gunicorn from the working directory; CLI flags override.
+import os
+
+# Build the app once in the master and fork it into workers.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in {"1", "true", "yes", "on"}
+
+
+def post_fork(server, worker):
+    # Pooled SQLite connections must not be shared across the fork.
+    if not preload_app:
+        return
+    from app.extensions import db
+    from wsgi import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
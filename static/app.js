@@ -4,7 +4,11 @@
  */
 
 import {
+  flushOutbox,
+  getCachedSettings,
+  getCachedState,
   getSettings,
+  getSettingsRevision,
   getState,
   saveSettings,
   uploadBackground,
@@ -14,12 +18,19 @@ import {
 } from "./js/api.js";
 import {
   DEFAULT_SETTINGS,
+  applyDashboardTitle,
   applySettingsToDom,
   mergeSettings,
+  useThemeRevision,
 } from "./js/settings-store.js";
-import { notifyError, notifySuccess, askConfirm } from "./js/ui-feedback.js";
+import {
+  notify,
+  notifyError,
+  notifySuccess,
+  askConfirm,
+} from "./js/ui-feedback.js";
 import { boardManager } from "./js/board-manager.js";
-import { createColumnElement } from "./js/column-renderer.js";
+import { syncQueue } from "./js/sync-queue.js";
 import { cardModal, settingsModal } from "./js/modal-manager.js";
 
 /**
@@ -28,6 +39,7 @@ import { cardModal, settingsModal } from "./js/modal-manager.js";
 const app = {
   settings: { ...DEFAULT_SETTINGS },
   state: null,
+  renderFrame: null,
 
   /**
    * === INITIALIZATION ===
@@ -40,13 +52,58 @@ const app = {
     cardModal.init();
     settingsModal.init();
 
-    // Завантажити налаштування та стан
-    await this.loadSettings();
-    await this.refresh();
+    // Намалювати останній збережений знімок одразу, без очікування мережі.
+    // Стилі налаштувань уже прийшли з /theme.css, тож їх лише запам'ятовуємо
+    const [cachedSettings, cachedState] = await Promise.all([
+      getCachedSettings(),
+      getCachedState(),
+    ]);
+    if (cachedSettings) {
+      this.settings = mergeSettings(this.settings, cachedSettings);
+    }
+    if (cachedState) {
+      this.state = cachedState;
+      this.renderBoard();
+    }
+
+    this.initOffline();
+    syncQueue.onFailure = (response) => this.rollbackBoard(response);
+
+    // Перевірити знімки на сервері (умовні запити, 304 якщо без змін)
+    await Promise.all([this.loadSettings(), this.refresh()]);
 
     console.log("✅ Dashboard Ready");
   },
 
+  /**
+   * === OFFLINE SUPPORT ===
+   */
+
+  initOffline() {
+    if ("serviceWorker" in navigator) {
+      navigator.serviceWorker.register("/sw.js").catch((err) => {
+        console.warn("⚠️  Service worker registration failed", err);
+      });
+    }
+
+    window.addEventListener("outbox:queued", () => {
+      notify("Offline: change saved and will sync when back online");
+    });
+    window.addEventListener("online", () => this.syncOutbox());
+    this.syncOutbox();
+  },
+
+  async syncOutbox() {
+    const { sent, rejected } = await flushOutbox();
+    if (rejected) {
+      notifyError(`${rejected} offline change(s) were rejected by the server`);
+    }
+    if (sent || rejected) {
+      if (sent) notifySuccess(`Synced ${sent} offline change(s)`);
+      await Promise.all([this.loadSettings(), this.refresh()]);
+    }
+  },
+
   /**
    * === SETTINGS MANAGEMENT ===
    */
@@ -56,13 +113,18 @@ const app = {
       const incoming = await getSettings();
       if (incoming) {
         this.settings = mergeSettings(this.settings, incoming);
-        this.applySettings();
+        applyDashboardTitle(this.settings.dashboard_title);
+        useThemeRevision(await getSettingsRevision());
       }
     } catch (e) {
       console.warn("⚠️  Failed loading settings", e);
     }
   },
 
+  /**
+   * Живий перегляд у модалці налаштувань; збережені налаштування
+   * застосовує /theme.css
+   */
   applySettings() {
     applySettingsToDom(this.settings);
   },
@@ -313,7 +375,12 @@ const app = {
 
   async refresh() {
     try {
-      this.state = await getState();
+      // Дочекатися неперевірених змін порядку, щоб не намалювати старий стан
+      await syncQueue.settled();
+      const state = await getState();
+      // Незмінений знімок (304) — той самий об'єкт, перемальовувати нічого
+      if (state === this.state) return;
+      this.state = state;
       this.renderBoard();
     } catch (err) {
       console.error("❌ Failed to refresh board:", err);
@@ -321,19 +388,33 @@ const app = {
     }
   },
 
-  renderBoard() {
-    boardManager.clearBoard();
-    const main = boardManager.getMainBoard();
-    boardManager.initializeBoardDragHandlers(main);
+  /**
+   * Зміну порядку не прийнято: повернути дошку до останнього стану сервера
+   * і підтягнути свіжий (його могли змінити в іншій вкладці)
+   */
+  async rollbackBoard(response) {
+    if (response?.status === 412) {
+      notifyError("Board was changed elsewhere, your move was undone");
+    } else {
+      notifyError("Failed to save new order");
+    }
+    if (this.state) this.renderBoard();
+    await this.refresh();
+  },
 
-    this.state.columns.forEach((col) => {
-      const columnElement = createColumnElement(col, (card) =>
+  /**
+   * Запланувати перемальовування дошки: кілька викликів до наступного кадру
+   * зливаються в один, і всі зміни DOM відбуваються в одному кадрі
+   */
+  renderBoard() {
+    if (this.renderFrame) return;
+    this.renderFrame = requestAnimationFrame(() => {
+      this.renderFrame = null;
+      boardManager.renderColumns(this.state.columns, (card) =>
         cardModal.open(card),
       );
-      main.appendChild(columnElement);
+      cardModal.fillColumnSelect(this.state);
     });
-
-    cardModal.fillColumnSelect(this.state);
   },
 };
 
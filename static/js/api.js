@@ -1,87 +1,283 @@
-export async function getState() {
-  const response = await fetch("/api/state");
-  return response.json();
+import {
+  enqueueMutation,
+  readSnapshot,
+  replayMutations,
+  writeSnapshot,
+} from "./client-cache.js";
+
+/** Базовий шлях API: "/api" або "/b/<slug>/api" для окремої дошки. */
+const API_BASE = document.body.dataset.apiBase || "/api";
+const STATE_URL = `${API_BASE}/state`;
+
+// Однакові GET-запити, що виконуються одночасно, ділять один fetch
+const inflight = new Map();
+
+// Остання відома ревізія дошки (ETag "board-N") для If-Match у змінах порядку
+let boardEtag = null;
+
+function rememberBoardEtag(etag) {
+  if (!etag) return;
+  // Запізніла відповідь зі старішою ревізією не має її перезаписати
+  if (boardEtag && etagRevision(etag) < etagRevision(boardEtag)) return;
+  boardEtag = etag;
 }
 
-export async function getSettings() {
-  const response = await fetch("/api/settings");
+function etagRevision(etag) {
+  return Number(/(\d+)"?$/.exec(etag)?.[1] ?? -1);
+}
+
+/**
+ * GET з кешем: умовний запит з If-None-Match, 304 повертає знімок,
+ * без мережі — теж знімок (якщо він є)
+ */
+function getJson(path) {
+  const url = `${API_BASE}${path}`;
+  if (!inflight.has(url)) {
+    const request = revalidate(url).finally(() => inflight.delete(url));
+    inflight.set(url, request);
+  }
+  return inflight.get(url);
+}
+
+async function revalidate(url) {
+  const cached = await readSnapshot(url);
+  const headers = cached?.etag ? { "If-None-Match": cached.etag } : {};
+  let response;
+  try {
+    response = await fetch(url, { headers, cache: "no-store" });
+  } catch (err) {
+    if (cached) return cached.data;
+    throw err;
+  }
+  if (response.status === 304 && cached) {
+    if (url === STATE_URL) rememberBoardEtag(cached.etag);
+    return cached.data;
+  }
   if (!response.ok) {
-    return null;
+    const error = new Error(`GET ${url} failed`);
+    error.status = response.status;
+    throw error;
   }
-  return response.json();
+  const data = await response.json();
+  const etag = response.headers.get("ETag");
+  if (url === STATE_URL) rememberBoardEtag(etag);
+  return writeSnapshot(url, etag, data).data;
 }
 
-export async function saveSettings(payload) {
-  return fetch("/api/settings", {
-    method: "PUT",
-    headers: { "content-type": "application/json" },
+/**
+ * Надіслати зміну; без мережі вона стає в чергу, а виклик отримує
+ * синтетичну відповідь (202, або 204 для DELETE) з заголовком X-Queued.
+ * Заголовки (напр. If-Match) в черзі не зберігаються: на момент відправки
+ * ревізія вже буде іншою.
+ */
+async function send(method, path, payload, headers = {}) {
+  const mutation = { method, url: `${API_BASE}${path}`, payload };
+  try {
+    return await sendMutation({ ...mutation, headers });
+  } catch (err) {
+    if (navigator.onLine !== false) throw err;
+    const pending = await enqueueMutation(mutation);
+    if (pending === null) throw err;
+    window.dispatchEvent(
+      new CustomEvent("outbox:queued", { detail: { pending } }),
+    );
+    return new Response(null, {
+      status: method === "DELETE" ? 204 : 202,
+      headers: { "X-Queued": "1" },
+    });
+  }
+}
+
+function sendMutation({ method, url, payload, headers = {} }) {
+  if (payload === undefined) {
+    return fetch(url, { method, headers });
+  }
+  return fetch(url, {
+    method,
+    headers: { ...headers, "content-type": "application/json" },
     body: JSON.stringify(payload),
   });
 }
 
+/**
+ * Зміна порядку з перевіркою ревізії: сервер відповість 412, якщо дошку
+ * змінили після останнього відомого стану. Нова ревізія з відповіді стає
+ * базою для наступного запиту.
+ */
+async function sendReorder(path, order) {
+  const headers = boardEtag ? { "If-Match": boardEtag } : {};
+  const response = await send("POST", path, { order }, headers);
+  rememberBoardEtag(response.headers.get("ETag"));
+  return response;
+}
+
+/**
+ * Відправити зміни, накопичені офлайн
+ */
+export function flushOutbox() {
+  return replayMutations(sendMutation);
+}
+
+export async function getState() {
+  return getJson("/state");
+}
+
+export async function getSettings() {
+  try {
+    return await getJson("/settings");
+  } catch (err) {
+    if (err.status) return null;
+    throw err;
+  }
+}
+
+/**
+ * Останні збережені дані без мережі (null, якщо кешу ще нема)
+ */
+export async function getCachedState() {
+  return (await readSnapshot(STATE_URL))?.data ?? null;
+}
+
+export async function getCachedSettings() {
+  return (await readSnapshot(`${API_BASE}/settings`))?.data ?? null;
+}
+
+/**
+ * Ревізія останніх отриманих налаштувань (версія /theme.css) або null
+ */
+export async function getSettingsRevision() {
+  const etag = (await readSnapshot(`${API_BASE}/settings`))?.etag;
+  const revision = etag ? etagRevision(etag) : -1;
+  return revision < 0 ? null : revision;
+}
+
+export async function saveSettings(payload) {
+  return send("PUT", "/settings", payload);
+}
+
 export async function createCard(payload) {
-  return fetch("/api/card", {
-    method: "POST",
-    headers: { "content-type": "application/json" },
-    body: JSON.stringify(payload),
-  });
+  return send("POST", "/card", payload);
 }
 
 export async function updateCard(cardId, payload) {
-  return fetch(`/api/card/${cardId}`, {
-    method: "PUT",
-    headers: { "content-type": "application/json" },
-    body: JSON.stringify(payload),
-  });
+  return send("PUT", `/card/${cardId}`, payload);
 }
 
 export async function removeCard(cardId) {
-  return fetch(`/api/card/${cardId}`, { method: "DELETE" });
+  return send("DELETE", `/card/${cardId}`);
+}
+
+/**
+ * Відмітити відкриття картки (для сортування "найчастіші"). sendBeacon
+ * переживає перехід за посиланням і не чекає на відповідь.
+ */
+export function recordCardHit(cardId) {
+  const url = `${API_BASE}/card/${cardId}/hit`;
+  if (!navigator.sendBeacon?.(url)) {
+    fetch(url, { method: "POST", keepalive: true }).catch(() => {});
+  }
 }
 
 export async function createColumn(payload) {
-  return fetch("/api/column", {
-    method: "POST",
-    headers: { "content-type": "application/json" },
-    body: JSON.stringify(payload),
-  });
+  return send("POST", "/column", payload);
 }
 
 export async function updateColumn(columnId, payload) {
-  return fetch(`/api/column/${columnId}`, {
-    method: "PUT",
-    headers: { "content-type": "application/json" },
-    body: JSON.stringify(payload),
-  });
+  return send("PUT", `/column/${columnId}`, payload);
 }
 
 export async function removeColumn(columnId) {
-  return fetch(`/api/column/${columnId}`, { method: "DELETE" });
+  return send("DELETE", `/column/${columnId}`);
 }
 
+/**
+ * Новий порядок карток колони; id карток з інших колон переносять їх сюди
+ */
 export async function reorderColumnCards(columnId, order) {
-  return fetch(`/api/column/${columnId}/reorder-cards`, {
-    method: "POST",
-    headers: { "content-type": "application/json" },
-    body: JSON.stringify({ order }),
-  });
+  return sendReorder(`/column/${columnId}/reorder-cards`, order);
 }
 
 export async function reorderColumns(order) {
-  return fetch("/api/column/reorder", {
+  return sendReorder("/column/reorder", order);
+}
+
+const UPLOAD_CHUNK_SIZE = 1024 * 1024;
+const UPLOAD_RETRIES = 5;
+
+/**
+ * Завантажити фон частинами з відновленням (POST /uploads, PATCH частин,
+ * finalize). Після обриву зв'язку сервер повідомляє, скільки байтів уже
+ * отримав, і відправка продовжується з цього місця, а не з нуля.
+ * Повертає відповідь finalize ({ url }) або першу фатальну помилку.
+ */
+export async function uploadBackground(file) {
+  const created = await fetch(`${API_BASE}/uploads`, {
     method: "POST",
     headers: { "content-type": "application/json" },
-    body: JSON.stringify({ order }),
+    body: JSON.stringify({
+      filename: file.name,
+      size: file.size,
+      mimetype: file.type,
+    }),
   });
+  if (!created.ok) return created;
+  const url = `${API_BASE}/uploads/${(await created.json()).id}`;
+
+  let offset = 0;
+  let failures = 0;
+  while (offset < file.size) {
+    const chunk = file.slice(offset, offset + UPLOAD_CHUNK_SIZE);
+    let response = null;
+    try {
+      response = await fetch(url, {
+        method: "PATCH",
+        headers: {
+          "content-type": "application/offset+octet-stream",
+          "Upload-Offset": String(offset),
+          ...(await chunkChecksum(chunk)),
+        },
+        body: chunk,
+      });
+    } catch (_) {
+      response = null; // обрив зв'язку — дізнаємося зсув і продовжимо
+    }
+    if (response?.ok) {
+      offset = Number(response.headers.get("Upload-Offset"));
+      failures = 0;
+      continue;
+    }
+    if (response && [404, 413].includes(response.status)) return response;
+
+    failures += 1;
+    if (failures > UPLOAD_RETRIES) {
+      if (response) return response;
+      throw new Error("Upload failed: connection lost");
+    }
+    await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** failures));
+    try {
+      const head = await fetch(url, { method: "HEAD", cache: "no-store" });
+      if (head.status === 404) return head;
+      if (head.ok) offset = Number(head.headers.get("Upload-Offset"));
+    } catch (_) {
+      // досі офлайн — наступна спроба
+    }
+  }
+  return fetch(`${url}/finalize`, { method: "POST" });
 }
 
-export async function uploadBackground(file) {
-  const formData = new FormData();
-  formData.append("file", file);
-  return fetch("/api/upload-bg", { method: "POST", body: formData });
+/**
+ * Заголовок Upload-Checksum (SHA-256 частини), якщо доступний WebCrypto
+ */
+async function chunkChecksum(chunk) {
+  if (!globalThis.crypto?.subtle) return {};
+  const digest = await crypto.subtle.digest(
+    "SHA-256",
+    await chunk.arrayBuffer(),
+  );
+  const binary = String.fromCharCode(...new Uint8Array(digest));
+  return { "Upload-Checksum": `sha256 ${btoa(binary)}` };
 }
 
 export async function resetBackground() {
-  return fetch("/api/settings/bg", { method: "DELETE" });
+  return send("DELETE", "/settings/bg");
 }
-
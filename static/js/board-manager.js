@@ -2,9 +2,14 @@
  * Board Manager - управління дошкою та рендеруванням
  */
 
-import { createElement } from "./dom-utils.js";
-import { reorderColumnCards, reorderColumns } from "./api.js";
+import { createElement, placeChildren } from "./dom-utils.js";
+import { reorderColumns } from "./api.js";
 import { dragManager } from "./drag-manager.js";
+import { syncQueue } from "./sync-queue.js";
+import {
+  createColumnElement,
+  patchColumnElement,
+} from "./column-renderer.js";
 
 export const boardManager = {
   /**
@@ -46,7 +51,7 @@ export const boardManager = {
   /**
    * Обробник drop для дошки
    */
-  async handleBoardDrop(ev) {
+  handleBoardDrop(ev) {
     if (dragManager.state.type !== "column") return;
 
     ev.preventDefault();
@@ -94,13 +99,38 @@ export const boardManager = {
       const order = Array.from(document.querySelectorAll(".column")).map(
         (x) => x.dataset.id,
       );
-      await reorderColumns(order);
+      syncQueue.push("columns", () => reorderColumns(order));
     }
 
     dragManager.reset();
   },
 
+  /**
+   * Привести дошку до нового стану, зіставляючи колони та картки за id.
+   * Наявні вузли оновлюються на місці (прокрутка та іконки зберігаються),
+   * створюються лише нові, зникли — видаляються.
+   */
+  renderColumns(columns, onCardClick) {
+    const main = this.getMainBoard();
+    this.initializeBoardDragHandlers(main);
+
+    const rendered = new Map();
+    for (const element of main.querySelectorAll(":scope > .column")) {
+      rendered.set(element.dataset.id, element);
+    }
+
+    const nodes = columns.map((column) => {
+      const key = String(column.id);
+      const element = rendered.get(key);
+      rendered.delete(key);
+      if (element && patchColumnElement(element, column)) return element;
+      element?.remove();
+      return createColumnElement(column, onCardClick);
+    });
 
+    for (const element of rendered.values()) element.remove();
+    placeChildren(main, nodes, main.firstElementChild);
+  },
 
   /**
    * Видалити всі елементи з дошки
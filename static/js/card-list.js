@@ -0,0 +1,206 @@
+/**
+ * Card List - список карток колони: звичайний або віртуалізований
+ *
+ * Обидва варіанти тримають масив карток (items) як джерело правди, тож
+ * drag-and-drop змінює дані, а не DOM. Віртуальний список малює лише видиме
+ * вікно карток і перевикористовує їхні вузли під час прокрутки.
+ */
+
+import { createElement, placeChildren } from "./dom-utils.js";
+import { dragManager } from "./drag-manager.js";
+
+/** Колони з більшою кількістю карток рендеряться віртуально */
+export const VIRTUAL_THRESHOLD = 200;
+
+// Стандартна висота картки, якщо в налаштуваннях "auto" (card_height = 0)
+const DEFAULT_CARD_HEIGHT = 100;
+const CARD_GAP = 12;
+
+/**
+ * Звичайний список: вузол на кожну картку, вузли перевикористовуються за id
+ */
+export class CardList {
+  /**
+   * @param {HTMLElement} container - куди додаються вузли карток
+   * @param {(node: HTMLElement|null, card: object) => HTMLElement} renderCard
+   *   створює новий вузол (node = null) або заповнює наявний
+   */
+  constructor(container, renderCard) {
+    this.container = container;
+    this.renderCard = renderCard;
+    this.items = [];
+    this.nodes = new Map();
+  }
+
+  setItems(items) {
+    this.items = items;
+    const next = new Map();
+    for (const card of items) {
+      const key = String(card.id);
+      next.set(key, this.renderCard(this.nodes.get(key) || null, card));
+    }
+    const kept = new Set(next.values());
+    for (const node of this.nodes.values()) {
+      if (!kept.has(node)) node.remove();
+    }
+    // Переносяться лише вузли не на своєму місці — порядок DOM слідує за даними
+    const first = this.nodes.size
+      ? Array.from(this.container.children).find((child) => kept.has(child))
+      : null;
+    placeChildren(this.container, next.values(), first || null);
+    this.nodes = next;
+  }
+
+  keys() {
+    return this.items.map((card) => String(card.id));
+  }
+
+  indexOf(cardId) {
+    return this.items.findIndex((card) => String(card.id) === String(cardId));
+  }
+
+  /**
+   * Поміняти дві картки місцями; false, якщо якоїсь нема в списку
+   */
+  swap(firstId, secondId) {
+    const a = this.indexOf(firstId);
+    const b = this.indexOf(secondId);
+    if (a < 0 || b < 0) return false;
+    const items = [...this.items];
+    [items[a], items[b]] = [items[b], items[a]];
+    this.setItems(items);
+    return true;
+  }
+
+  remove(cardId) {
+    const index = this.indexOf(cardId);
+    if (index < 0) return null;
+    const card = this.items[index];
+    this.setItems(this.items.filter((_, i) => i !== index));
+    return card;
+  }
+
+  append(card) {
+    this.setItems([...this.items, card]);
+  }
+}
+
+/**
+ * Віртуалізований список: прокручуваний контейнер зі спейсером на повну
+ * висоту та пулом вузлів лише для видимих (плюс overscan) карток.
+ * Висота рядка фіксована, тому позиція картки — це index * rowHeight.
+ */
+export class VirtualCardList extends CardList {
+  constructor(container, renderCard, { rowHeight, overscan = 8 } = {}) {
+    super(container, renderCard);
+    this.rowHeight = rowHeight || virtualRowHeight();
+    this.overscan = overscan;
+    this.pool = [];
+    this.frame = null;
+
+    container.classList.add("card-list", "is-virtual");
+    container.style.setProperty(
+      "--virtual-card-height",
+      `${this.rowHeight - CARD_GAP}px`,
+    );
+    this.spacer = createElement("div", "card-list-spacer");
+    container.appendChild(this.spacer);
+    container.addEventListener("scroll", () => this.scheduleRender(), {
+      passive: true,
+    });
+    // Автопрокрутка під час перетягування — шлях до позицій поза екраном
+    container.addEventListener("dragover", (ev) => {
+      if (dragManager.isCardDrag()) {
+        dragManager.autoScroll(container, ev.clientY);
+      }
+    });
+    container.addEventListener("dragleave", (ev) => {
+      if (ev.target === container) dragManager.stopAutoScroll();
+    });
+  }
+
+  setItems(items) {
+    this.items = items;
+    this.spacer.style.height = `${items.length * this.rowHeight}px`;
+    this.render();
+  }
+
+  scheduleRender() {
+    if (this.frame !== null) return;
+    this.frame = requestAnimationFrame(() => {
+      this.frame = null;
+      this.render();
+    });
+  }
+
+  /**
+   * Діапазон індексів, що мають бути в DOM: [start, end)
+   */
+  visibleRange() {
+    // jsdom та прихований контейнер мають clientHeight = 0
+    const viewport = this.container.clientHeight || window.innerHeight;
+    const first = Math.floor(this.container.scrollTop / this.rowHeight);
+    const count = Math.ceil(viewport / this.rowHeight);
+    return {
+      start: Math.max(0, first - this.overscan),
+      end: Math.min(this.items.length, first + count + this.overscan),
+    };
+  }
+
+  render() {
+    const { start, end } = this.visibleRange();
+    const wanted = new Map();
+    for (let i = start; i < end; i += 1) {
+      wanted.set(String(this.items[i].id), i);
+    }
+    // Вузол перетягуваної картки не чіпаємо: якщо його перевикористати,
+    // браузер не надішле dragend
+    const dragged = dragManager.isCardDrag() ? dragManager.state.cardId : null;
+
+    const next = new Map();
+    for (const [key, node] of this.nodes) {
+      if (wanted.has(key) || key === dragged) {
+        next.set(key, node);
+      } else {
+        this.pool.push(node);
+      }
+    }
+
+    for (const [key, index] of wanted) {
+      const card = this.items[index];
+      const reused = next.get(key) || this.pool.pop() || null;
+      const node = this.renderCard(reused, card);
+      node.style.transform = `translateY(${index * this.rowHeight}px)`;
+      if (node.parentNode !== this.container) this.container.appendChild(node);
+      next.set(key, node);
+    }
+
+    if (dragged && next.has(dragged) && !wanted.has(dragged)) {
+      const index = this.indexOf(dragged);
+      const node = next.get(dragged);
+      if (index < 0) {
+        next.delete(dragged);
+        this.pool.push(node);
+      } else {
+        node.style.transform = `translateY(${index * this.rowHeight}px)`;
+      }
+    }
+
+    // Зайві вузли з пулу лишаються в пам'яті, але не в DOM
+    for (const node of this.pool) {
+      if (node.parentNode) node.remove();
+    }
+    this.nodes = next;
+  }
+}
+
+/**
+ * Висота рядка за налаштуванням --card-height (або стандартна) плюс відступ
+ */
+export function virtualRowHeight() {
+  const value = getComputedStyle(document.documentElement).getPropertyValue(
+    "--card-height",
+  );
+  const height = parseInt(value, 10);
+  return (height > 0 ? height : DEFAULT_CARD_HEIGHT) + CARD_GAP;
+}
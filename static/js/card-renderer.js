@@ -2,9 +2,10 @@
  * Card Renderer - рендеринг карт та обробня їхніх подій
  */
 
-import { createElement } from "./dom-utils.js";
+import { cloneTemplate, createElement } from "./dom-utils.js";
 import { dragManager } from "./drag-manager.js";
-import { reorderColumnCards } from "./api.js";
+import { recordCardHit, reorderColumnCards } from "./api.js";
+import { syncQueue } from "./sync-queue.js";
 
 /**
  * Додати посилання до тексту в контейнер
@@ -42,24 +43,34 @@ export function appendLinkedText(container, text) {
   }
 }
 
+// Оболонка картки; кнопки йдуть після заголовка, як і раніше
+const CARD_TEMPLATE = `
+  <div class="card">
+    <div class="title"></div>
+    <button type="button" class="card-drag-handle" draggable="true"
+      title="Drag card" aria-label="Drag card"></button>
+    <button class="card-menu">⋯</button>
+  </div>`;
+const LINK_TEMPLATE = `<a target="_blank" rel="noopener noreferrer"></a>`;
+const ICON_TEMPLATE = `<img class="card-icon" crossorigin="anonymous">`;
+
 /**
  * Створити елемент картки
+ *
+ * Обробники подій читають картку з самого вузла (cd._card), тож вузол можна
+ * перевикористати для іншої картки через fillCardElement().
  */
 export function createCardElement(card, columnId, columnElement, onCardClick) {
-  const cd = createElement("div", "card");
-  cd.dataset.id = card.id;
+  const cd = cloneTemplate(CARD_TEMPLATE);
 
   // === Drag Handle ===
-  const dragHandle = createElement("button", "card-drag-handle");
-  dragHandle.type = "button";
-  dragHandle.draggable = true;
-  dragHandle.title = "Drag card";
-  dragHandle.setAttribute("aria-label", "Drag card");
+  const dragHandle = cd.querySelector(".card-drag-handle");
 
   dragHandle.addEventListener("dragstart", (ev) => {
     ev.stopPropagation();
-    dragManager.set("card", columnId, card.id);
-    ev.dataTransfer.setData("text/plain", `card:${card.id}:${columnId}`);
+    dragManager.set("card", cd._columnId, cd._card.id);
+    const payload = `card:${cd._card.id}:${cd._columnId}`;
+    ev.dataTransfer.setData("text/plain", payload);
     ev.dataTransfer.effectAllowed = "move";
   });
 
@@ -68,86 +79,100 @@ export function createCardElement(card, columnId, columnElement, onCardClick) {
   });
 
   // === Область картки для drop ===
-  attachCardDropHandlers(cd, card, columnId, columnElement);
+  attachCardDropHandlers(cd, columnElement);
+
+  // === Menu Button ===
+  cd.querySelector(".card-menu").addEventListener("click", (ev) => {
+    ev.stopPropagation();
+    onCardClick(cd._card);
+  });
+
+  // === Title ===
+  // Посилання та заголовок без посилання не мають запускати редагування
+  cd.querySelector(".title").addEventListener("click", (ev) => {
+    if (ev.target.closest("a, .card-title-text")) ev.stopPropagation();
+    if (ev.target.closest("a")) recordCardHit(cd._card.id);
+  });
+
+  // === Double-click to edit ===
+  cd.addEventListener("dblclick", (ev) => {
+    // Дозволити double-click на посиланні в заголовку без редагування
+    if (ev.target.closest("a")) return;
+    onCardClick(cd._card);
+  });
+
+  fillCardElement(cd, card, columnId);
+  return cd;
+}
+
+/**
+ * Заповнити (або перезаповнити) вузол картки даними.
+ * Якщо видимі поля не змінилися, вміст вузла не чіпається.
+ */
+export function fillCardElement(cd, card, columnId) {
+  const previous = cd._card;
+  cd._card = card;
+  cd._columnId = columnId;
+  cd.dataset.id = card.id;
+  if (previous && sameContent(previous, card)) return cd;
 
   // === Title ===
-  const title = createElement("div", "title");
+  const title = cd.querySelector(".title");
+  const oldIcon = title.querySelector(".card-icon");
+  title.replaceChildren();
   if (card.icon) {
-    const img = document.createElement("img");
+    // Та сама іконка — той самий <img>, без повторного декодування
+    const img =
+      oldIcon && oldIcon.getAttribute("src") === card.icon
+        ? oldIcon
+        : cloneTemplate(ICON_TEMPLATE);
     img.src = card.icon;
-    img.className = "card-icon";
-    img.crossOrigin = "anonymous";
     title.appendChild(img);
   }
 
   if (card.link) {
-    const a = document.createElement("a");
+    const a = cloneTemplate(LINK_TEMPLATE);
     a.href = card.link;
     a.textContent = card.title;
-    a.target = "_blank";
-    a.rel = "noopener noreferrer";
-    // Запобігти double-click edit при натисканню на посилання
-    a.addEventListener(
-      "dblclick",
-      (ev) => {
-        ev.stopPropagation();
-      },
-      true,
-    );
-    a.addEventListener("click", (ev) => {
-      ev.stopPropagation();
-    });
     title.appendChild(a);
   } else {
     // Якщо нема посилання - зробимо заголовок кліквим для двійного кліку
-    const titleSpan = document.createElement("span");
-    titleSpan.textContent = card.title;
+    const titleSpan = createElement("span", "card-title-text", card.title);
     titleSpan.style.cursor = "pointer";
-    titleSpan.addEventListener("click", (ev) => {
-      ev.stopPropagation();
-    });
     title.appendChild(titleSpan);
   }
 
-  cd.appendChild(title);
-
   // === Description ===
+  let desc = cd.querySelector(".desc");
   if (card.description) {
-    const d = createElement("div", "desc");
-    appendLinkedText(d, card.description);
-    cd.appendChild(d);
+    if (!desc) {
+      desc = createElement("div", "desc");
+      title.after(desc);
+    }
+    desc.replaceChildren();
+    appendLinkedText(desc, card.description);
+  } else if (desc) {
+    desc.remove();
   }
-
-  // === Menu Button ===
-  const menu = document.createElement("button");
-  menu.className = "card-menu";
-  menu.textContent = "⋯";
-  menu.addEventListener("click", (ev) => {
-    ev.stopPropagation();
-    onCardClick(card);
-  });
-
-  // === Double-click to edit ===
-  cd.addEventListener("dblclick", (ev) => {
-    // Дозволити double-click на посиланні в заголовку без редагування
-    if (ev.target.tagName === "A") return;
-    onCardClick(card);
-  });
-
-  // === Append controls ===
-  cd.appendChild(dragHandle);
-  cd.appendChild(menu);
-
   return cd;
 }
 
+function sameContent(a, b) {
+  return (
+    a.title === b.title &&
+    a.link === b.link &&
+    a.icon === b.icon &&
+    a.description === b.description
+  );
+}
+
 /**
  * Приєднати обробники drop для картки
  */
-function attachCardDropHandlers(cardElement, card, columnId, columnElement) {
+function attachCardDropHandlers(cardElement, columnElement) {
   cardElement.addEventListener("dragover", (ev) => {
     if (!dragManager.isCardDrag()) return;
-    if (!dragManager.cardBelongsToColumn(columnId)) return;
+    if (!dragManager.cardBelongsToColumn(cardElement._columnId)) return;
 
     ev.preventDefault();
     ev.dataTransfer.dropEffect = "move";
@@ -160,37 +185,26 @@ function attachCardDropHandlers(cardElement, card, columnId, columnElement) {
     }
   });
 
-  cardElement.addEventListener("drop", async (ev) => {
+  cardElement.addEventListener("drop", (ev) => {
     ev.stopPropagation();
     ev.preventDefault();
     cardElement.classList.remove("drag-over");
 
+    const columnId = cardElement._columnId;
     if (!dragManager.isCardDrag()) return;
     if (!dragManager.cardBelongsToColumn(columnId)) return;
 
     const draggedCardId = dragManager.state.cardId;
-    const draggedEl = document.querySelector(
-      `.card[data-id="${draggedCardId}"]`,
-    );
-
-    if (!draggedEl || draggedEl === cardElement) return;
-
-    // Поміняти картки місцями
-    const parent = cardElement.parentNode;
-    const draggedParent = draggedEl.parentNode;
+    const list = columnElement._cardList;
+    dragManager.reset();
+    if (draggedCardId === cardElement.dataset.id) return;
 
-    // Простий swap за допомогою тимчасового елемента
-    const temp = document.createElement("div");
-    draggedParent.insertBefore(temp, draggedEl);
-    parent.insertBefore(draggedEl, cardElement);
-    draggedParent.insertBefore(cardElement, temp);
-    temp.remove();
+    // Поміняти картки місцями в даних — вузол перетягнутої картки може бути
+    // поза екраном (віртуалізований список), тож DOM тут не джерело правди
+    if (!list.swap(draggedCardId, cardElement.dataset.id)) return;
 
-    // Оновити порядок карт на сервері
-    const order = Array.from(columnElement.querySelectorAll(".card")).map(
-      (x) => x.dataset.id,
-    );
-    await reorderColumnCards(columnId, order);
+    // Екран уже оновлено; сервер отримає лише останній порядок колони
+    queueCardOrder(columnId, list);
   });
 }
 
@@ -205,38 +219,37 @@ export function attachColumnDropHandlers(columnElement, columnId) {
     ev.dataTransfer.dropEffect = "move";
   });
 
-  columnElement.addEventListener("drop", async (ev) => {
+  columnElement.addEventListener("drop", (ev) => {
     if (!dragManager.isCardDrag()) return;
 
     const draggedCardId = dragManager.state.cardId;
     const sourceColumnId = dragManager.state.columnId;
     ev.preventDefault();
+    dragManager.reset();
 
-    const draggedEl = document.querySelector(
-      `.card[data-id="${draggedCardId}"]`,
+    const sourceColumn = document.querySelector(
+      `.column[data-id="${sourceColumnId}"]`,
     );
-    if (!draggedEl) return;
+    const sourceList = sourceColumn?._cardList;
+    const list = columnElement._cardList;
+    const card = sourceList?.remove(draggedCardId);
+    if (!card) return;
 
     // Додати картку в кінець колони
-    columnElement.appendChild(draggedEl);
-
-    // Оновити порядок карт у дестинейшен колоні
-    const order = Array.from(columnElement.querySelectorAll(".card")).map(
-      (x) => x.dataset.id,
-    );
-    await reorderColumnCards(columnId, order);
+    list.append(card);
 
-    // Якщо картка була перенесена з іншої колони, оновити порядок там тобі
-    if (sourceColumnId !== String(columnId)) {
-      const sourceColumn = document.querySelector(
-        `.column[data-id="${sourceColumnId}"]`,
-      );
-      if (sourceColumn) {
-        const sourceOrder = Array.from(
-          sourceColumn.querySelectorAll(".card"),
-        ).map((x) => x.dataset.id);
-        await reorderColumnCards(sourceColumnId, sourceOrder);
-      }
-    }
+    // Порядок цільової колони з новою карткою переносить її на сервері;
+    // у вихідній колоні лишається лише проміжок у позиціях
+    queueCardOrder(columnId, list);
   });
 }
+
+/**
+ * Поставити в чергу синхронізації поточний порядок карток колони
+ */
+function queueCardOrder(columnId, list) {
+  const order = list.keys();
+  syncQueue.push(`cards:${columnId}`, () =>
+    reorderColumnCards(columnId, order),
+  );
+}
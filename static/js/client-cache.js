@@ -0,0 +1,172 @@
+/**
+ * Client Cache - знімки GET-відповідей та черга офлайн-змін в IndexedDB
+ *
+ * Знімок зберігає останні дані та ETag (ревізію) відповіді, тож повторний
+ * візит малює дошку з кешу без мережі, а потім перевіряє її умовним запитом.
+ * Зміни, надіслані без мережі, чекають у черзі (outbox) до відновлення зв'язку.
+ */
+
+const DB_NAME = "dashboard-cache";
+const DB_VERSION = 1;
+const SNAPSHOTS = "snapshots";
+const OUTBOX = "outbox";
+
+// Копія знімків у пам'яті: після першого читання IndexedDB більше не потрібна
+const memory = new Map();
+let dbPromise = null;
+
+/**
+ * Відкрити базу (null, якщо IndexedDB недоступна, напр. приватний режим)
+ */
+function openDb() {
+  if (dbPromise) return dbPromise;
+  dbPromise = new Promise((resolve) => {
+    if (typeof indexedDB === "undefined") {
+      resolve(null);
+      return;
+    }
+    try {
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        if (!db.objectStoreNames.contains(SNAPSHOTS)) {
+          db.createObjectStore(SNAPSHOTS);
+        }
+        if (!db.objectStoreNames.contains(OUTBOX)) {
+          db.createObjectStore(OUTBOX, { autoIncrement: true });
+        }
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => resolve(null);
+    } catch (_) {
+      resolve(null);
+    }
+  });
+  return dbPromise;
+}
+
+/**
+ * Виконати одну операцію над сховищем і дочекатися результату
+ */
+async function withStore(name, mode, operation) {
+  const db = await openDb();
+  if (!db) return undefined;
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(name, mode);
+    const request = operation(tx.objectStore(name));
+    tx.oncomplete = () => resolve(request?.result);
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+/**
+ * Прочитати знімок: { etag, data, savedAt } або null
+ */
+export async function readSnapshot(url) {
+  if (memory.has(url)) return memory.get(url);
+  let snapshot = null;
+  try {
+    snapshot =
+      (await withStore(SNAPSHOTS, "readonly", (s) => s.get(url))) || null;
+  } catch (_) {
+    snapshot = null;
+  }
+  // Паралельне читання могло вже заповнити пам'ять — тримаємо один об'єкт
+  if (!memory.has(url)) memory.set(url, snapshot);
+  return memory.get(url);
+}
+
+/**
+ * Зберегти знімок (запис у IndexedDB не блокує виклик)
+ */
+export function writeSnapshot(url, etag, data) {
+  const snapshot = { etag, data, savedAt: Date.now() };
+  memory.set(url, snapshot);
+  withStore(SNAPSHOTS, "readwrite", (s) => s.put(snapshot, url)).catch(
+    () => {},
+  );
+  return snapshot;
+}
+
+/**
+ * Додати зміну до черги; повертає кількість змін у черзі
+ * або null, якщо зберегти її нікуди (IndexedDB недоступна)
+ */
+export async function enqueueMutation(mutation) {
+  if (!(await openDb())) return null;
+  await withStore(OUTBOX, "readwrite", (s) =>
+    s.add({ ...mutation, queuedAt: Date.now() }),
+  );
+  return pendingMutations();
+}
+
+/**
+ * Кількість змін, що чекають на відправку
+ */
+export async function pendingMutations() {
+  try {
+    return (await withStore(OUTBOX, "readonly", (s) => s.count())) || 0;
+  } catch (_) {
+    return 0;
+  }
+}
+
+/**
+ * Прочитати чергу разом з ключами в одній транзакції
+ */
+async function readOutbox() {
+  const db = await openDb();
+  if (!db) return [];
+  return new Promise((resolve, reject) => {
+    const items = [];
+    const tx = db.transaction(OUTBOX, "readonly");
+    tx.objectStore(OUTBOX).openCursor().onsuccess = (event) => {
+      const cursor = event.target.result;
+      if (!cursor) return;
+      items.push({ key: cursor.key, mutation: cursor.value });
+      cursor.continue();
+    };
+    tx.oncomplete = () => resolve(items);
+    tx.onerror = () => reject(tx.error);
+  });
+}
+
+let replaying = null;
+
+/**
+ * Відправити чергу по порядку.
+ * Зупиняється на першій мережевій помилці; відхилені сервером зміни (4xx)
+ * видаляються, щоб не блокувати решту. Повертає { sent, rejected }.
+ */
+export function replayMutations(send) {
+  // "online" і старт сторінки можуть збігтися — одна відправка за раз
+  if (!replaying) {
+    replaying = replay(send).finally(() => {
+      replaying = null;
+    });
+  }
+  return replaying;
+}
+
+async function replay(send) {
+  const result = { sent: 0, rejected: 0 };
+  const items = await readOutbox().catch(() => []);
+
+  for (const { key, mutation } of items) {
+    let response;
+    try {
+      response = await send(mutation);
+    } catch (_) {
+      break; // досі офлайн — спробуємо пізніше
+    }
+    if (response.status >= 500) break;
+    if (response.ok) {
+      result.sent += 1;
+    } else {
+      result.rejected += 1;
+    }
+    await withStore(OUTBOX, "readwrite", (s) => s.delete(key));
+  }
+  return result;
+}
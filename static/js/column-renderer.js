@@ -6,13 +6,22 @@ import { createElement } from "./dom-utils.js";
 import { dragManager } from "./drag-manager.js";
 import {
   createCardElement,
+  fillCardElement,
   attachColumnDropHandlers,
 } from "./card-renderer.js";
+import { CardList, VirtualCardList, VIRTUAL_THRESHOLD } from "./card-list.js";
 
 /**
  * Створити елемент колони з картами
+ *
+ * Колони з понад virtualThreshold картками рендерять лише видиму частину
+ * списку (VirtualCardList); список доступний як colElement._cardList.
  */
-export function createColumnElement(column, onCardClick) {
+export function createColumnElement(
+  column,
+  onCardClick,
+  { virtualThreshold = VIRTUAL_THRESHOLD } = {},
+) {
   const colElement = createElement("div", "column");
   colElement.dataset.id = column.id;
 
@@ -33,18 +42,42 @@ export function createColumnElement(column, onCardClick) {
   colElement.appendChild(colTitle);
 
   // === Cards in Column ===
-  column.cards.forEach((card) => {
-    const cardElement = createCardElement(
-      card,
-      column.id,
-      colElement,
-      onCardClick,
-    );
-    colElement.appendChild(cardElement);
-  });
+  const renderCard = (node, card) =>
+    node
+      ? fillCardElement(node, card, column.id)
+      : createCardElement(card, column.id, colElement, onCardClick);
+
+  if (column.cards.length > virtualThreshold) {
+    const listElement = createElement("div");
+    colElement.appendChild(listElement);
+    colElement._cardList = new VirtualCardList(listElement, renderCard);
+  } else {
+    colElement._cardList = new CardList(colElement, renderCard);
+  }
+  colElement._cardList.setItems(column.cards);
+  colElement._virtualThreshold = virtualThreshold;
 
   // === Column-level drop handlers ===
   attachColumnDropHandlers(colElement, column.id);
 
   return colElement;
 }
+
+/**
+ * Оновити наявний елемент колони новими даними (назва та картки за id).
+ * Повертає false, якщо колона має перейти між звичайним і віртуальним
+ * списком — тоді її треба створити заново.
+ */
+export function patchColumnElement(colElement, column) {
+  const virtual = column.cards.length > colElement._virtualThreshold;
+  if (virtual !== colElement._cardList instanceof VirtualCardList) {
+    return false;
+  }
+
+  const colTitle = colElement.querySelector(".col-title");
+  if (colTitle.textContent !== column.name) {
+    colTitle.textContent = column.name;
+  }
+  colElement._cardList.setItems(column.cards);
+  return true;
+}
@@ -9,3 +9,34 @@ export function createElement(tag, className, text) {
   return element;
 }
 
+
+// Розібрані шаблони: HTML парситься один раз, далі вузли лише клонуються
+const templates = new Map();
+
+/**
+ * Клонувати перший елемент шаблону, заданого рядком HTML
+ */
+export function cloneTemplate(html) {
+  let template = templates.get(html);
+  if (!template) {
+    template = document.createElement("template");
+    template.innerHTML = html.trim();
+    templates.set(html, template);
+  }
+  return template.content.firstElementChild.cloneNode(true);
+}
+
+/**
+ * Розставити вузли в контейнері в заданому порядку, починаючи з cursor.
+ * Вузли, що вже стоять на своєму місці, не переносяться (без зайвих мутацій
+ * DOM і втрати прокрутки); нові вставляються перед cursor.
+ */
+export function placeChildren(container, nodes, cursor) {
+  for (const node of nodes) {
+    if (node === cursor) {
+      cursor = node.nextSibling;
+    } else {
+      container.insertBefore(node, cursor);
+    }
+  }
+}
@@ -2,6 +2,11 @@
  * Drag Manager - централізоване управління станом перетягування
  */
 
+// Зона біля краю контейнера (px), у якій вмикається автопрокрутка
+const AUTO_SCROLL_EDGE = 48;
+// Без нових dragover довше за цей час (мс) прокрутка зупиняється
+const AUTO_SCROLL_IDLE = 150;
+
 export const dragManager = {
   state: {
     type: null, // 'column' | 'card' | null
@@ -25,6 +30,46 @@ export const dragManager = {
    */
   reset() {
     this.state = { type: null, columnId: null, cardId: null };
+    this.stopAutoScroll();
+  },
+
+  scroll: { container: null, speed: 0, updatedAt: 0 },
+  scrollFrame: null,
+
+  /**
+   * Автопрокрутка контейнера, поки курсор біля його краю (викликати з dragover)
+   */
+  autoScroll(container, clientY) {
+    const rect = container.getBoundingClientRect();
+    let speed = 0;
+    if (clientY < rect.top + AUTO_SCROLL_EDGE) {
+      speed = -Math.ceil((rect.top + AUTO_SCROLL_EDGE - clientY) / 3);
+    } else if (clientY > rect.bottom - AUTO_SCROLL_EDGE) {
+      speed = Math.ceil((clientY - (rect.bottom - AUTO_SCROLL_EDGE)) / 3);
+    }
+    this.scroll = { container, speed, updatedAt: performance.now() };
+    if (speed !== 0 && this.scrollFrame === null) {
+      this.scrollFrame = requestAnimationFrame(() => this.stepAutoScroll());
+    }
+  },
+
+  stepAutoScroll() {
+    const { container, speed, updatedAt } = this.scroll;
+    const idle = performance.now() - updatedAt > AUTO_SCROLL_IDLE;
+    if (!container || speed === 0 || idle || !this.state.type) {
+      this.scrollFrame = null;
+      return;
+    }
+    container.scrollTop += speed;
+    this.scrollFrame = requestAnimationFrame(() => this.stepAutoScroll());
+  },
+
+  stopAutoScroll() {
+    if (this.scrollFrame !== null) {
+      cancelAnimationFrame(this.scrollFrame);
+      this.scrollFrame = null;
+    }
+    this.scroll = { container: null, speed: 0, updatedAt: 0 };
   },
 
   /**
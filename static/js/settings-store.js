@@ -25,6 +25,9 @@ export function mergeSettings(current, incoming) {
   return next;
 }
 
+/**
+ * Живий перегляд налаштувань (модалка): інлайн-стилі поверх /theme.css
+ */
 export function applySettingsToDom(settings) {
   const root = document.documentElement;
   root.style.setProperty("--cols-per-row", settings.cols_per_row);
@@ -100,6 +103,75 @@ export function applySettingsToDom(settings) {
   }
 }
 
+// Властивості, які живий перегляд ставить інлайн поверх /theme.css
+const PREVIEW_PROPERTIES = [
+  "--cols-per-row",
+  "--column-width",
+  "--card-height",
+  "--column-bg",
+  "--card-bg",
+  "--card-text-color",
+  "--card-text-muted",
+  "--card-link-color",
+  "--card-menu-color",
+];
+
+/**
+ * Прибрати інлайн-стилі живого перегляду — далі діє таблиця теми
+ */
+export function clearSettingsPreview() {
+  const root = document.documentElement;
+  PREVIEW_PROPERTIES.forEach((name) => root.style.removeProperty(name));
+
+  const bgEl = document.getElementById("bg");
+  if (bgEl) {
+    bgEl.classList.remove("has-custom-bg");
+    bgEl.removeAttribute("style");
+  } else {
+    document.body.style.background = "";
+  }
+}
+
+let pendingThemeRevision = null;
+
+/**
+ * Підключити /theme.css потрібної ревізії налаштувань.
+ * Нова таблиця додається поруч зі старою, а стара зникає лише після
+ * завантаження нової, тож сторінка не лишається без теми ані на кадр.
+ */
+export function useThemeRevision(revision) {
+  const link = document.getElementById("themeStylesheet");
+  if (!link || revision === null) return;
+  const url = new URL(link.href, window.location.href);
+  const version = String(revision);
+  if (url.searchParams.get("v") === version) return;
+  if (pendingThemeRevision === version) return;
+
+  pendingThemeRevision = version;
+  url.searchParams.set("v", version);
+  const next = link.cloneNode();
+  next.href = `${url.pathname}${url.search}`;
+  next.addEventListener(
+    "load",
+    () => {
+      link.remove();
+      pendingThemeRevision = null;
+      clearSettingsPreview();
+    },
+    { once: true },
+  );
+  link.after(next);
+}
+
+/**
+ * Оновити заголовок дошки (сторінка з кешу service worker може мати старий)
+ */
+export function applyDashboardTitle(title) {
+  const titleEl = document.getElementById("dashboardTitle");
+  if (titleEl) titleEl.textContent = title;
+  document.title = title;
+}
+
 function hexToRgb(hex) {
   const normalized = hex.replace("#", "");
   const full =
@@ -0,0 +1,86 @@
+/**
+ * Sync Queue - відкладена та злита відправка змін порядку на сервер
+ *
+ * Перетягування одразу змінює порядок на екрані, а запит іде на сервер через
+ * SYNC_DELAY мс після останньої зміни. Для кожного ключа (список колон або
+ * картки однієї колони) надсилається лише найновіший порядок. Запити йдуть
+ * по черзі, тож кожен несе ревізію дошки, яку повернув попередній; якщо
+ * запит не вдався (в т.ч. 412 — дошку змінили деінде), решта черги
+ * скасовується і викликається onFailure, щоб повернути екран до стану сервера.
+ */
+
+const SYNC_DELAY = 300;
+
+export const syncQueue = {
+  delay: SYNC_DELAY,
+  pending: new Map(), // key -> () => Promise<Response>
+  timer: null,
+  flushing: null,
+  onFailure: null, // (response | null, error | null) => void
+
+  /**
+   * Запланувати запит; новіший запит того ж ключа замінює попередній
+   * і стає в кінець черги (після змін, від яких він може залежати)
+   */
+  push(key, request) {
+    this.pending.delete(key);
+    this.pending.set(key, request);
+    clearTimeout(this.timer);
+    this.timer = setTimeout(() => this.flush(), this.delay);
+  },
+
+  /**
+   * Чи є ще не підтверджені сервером зміни
+   */
+  isBusy() {
+    return this.pending.size > 0 || this.flushing !== null;
+  },
+
+  /**
+   * Надіслати все, що накопичилося, не чекаючи таймера
+   */
+  flush() {
+    clearTimeout(this.timer);
+    this.timer = null;
+    // Нова порція йде лише після того, як попередня отримала відповіді
+    const run = (this.flushing || Promise.resolve()).then(() => this.drain());
+    const current = run.finally(() => {
+      if (this.flushing === current) this.flushing = null;
+    });
+    this.flushing = current;
+    return current;
+  },
+
+  /**
+   * Дочекатися, поки всі зміни будуть надіслані (або відкинуті)
+   */
+  async settled() {
+    while (this.isBusy()) {
+      await (this.flushing || this.flush());
+    }
+  },
+
+  async drain() {
+    const batch = [...this.pending.values()];
+    this.pending.clear();
+
+    for (const request of batch) {
+      let response = null;
+      let error = null;
+      try {
+        response = await request();
+      } catch (err) {
+        error = err;
+      }
+      if (response?.ok) continue;
+
+      // Наступні порядки будувалися поверх відхиленого — скасувати їх теж
+      this.pending.clear();
+      clearTimeout(this.timer);
+      this.timer = null;
+      // Без await: обробник може сам чекати на settled()
+      this.onFailure?.(response, error);
+      return;
+    }
+  },
+};
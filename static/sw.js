@@ -0,0 +1,103 @@
+/**
+ * Service Worker - оболонка застосунку (HTML, JS, CSS, шрифти) з кешу
+ *
+ * Стратегія stale-while-revalidate: відповідь одразу з Cache Storage, а
+ * оновлена копія завантажується у фоні для наступного візиту. Запити до API
+ * сюди не потрапляють — їх кешує api.js (IndexedDB + ETag).
+ */
+
+const CACHE = "dashboard-shell-v4";
+const SHELL = [
+  "/",
+  "/static/app.js",
+  "/static/style.css",
+  "/static/fonts/Montserrat-VariableFont_wght.ttf.woff2",
+  "/static/js/api.js",
+  "/static/js/board-manager.js",
+  "/static/js/card-list.js",
+  "/static/js/card-renderer.js",
+  "/static/js/client-cache.js",
+  "/static/js/column-renderer.js",
+  "/static/js/dom-utils.js",
+  "/static/js/drag-manager.js",
+  "/static/js/modal-manager.js",
+  "/static/js/settings-store.js",
+  "/static/js/sync-queue.js",
+  "/static/js/ui-feedback.js",
+];
+
+// Шляхи, які завжди йдуть у мережу. Завантаження (фони) браузер і так
+// кешує надовго за Cache-Control, а в Cache Storage вони накопичувались би.
+const BYPASS = [
+  /\/api\//,
+  /^\/admin\//,
+  /^\/metrics$/,
+  /^\/sw\.js$/,
+  /^\/static\/uploads\//,
+];
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches
+      .open(CACHE)
+      .then((cache) => cache.addAll(SHELL))
+      .then(() => self.skipWaiting()),
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((keys) =>
+        Promise.all(
+          keys.filter((key) => key !== CACHE).map((key) => caches.delete(key)),
+        ),
+      )
+      .then(() => self.clients.claim()),
+  );
+});
+
+self.addEventListener("fetch", (event) => {
+  const { request } = event;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin) return;
+  if (BYPASS.some((pattern) => pattern.test(url.pathname))) return;
+
+  event.respondWith(staleWhileRevalidate(event, request));
+});
+
+async function staleWhileRevalidate(event, request) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(request);
+  const network = fetch(request).then((response) => {
+    // Лише повні відповіді: cache.put відхиляє 206 (Range) з TypeError
+    if (response.status === 200) {
+      event.waitUntil(store(cache, request, response.clone()).catch(() => {}));
+    }
+    return response;
+  });
+
+  if (cached) {
+    // Оновити кеш у фоні, навіть якщо сторінка вже отримала відповідь
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  return network;
+}
+
+/**
+ * Зберегти відповідь; для /theme.css?v=N прибрати інші ревізії того ж шляху,
+ * щоб кожна зміна налаштувань не лишала в кеші ще одну копію.
+ */
+async function store(cache, request, response) {
+  const url = new URL(request.url);
+  if (url.pathname.endsWith("/theme.css")) {
+    const stale = (await cache.keys()).filter((key) => {
+      const old = new URL(key.url);
+      return old.pathname === url.pathname && old.search !== url.search;
+    });
+    await Promise.all(stale.map((key) => cache.delete(key)));
+  }
+  await cache.put(request, response);
+}
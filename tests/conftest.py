@@ -1,3 +1,4 @@
+import shutil
 from pathlib import Path
 
 import pytest
@@ -16,12 +17,20 @@ def run_migrations(db_path: Path) -> None:
     command.upgrade(cfg, "head")
 
 
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory) -> Path:
+    """Migrate once per session; each test gets a file copy of the result."""
+    db_path = tmp_path_factory.mktemp("template") / "template.db"
+    run_migrations(db_path)
+    return db_path
+
+
 @pytest.fixture()
-def app(tmp_path: Path):
+def app(tmp_path: Path, template_db: Path):
     db_path = tmp_path / "test.db"
     upload_dir = tmp_path / "uploads"
     upload_dir.mkdir(parents=True, exist_ok=True)
-    run_migrations(db_path)
+    shutil.copyfile(template_db, db_path)
 
     test_app = create_app(
         "testing",
@@ -29,6 +38,11 @@ def app(tmp_path: Path):
             "DB_PATH": db_path,
             "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
             "UPLOAD_DIR": upload_dir,
+            "UPLOAD_TMP_DIR": tmp_path / "uploads-tmp",
+            "PAYLOAD_CACHE_DIR": tmp_path / "cache",
+            "BACKUP_DIR": tmp_path / "backups",
+            "JOBS_DB_PATH": tmp_path / "jobs.db",
+            "JOBS_WORKERS": 0,
             "TESTING": True,
             "SECRET_KEY": "test-secret-key",
         },
@@ -2,6 +2,9 @@ from io import BytesIO
 
 from PIL import Image
 
+from app.extensions import db
+from app.models import Card
+
 
 def make_image_file(
     image_format: str = "PNG",
@@ -95,6 +98,61 @@ def test_reorder_cards_rejects_partial_payload(client):
     assert second["id"] != first["id"]
 
 
+def test_reorder_checks_board_revision(client):
+    state = client.get("/api/state")
+    order = [column["id"] for column in state.get_json()["columns"]]
+
+    res = client.post(
+        "/api/column/reorder",
+        json={"order": order[::-1]},
+        headers={"If-Match": state.headers["ETag"]},
+    )
+    assert res.status_code == 204
+    assert res.headers["ETag"] == client.get("/api/state").headers["ETag"]
+    assert res.headers["ETag"] != state.headers["ETag"]
+
+    stale = client.post(
+        "/api/column/reorder", json={"order": order}, headers={"If-Match": state.headers["ETag"]}
+    )
+    assert stale.status_code == 412
+    assert stale.headers["ETag"] == res.headers["ETag"]
+    columns = client.get("/api/state").get_json()["columns"]
+    assert [column["id"] for column in columns] == order[::-1]
+
+    assert client.post("/api/column/reorder", json={"order": order}).status_code == 204
+
+
+def test_reorder_cards_moves_cards_from_other_columns(client):
+    columns = client.get("/api/state").get_json()["columns"]
+    source, target = columns[0]["id"], columns[1]["id"]
+    card = client.post("/api/card", json={"title": "Moved", "column_id": source}).get_json()
+    target_ids = [item["id"] for item in columns[1]["cards"]]
+
+    res = client.post(
+        f"/api/column/{target}/reorder-cards", json={"order": [card["id"], *target_ids]}
+    )
+    assert res.status_code == 204
+    columns = client.get("/api/state").get_json()["columns"]
+    assert [item["id"] for item in columns[1]["cards"]] == [card["id"], *target_ids]
+    assert card["id"] not in [item["id"] for item in columns[0]["cards"]]
+
+
+def test_reorder_cards_of_a_large_column(app, client):
+    col_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    with app.app_context():
+        db.session.add_all(
+            Card(title=f"Card {i}", column_id=col_id, position=i) for i in range(1500)
+        )
+        db.session.commit()
+    ids = [card["id"] for card in client.get("/api/state").get_json()["columns"][0]["cards"]]
+    assert len(ids) == 1500
+
+    res = client.post(f"/api/column/{col_id}/reorder-cards", json={"order": ids[::-1]})
+    assert res.status_code == 204
+    cards = client.get("/api/state").get_json()["columns"][0]["cards"]
+    assert [card["id"] for card in cards] == ids[::-1]
+
+
 def test_upload_bg_rejects_non_image_content(client):
     fake_file = (BytesIO(b"not-an-image"), "bg.png")
     res = client.post(
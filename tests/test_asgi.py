@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+from app.asgi import create_asgi_app
+
+
+async def asgi_request(asgi_app, method, path, body=b"", headers=None):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")] + list(headers or []),
+        "http_version": "1.1",
+        "client": ("127.0.0.1", 5000),
+        "server": ("testserver", 80),
+    }
+    # Deliver the body in two chunks like a slow client would.
+    messages = [
+        {"type": "http.request", "body": body[:3], "more_body": True},
+        {"type": "http.request", "body": body[3:], "more_body": False},
+    ]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    start = sent[0]
+    payload = b"".join(message.get("body", b"") for message in sent[1:])
+    return start["status"], dict(start["headers"]), payload
+
+
+def test_asgi_mode_serves_same_state_as_wsgi(app, client):
+    asgi_app = create_asgi_app(app)
+    status, headers, payload = asyncio.run(asgi_request(asgi_app, "GET", "/api/state"))
+    assert status == 200
+    assert headers[b"content-type"] == b"application/json"
+    assert json.loads(payload) == client.get("/api/state").get_json()
+
+
+def test_asgi_mode_handles_mutations(app, client):
+    asgi_app = create_asgi_app(app)
+    col_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    body = json.dumps({"title": "Async", "column_id": col_id}).encode()
+
+    status, _, payload = asyncio.run(asgi_request(asgi_app, "POST", "/api/card", body))
+    assert status == 201
+    assert json.loads(payload)["title"] == "Async"
+    titles = [card["title"] for card in client.get("/api/state").get_json()["columns"][0]["cards"]]
+    assert titles == ["Async"]
+
+
+def test_asgi_events_stream_sends_revision_and_stops_on_disconnect(app):
+    asgi_app = create_asgi_app(app)
+    sent = []
+    disconnect = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message.get("body"):
+            disconnect.set()
+
+    scope = {"type": "http", "method": "GET", "path": "/api/events", "headers": []}
+    asyncio.run(asyncio.wait_for(asgi_app(scope, receive, send), timeout=5))
+
+    assert sent[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+    assert sent[1]["body"].startswith(b'event: state\ndata: {"revision": ')
+    assert asgi_app.events._subscribers == set()
+
+
+def test_asgi_mode_rejects_oversized_body_while_buffering(app):
+    app.config["MAX_CONTENT_LENGTH"] = 8
+    asgi_app = create_asgi_app(app)
+    status, _, payload = asyncio.run(
+        asgi_request(asgi_app, "POST", "/api/column", b'{"name": "too long"}')
+    )
+    assert status == 413
+    assert json.loads(payload)["error"]["message"] == "file too large"
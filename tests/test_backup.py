@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+
+import pytest
+
+from alembic import command
+from app.backup import RestoreError, copy_database, get_backups, restore_database
+from app.shards import _alembic_config
+
+ADMIN_TOKEN = "admin-test-token"
+
+
+@pytest.fixture()
+def backup_app(app):
+    app.config.update(ADMIN_TOKEN=ADMIN_TOKEN, BACKUP_KEEP=2, BACKUP_PAGES_PER_STEP=1)
+    return app
+
+
+def admin_headers():
+    return {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+
+def card_titles(path) -> list[str]:
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT title FROM cards ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_admin_backup_is_a_consistent_copy(backup_app):
+    client = backup_app.test_client()
+    col_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    client.post("/api/card", json={"title": "Kept", "column_id": col_id})
+
+    res = client.post("/admin/backups", headers=admin_headers())
+
+    assert res.status_code == 201
+    manifest = res.get_json()
+    assert [item["path"] for item in manifest["files"]] == ["data.db"]
+    copy = backup_app.config["BACKUP_DIR"] / manifest["name"] / "data.db"
+    assert card_titles(copy) == ["Kept"]
+    listing = client.get("/admin/backups", headers=admin_headers()).get_json()
+    assert [item["name"] for item in listing["backups"]] == [manifest["name"]]
+
+
+def test_old_backups_are_pruned(backup_app):
+    backups = get_backups(backup_app)
+    names = [backups.create()["name"] for _ in range(3)]
+
+    assert [item["name"] for item in backups.list()] == names[:0:-1]
+    assert not (backup_app.config["BACKUP_DIR"] / names[0]).exists()
+
+
+def test_copy_is_consistent_while_writers_commit(app, tmp_path):
+    source = app.config["DB_PATH"]
+    stop = threading.Event()
+
+    def write():
+        conn = sqlite3.connect(source, timeout=5)
+        while not stop.is_set():
+            conn.execute("INSERT INTO columns (name, position) VALUES ('Busy', 0)")
+            conn.commit()
+        conn.close()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        copy_database(
+            source, tmp_path / "copy.db", pages_per_step=1, step_sleep=0.001, max_restarts=3
+        )
+    finally:
+        stop.set()
+        thread.join()
+
+    conn = sqlite3.connect(tmp_path / "copy.db")
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert conn.execute("SELECT count(*) FROM alembic_version").fetchone()[0] == 1
+    conn.close()
+
+
+def revisions(path) -> dict[str, int]:
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT name, value FROM revisions"))
+    finally:
+        conn.close()
+
+
+def test_restore_upgrades_an_old_backup_to_head(app, tmp_path):
+    old = tmp_path / "old.db"
+    cfg = _alembic_config()
+    cfg.attributes["sqlalchemy.url"] = f"sqlite:///{old}"
+    command.upgrade(cfg, "head")
+    command.downgrade(cfg, "-1")
+
+    head = restore_database(old, tmp_path / "restored.db")
+
+    conn = sqlite3.connect(tmp_path / "restored.db")
+    assert conn.execute("SELECT version_num FROM alembic_version").fetchone()[0] == head
+    conn.close()
+    with pytest.raises(RestoreError, match="already exists"):
+        restore_database(old, tmp_path / "restored.db")
+
+
+def test_restore_rejects_unknown_revision(app, tmp_path):
+    source = tmp_path / "future.db"
+    copy_database(app.config["DB_PATH"], source, -1, 0, 0)
+    conn = sqlite3.connect(source)
+    conn.execute("UPDATE alembic_version SET version_num = 'f00dfeed'")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(RestoreError, match="unknown schema revision"):
+        restore_database(source, tmp_path / "restored.db")
+    assert not (tmp_path / "restored.db").exists()
+
+
+def test_backup_cli_create_and_restore(backup_app, tmp_path):
+    runner = backup_app.test_cli_runner()
+
+    created = runner.invoke(args=["backup", "create"])
+    assert created.exit_code == 0, created.output
+    name = get_backups(backup_app).list()[0]["name"]
+    output = tmp_path / "restored.db"
+
+    client = backup_app.test_client()
+    client.post("/api/column", json={"name": "After the backup"})
+    client.put("/api/settings", json={"dashboard_title": "After the backup"})
+    live = revisions(backup_app.config["DB_PATH"])
+
+    restored = runner.invoke(args=["backup", "restore", name, "--output", str(output)])
+
+    assert restored.exit_code == 0, restored.output
+    assert output.is_file()
+    # Clients may hold ETags and theme URLs for every live revision.
+    assert all(value > live[key] for key, value in revisions(output).items())
+    missing = runner.invoke(args=["backup", "restore", "nope"])
+    assert missing.exit_code != 0
+    assert "backup not found" in missing.output
@@ -0,0 +1,115 @@
+import multiprocessing
+import threading
+import time
+
+from app.cache import SharedPayloadCache
+from app.metrics import registry
+from app.repositories import BoardRepository, SettingsRepository
+
+
+def cache_results(cache: str) -> dict:
+    results = {}
+    for item in registry.snapshot()["counters"]:
+        if item["name"] == "dashboard_cache_requests_total" and item["labels"]["cache"] == cache:
+            results[item["labels"]["result"]] = item["value"]
+    return results
+
+
+def test_triggers_bump_revisions(app):
+    with app.app_context():
+        board, settings = BoardRepository(), SettingsRepository()
+        start = board.revision(), settings.revision()
+        column = board.add_column("Tracked")
+        board.add_card(title="A", column_id=column["id"], link="", description="", icon="")
+        assert board.revision() == start[0] + 2
+        assert settings.revision() == start[1]
+
+        settings.update({"cols_per_row": 2})
+        assert settings.revision() == start[1] + 1
+
+
+def test_state_is_cached_until_the_board_changes(client):
+    registry.reset()
+    first = client.get("/api/state")
+    assert client.get("/api/state").data == first.data
+    assert cache_results("board") == {"miss": 1.0, "hit": 1.0}
+
+    client.post("/api/column", json={"name": "Fresh"})
+    names = [column["name"] for column in client.get("/api/state").get_json()["columns"]]
+    assert "Fresh" in names
+    assert cache_results("board")["miss"] == 2.0
+
+
+def test_cached_settings_follow_updates(client):
+    assert client.get("/api/settings").get_json()["cols_per_row"] == 3
+    client.put("/api/settings", json={"cols_per_row": 2})
+    assert client.get("/api/settings").get_json()["cols_per_row"] == 2
+
+
+def _racer(directory, counter, barrier):
+    cache = SharedPayloadCache(directory)
+
+    def build():
+        with counter.get_lock():
+            counter.value += 1
+        time.sleep(0.2)
+        return b"payload"
+
+    barrier.wait()
+    assert cache.get("board", 7, build) == b"payload"
+
+
+def test_rebuild_is_single_flight_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    counter = ctx.Value("i", 0)
+    barrier = ctx.Barrier(4)
+    procs = [ctx.Process(target=_racer, args=(tmp_path, counter, barrier)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(timeout=10)
+    assert [proc.exitcode for proc in procs] == [0, 0, 0, 0]
+    assert counter.value == 1
+
+
+def test_serve_stale_returns_previous_revision_during_rebuild(tmp_path):
+    cache = SharedPayloadCache(tmp_path, serve_stale=True)
+    cache.get("board", 1, lambda: b"old")
+    building = threading.Event()
+
+    def slow_build():
+        building.set()
+        time.sleep(0.3)
+        return b"new"
+
+    builder = threading.Thread(target=cache.get, args=("board", 2, slow_build))
+    builder.start()
+    building.wait(timeout=5)
+    assert cache.get("board", 2, lambda: b"unexpected") == b"old"
+    builder.join()
+    assert cache.get("board", 2, lambda: b"unexpected") == b"new"
+
+
+def test_conditional_requests_use_the_revision_etag(client):
+    first = client.get("/api/state")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    unchanged = client.get("/api/state", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+
+    client.post("/api/column", json={"name": "Changed"})
+    changed = client.get("/api/state", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+    settings_etag = client.get("/api/settings").headers["ETag"]
+    assert client.get("/api/settings", headers={"If-None-Match": settings_etag}).status_code == 304
+
+
+def test_service_worker_is_served_from_the_root(client):
+    res = client.get("/sw.js")
+    assert res.status_code == 200
+    assert res.mimetype == "application/javascript"
+    assert res.headers["Cache-Control"] == "no-cache"
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import select, text
+
+from alembic import command
+from app.extensions import db
+from app.models import Card
+from app.shards import _alembic_config
+from app.urls import canonical_url
+
+
+@pytest.fixture()
+def column_ids(client):
+    return [column["id"] for column in client.get("/api/state").get_json()["columns"]]
+
+
+@pytest.mark.parametrize(
+    "link, expected",
+    [
+        ("HTTPS://Example.COM:443/a/b/?utm_source=x&id=3&fbclid=1", "https://example.com/a/b?id=3"),
+        ("http://example.com:8080/", "http://example.com:8080"),
+        ("http://example.com/Path/#top", "http://example.com/Path#top"),
+        ("", ""),
+    ],
+)
+def test_canonical_url(link, expected):
+    assert canonical_url(link) == expected
+
+
+def test_duplicates_report_groups_canonical_links(client, column_ids):
+    first, second = column_ids[:2]
+    links = ["https://example.com/", "HTTPS://EXAMPLE.com?utm_medium=x", "https://other.org"]
+    cards = [
+        client.post("/api/card", json={"title": str(i), "column_id": col, "link": link}).get_json()
+        for i, (col, link) in enumerate(zip([first, second, first], links, strict=True))
+    ]
+
+    report = client.get("/api/duplicates").get_json()
+    assert report == {"duplicates": [{"link": "https://example.com", "cards": cards[:2]}]}
+
+    lookup = client.get("/api/duplicates", query_string={"link": "https://example.com:443/"})
+    assert lookup.get_json() == {"link": "https://example.com", "cards": cards[:2]}
+
+    client.put(f"/api/card/{cards[1]['id']}", json={"link": "https://other.org/"})
+    report = client.get("/api/duplicates").get_json()
+    assert [group["link"] for group in report["duplicates"]] == ["https://other.org"]
+
+
+def test_unique_add_rejects_a_duplicate_link(client, column_ids):
+    payload = {"title": "A", "column_id": column_ids[0], "link": "https://example.com/a"}
+    card = client.post("/api/card?unique=1", json=payload).get_json()
+
+    res = client.post("/api/card?unique=1", json={**payload, "link": "https://EXAMPLE.com/a/"})
+    assert res.status_code == 409
+    assert res.get_json()["error"]["details"] == {"duplicates": [card]}
+    assert client.post("/api/card", json=payload).status_code == 201
+
+
+def test_duplicate_queries_use_the_index(app):
+    lookup = select(Card.id).where(Card.canonical_link == "x", Card.column_id > 0)
+    report = select(Card.canonical_link).group_by(Card.canonical_link)
+    with app.app_context():
+        plans = []
+        for stmt in (lookup, report):
+            sql = stmt.compile(db.engine, compile_kwargs={"literal_binds": True})
+            rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+            plans.append(" ".join(row[-1] for row in rows))
+    assert all("COVERING INDEX ix_cards_canonical_link" in plan for plan in plans)
+    assert "TEMP B-TREE" not in plans[1]
+
+
+def test_migration_backfills_canonical_links(app, tmp_path):
+    path = tmp_path / "old.db"
+    cfg = _alembic_config()
+    cfg.attributes["sqlalchemy.url"] = f"sqlite:///{path}"
+    command.upgrade(cfg, "20261019_0004")
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO columns (id, name, position) VALUES (100, 'Old', 9)")
+    conn.executemany(
+        "INSERT INTO cards (column_id, title, link, description, icon, position) "
+        "VALUES (100, 't', ?, '', '', 0)",
+        [("HTTP://Example.com/x/",), ("",)],
+    )
+    conn.commit()
+    conn.close()
+
+    command.upgrade(cfg, "head")
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT canonical_link FROM cards WHERE column_id = 100 ORDER BY id")
+    assert [row[0] for row in rows] == ["http://example.com/x", ""]
+    indexes = [row[1] for row in conn.execute("PRAGMA index_list(cards)")]
+    conn.close()
+    assert "ix_cards_canonical_link" in indexes
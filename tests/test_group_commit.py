@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.extensions import db
+from app.metrics import registry
+from app.models import Column
+from app.repositories.group_commit import GroupCommitWriter, _coalesce, _Job, get_writer
+
+
+@pytest.fixture()
+def group_app(app):
+    app.config.update(
+        GROUP_COMMIT_ENABLED=True, GROUP_COMMIT_WINDOW_MS=50, GROUP_COMMIT_MAX_BATCH=64
+    )
+    return app
+
+
+def commit_count() -> int:
+    for item in registry.snapshot()["histograms"]:
+        if item["name"] == "dashboard_db_commit_duration_seconds":
+            return item["count"]
+    return 0
+
+
+def test_concurrent_mutations_share_commits(group_app):
+    col_id = group_app.test_client().get("/api/state").get_json()["columns"][0]["id"]
+    registry.reset()
+    barrier = threading.Barrier(16)
+
+    def add(index):
+        client = group_app.test_client()
+        barrier.wait()
+        return client.post("/api/card", json={"title": f"Card {index}", "column_id": col_id})
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        responses = list(pool.map(add, range(16)))
+
+    assert [res.status_code for res in responses] == [201] * 16
+    assert len({res.get_json()["id"] for res in responses}) == 16
+    assert commit_count() < 16
+    cards = group_app.test_client().get("/api/state").get_json()["columns"][0]["cards"]
+    assert len(cards) == 16
+
+
+def test_reorders_of_same_column_are_coalesced():
+    jobs = [_Job(lambda: "a", ("reorder_cards", 1)), _Job(lambda: "b", None)]
+    jobs.append(_Job(lambda: "c", ("reorder_cards", 1)))
+    jobs.append(_Job(lambda: "d", ("reorder_cards", 2)))
+
+    kept = _coalesce(jobs)
+
+    assert [job.op() for job in kept] == ["b", "c", "d"]
+    assert kept[1].superseded == [jobs[0]]
+
+
+def test_concurrent_conditional_reorders_are_not_coalesced(group_app):
+    client = group_app.test_client()
+    state = client.get("/api/state")
+    column = state.get_json()["columns"][0]
+    for index in range(3):
+        client.post("/api/card", json={"title": f"Card {index}", "column_id": column["id"]})
+    state = client.get("/api/state")
+    ids = [card["id"] for card in state.get_json()["columns"][0]["cards"]]
+    orders = [ids[::-1], ids[1:] + ids[:1]]
+    barrier = threading.Barrier(2)
+
+    def reorder(order):
+        client = group_app.test_client()
+        barrier.wait()
+        return client.post(
+            f"/api/column/{column['id']}/reorder-cards",
+            json={"order": order},
+            headers={"If-Match": state.headers["ETag"]},
+        )
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(reorder, orders))
+
+    statuses = [res.status_code for res in responses]
+    assert sorted(statuses) == [204, 412]
+    cards = client.get("/api/state").get_json()["columns"][0]["cards"]
+    assert [card["id"] for card in cards] == orders[statuses.index(204)]
+
+
+def test_refused_reorder_replays_the_superseded_ones(group_app):
+    writer = GroupCommitWriter(group_app, window=0.05, max_batch=8)
+    applied = []
+
+    def reorder(order, error=None):
+        def op():
+            if error is not None:
+                return None, error
+            applied.append(order)
+            return len(applied), None
+
+        return op
+
+    jobs = [
+        _Job(reorder([1, 2]), ("reorder_cards", 1)),
+        _Job(reorder([2, 1]), ("reorder_cards", 1)),
+        _Job(reorder([9], "incomplete_or_invalid_order"), ("reorder_cards", 1)),
+    ]
+    writer._execute_board(None, _coalesce(jobs))
+
+    assert applied == [[1, 2], [2, 1]]
+    assert [job.futures[0].result() for job in jobs] == [
+        (1, None),
+        (2, None),
+        (None, "incomplete_or_invalid_order"),
+    ]
+
+    jobs = [_Job(reorder([1]), ("reorder_cards", 1)), _Job(reorder([2]), ("reorder_cards", 1))]
+    writer._execute_board(None, _coalesce(jobs))
+    assert applied[2:] == [[2]]
+    assert [job.futures[0].result() for job in jobs] == [(3, None), (3, None)]
+
+
+def test_failing_mutation_does_not_fail_the_batch(group_app):
+    writer = GroupCommitWriter(group_app, window=0.05, max_batch=8)
+
+    def add_column(name):
+        def op():
+            db.session.add(Column(name=name, position=99))
+            return name
+
+        return op
+
+    def broken():
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        ok_a = pool.submit(writer.submit, add_column("A"))
+        failed = pool.submit(writer.submit, broken)
+        ok_b = pool.submit(writer.submit, add_column("B"))
+        assert ok_a.result() == "A"
+        assert ok_b.result() == "B"
+        with pytest.raises(RuntimeError):
+            failed.result()
+
+    names = [col["name"] for col in group_app.test_client().get("/api/state").get_json()["columns"]]
+    assert {"A", "B"} <= set(names)
+
+
+def test_writer_is_disabled_by_default(app):
+    assert get_writer(app) is None
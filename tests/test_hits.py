@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from app.extensions import db
+from app.hits import ERA_HALF_LIVES, HitCounter, get_hit_counter
+
+
+@pytest.fixture()
+def counter(app):
+    app.config["HITS_FLUSH_INTERVAL"] = 0
+    return get_hit_counter(app)
+
+
+@pytest.fixture()
+def cards(client):
+    column_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    return [
+        client.post("/api/card", json={"title": f"Card {i}", "column_id": column_id}).get_json()
+        for i in range(3)
+    ]
+
+
+def test_hits_are_buffered_then_flushed_in_one_batch(app, client, counter, cards):
+    revision = client.get("/api/state").headers["ETag"]
+    for card, clicks in zip(cards, (3, 5, 0), strict=True):
+        for _ in range(clicks):
+            assert client.post(f"/api/card/{card['id']}/hit").status_code == 204
+    client.post("/api/card/9999/hit")
+    assert client.get("/api/cards/frequent").get_json() == {"cards": []}
+
+    assert counter.flush() == 9
+    frequent = client.get("/api/cards/frequent").get_json()["cards"]
+    assert [(card["title"], card["hits"]) for card in frequent] == [("Card 1", 5), ("Card 0", 3)]
+    assert frequent[0]["frecency"] == pytest.approx(5, rel=1e-3)
+    # Clicks do not touch the board revision, so cached payloads stay valid.
+    assert client.get("/api/state").headers["ETag"] == revision
+
+    client.delete(f"/api/card/{cards[1]['id']}")
+    frequent = client.get("/api/cards/frequent").get_json()["cards"]
+    assert [card["title"] for card in frequent] == ["Card 0"]
+
+
+def test_counters_from_several_workers_add_up(app, counter, cards):
+    workers = [
+        HitCounter(app, interval=0, half_life=counter.half_life, max_pending=10_000)
+        for _ in range(3)
+    ]
+
+    def click(worker):
+        for _ in range(1000):
+            worker.hit(cards[0]["id"])
+
+    threads = [threading.Thread(target=click, args=(worker,)) for worker in workers * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(worker.flush() for worker in workers) == 6000
+    with app.app_context():
+        assert db.session.scalar(text("SELECT hits FROM card_hits")) == 6000
+
+
+def test_hit_beacons_are_limited_and_buffered_up_to_a_cap(app, cards):
+    config = {**app.config, "RATELIMIT_ENABLED": True, "RATE_LIMIT_HITS": "3/minute"}
+    limits = {"HITS_FLUSH_INTERVAL": 0, "HITS_MAX_PENDING": 2}
+    limited = create_app("testing", test_config={**config, **limits})
+    client = limited.test_client()
+    url = f"/api/card/{cards[0]['id']}/hit"
+
+    assert [client.post(url).status_code for _ in range(4)] == [204, 204, 204, 429]
+    assert get_hit_counter(limited).flush() == 2
+
+
+def test_frecency_decays_and_orders_across_eras(counter):
+    day = 86400.0
+    now = 1_800_000_000.0
+    era, weight = counter.era_and_weight(now)
+    assert counter.decayed(weight, era, now + 14 * day) == pytest.approx(0.5)
+
+    later = now + ERA_HALF_LIVES * counter.half_life
+    next_era, next_weight = counter.era_and_weight(later)
+    assert next_era == era + 1
+    rescaled = weight * 2.0**-ERA_HALF_LIVES
+    assert counter.decayed(rescaled, next_era, later) == pytest.approx(2.0**-ERA_HALF_LIVES)
+    assert counter.decayed(next_weight, next_era, later) == pytest.approx(1)
+
+
+def test_frequent_cards_walk_the_score_index(app):
+    with app.app_context():
+        rows = db.session.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT card_id FROM card_hits "
+                "ORDER BY era DESC, score DESC LIMIT 20"
+            )
+        )
+        plan = " ".join(row[-1] for row in rows)
+    assert "ix_card_hits_era_score" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,174 @@
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.jobs import CLAIM, JobError, JobQueue, get_jobs, handler
+from app.repositories import SettingsRepository
+
+CALLS: list[tuple[str, dict]] = []
+
+
+@handler("test_record")
+def record(payload):
+    CALLS.append(("record", payload))
+    return {"seen": payload["n"]}
+
+
+@handler("test_flaky", max_attempts=3)
+def flaky(payload):
+    CALLS.append(("flaky", payload))
+    if sum(1 for name, _ in CALLS if name == "flaky") < payload["succeed_on"]:
+        raise OSError("disk busy")
+    return "ok"
+
+
+@handler("test_broken")
+def broken(payload):
+    raise JobError("cannot be done")
+
+
+def set_background(app, url):
+    with app.app_context():
+        SettingsRepository().set_background(url)
+
+
+def png_bytes() -> bytes:
+    stream = BytesIO()
+    Image.new("RGB", (32, 32), color=(10, 200, 30)).save(stream, format="PNG")
+    return stream.getvalue()
+
+
+@pytest.fixture()
+def jobs(app):
+    CALLS.clear()
+    queue = get_jobs(app)
+    queue.backoff_base = 0.0
+    return queue
+
+
+def test_jobs_run_by_priority_then_age(jobs):
+    low = jobs.enqueue("test_record", {"n": 1}, priority=-10)
+    first = jobs.enqueue("test_record", {"n": 2})
+    second = jobs.enqueue("test_record", {"n": 3})
+    urgent = jobs.enqueue("test_record", {"n": 4}, priority=10)
+    later = jobs.enqueue("test_record", {"n": 5}, priority=10, delay=60)
+    assert jobs.run_pending() == 4
+    assert [payload["n"] for _, payload in CALLS] == [4, 2, 3, 1]
+    assert jobs.get(urgent["id"])["status"] == "done"
+    assert jobs.get(low["id"])["result"] == {"seen": 1}
+    assert (jobs.get(first["id"])["attempts"], jobs.get(second["id"])["attempts"]) == (1, 1)
+    assert jobs.get(later["id"])["status"] == "queued"
+
+
+def test_idempotency_key_returns_the_first_job(jobs):
+    job = jobs.enqueue("test_record", {"n": 1}, key="import:42")
+    again = jobs.enqueue("test_record", {"n": 2}, key="import:42")
+    assert again["id"] == job["id"]
+    jobs.run_pending()
+    assert jobs.enqueue("test_record", {"n": 3}, key="import:42")["status"] == "done"
+    assert CALLS == [("record", {"n": 1})]
+
+
+def test_failures_retry_with_backoff_until_attempts_run_out(jobs):
+    job = jobs.enqueue("test_flaky", {"succeed_on": 3})
+    jobs.run_pending()
+    assert jobs.get(job["id"])["status"] == "done"
+    assert jobs.get(job["id"])["attempts"] == 3
+
+    CALLS.clear()
+    job = jobs.enqueue("test_flaky", {"succeed_on": 10})
+    jobs.run_pending()
+    failed = jobs.get(job["id"])
+    assert (failed["status"], failed["attempts"]) == ("failed", 3)
+    assert failed["error"] == "OSError: disk busy"
+
+    jobs.backoff_base = 60.0
+    job = jobs.enqueue("test_flaky", {"succeed_on": 10})
+    assert jobs.run_pending() == 1
+    assert jobs.get(job["id"])["run_at"] > time.time() + 25
+
+    job = jobs.enqueue("test_broken")
+    jobs.run_pending()
+    assert jobs.get(job["id"])["error"] == "cannot be done"
+    assert jobs.get(job["id"])["attempts"] == 1
+
+
+def test_expired_lease_goes_back_to_the_queue(app, jobs):
+    job = jobs.enqueue("test_record", {"n": 1})
+    # Another process claims the job, then dies before its lease runs out.
+    crashed = JobQueue(app, jobs.path, 0, 1.0, lease=0.05, backoff_base=0.0, backoff_max=0.0)
+    jobs._maintained = time.time()
+    crashed._conn().execute(CLAIM, {"worker": "dead", "now": time.time(), "lease": 0.05})
+    assert jobs.run_pending() == 0
+    time.sleep(0.1)
+    jobs.maintain()
+    assert jobs.run_pending() == 1
+    assert jobs.get(job["id"])["attempts"] == 2
+    assert jobs.get(job["id"])["status"] == "done"
+
+
+def test_job_that_keeps_killing_its_worker_fails(app, jobs):
+    job = jobs.enqueue("test_record", {"n": 1}, max_attempts=2)
+    crashed = JobQueue(app, jobs.path, 0, 1.0, lease=0.01, backoff_base=0.0, backoff_max=0.0)
+    jobs._maintained = time.time()
+    for _ in range(2):
+        crashed._conn().execute(CLAIM, {"worker": "dead", "now": time.time(), "lease": 0.01})
+        time.sleep(0.05)
+        jobs.maintain()
+    failed = jobs.get(job["id"])
+    assert (failed["status"], failed["attempts"]) == ("failed", 2)
+    assert failed["error"] == "worker died (lease expired)"
+    assert jobs.run_pending() == 0
+
+
+def test_worker_threads_share_the_queue(app, jobs):
+    for n in range(40):
+        jobs.enqueue("test_record", {"n": n})
+    stop = threading.Event()
+    workers = [threading.Thread(target=jobs.work, args=(stop,)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    deadline = time.time() + 5
+    while jobs.counts()["done"] < 40 and time.time() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    jobs._wake.set()
+    for worker in workers:
+        worker.join()
+    assert sorted(payload["n"] for _, payload in CALLS) == list(range(40))
+
+
+def test_finalize_in_the_background_and_remove_the_old_file(app, client, jobs):
+    uploads = app.config["UPLOAD_DIR"]
+    (uploads / "old.png").write_bytes(b"old")
+    set_background(app, "/static/uploads/old.png")
+
+    data = png_bytes()
+    meta = {"filename": "bg.png", "size": len(data), "mimetype": "image/png"}
+    upload_id = client.post("/api/uploads", json=meta).get_json()["id"]
+    client.patch(f"/api/uploads/{upload_id}", data=data, headers={"Upload-Offset": "0"})
+    res = client.post(f"/api/uploads/{upload_id}/finalize", headers={"Prefer": "respond-async"})
+    assert res.status_code == 202
+    assert res.headers["Location"] == f"/api/jobs/{res.get_json()['id']}"
+    again = client.post(f"/api/uploads/{upload_id}/finalize", headers={"Prefer": "respond-async"})
+    assert again.get_json()["id"] == res.get_json()["id"]
+    assert client.get(res.headers["Location"]).get_json()["status"] == "queued"
+
+    assert jobs.run_pending() == 2  # finalize, then the removal it scheduled
+    job = client.get(res.headers["Location"]).get_json()
+    assert job["status"] == "done"
+    assert client.get("/api/settings").get_json()["dashboard_bg_image"] == job["result"]["url"]
+    assert not (uploads / "old.png").exists()
+    assert client.get("/api/jobs/9999").status_code == 404
+
+
+def test_removal_keeps_a_file_that_is_the_background_again(app, client, jobs):
+    (app.config["UPLOAD_DIR"] / "a.png").write_bytes(b"a")
+    set_background(app, "/static/uploads/a.png")
+    client.delete("/api/settings/bg")
+    set_background(app, "/static/uploads/a.png")
+    jobs.run_pending()
+    assert (app.config["UPLOAD_DIR"] / "a.png").exists()
@@ -0,0 +1,124 @@
+import shutil
+import sqlite3
+
+from app import create_app
+from app.jobs import get_jobs
+from app.maintenance import maintain, report
+
+ADMIN_TOKEN = "admin-test-token"
+OPTIONS = {"analysis_limit": 1000, "vacuum_pages": 2, "step_sleep": 0.0}
+
+
+def pragma(path, name):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_maintenance_analyzes_and_returns_free_pages(app, client):
+    path = app.config["DB_PATH"]
+    column_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    cards = [
+        client.post("/api/card", json={"title": "x" * 200, "column_id": column_id}).get_json()
+        for _ in range(100)
+    ]
+    for card in cards:
+        client.delete(f"/api/card/{card['id']}")
+    assert pragma(path, "auto_vacuum") == 2  # set by the first migration of a new file
+    free = pragma(path, "freelist_count")
+    assert free > OPTIONS["vacuum_pages"]
+
+    result = maintain(path, **OPTIONS)
+    assert result["analyzed"] and result["plans_ok"]
+    assert 0 < result["vacuumed_pages"] <= free
+    assert pragma(path, "freelist_count") == 0
+
+    again = maintain(path, **OPTIONS)
+    assert (again["analyzed"], again["vacuumed_pages"]) == (False, 0)
+
+
+def test_older_files_are_converted_only_on_request(app, tmp_path):
+    path = tmp_path / "old.db"
+    shutil.copyfile(app.config["DB_PATH"], path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA auto_vacuum = NONE")
+    conn.execute("VACUUM")
+    conn.close()
+
+    assert maintain(path, **OPTIONS)["converted"] is False
+    assert pragma(path, "auto_vacuum") == 0
+    assert maintain(path, **OPTIONS, convert=True)["converted"] is True
+    assert pragma(path, "auto_vacuum") == 2
+
+
+def test_report_sizes_and_plan_regressions(app):
+    path = app.config["DB_PATH"]
+    info = report(path)
+    assert {"cards", "columns", "card_hits"} <= set(info["tables"])
+    assert {"idx_cards_column_position", "ix_cards_canonical_link"} <= set(info["indexes"])
+    assert info["auto_vacuum"] == "incremental"
+    assert all(check["ok"] for check in info["plans"]), info["plans"]
+
+    conn = sqlite3.connect(path)
+    conn.execute("DROP INDEX ix_card_hits_era_score")
+    conn.close()
+    failing = [check["name"] for check in report(path)["plans"] if not check["ok"]]
+    assert failing == ["frequent cards"]
+    assert maintain(path, **OPTIONS)["slow_plans"] == ["frequent cards"]
+
+
+def test_cli_and_admin_report(app, client):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["maintenance", "run"])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("default: 0 page(s) vacuumed, analyzed")
+
+    result = runner.invoke(args=["maintenance", "report"])
+    assert "plan\tfrequent cards\tok" in result.output
+    assert "analyzed" in result.output.splitlines()[0]
+
+    app.config["ADMIN_TOKEN"] = ADMIN_TOKEN
+    res = client.get("/admin/db", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"})
+    assert res.get_json()["databases"]["default"]["analyzed"] is True
+
+
+def test_admin_report_shows_a_broken_board_next_to_the_others(app, tmp_path):
+    boards_app = create_app(
+        "testing",
+        test_config={
+            key: app.config[key]
+            for key in ("DB_PATH", "SQLALCHEMY_DATABASE_URI", "PAYLOAD_CACHE_DIR", "JOBS_DB_PATH")
+        }
+        | {"JOBS_WORKERS": 0, "BOARDS_ENABLED": True, "BOARDS_DIR": tmp_path / "boards"},
+    )
+    (tmp_path / "boards").mkdir()
+    (tmp_path / "boards" / "broken.db").write_bytes(b"not a database" * 100)
+    boards_app.config["ADMIN_TOKEN"] = ADMIN_TOKEN
+    res = boards_app.test_client().get(
+        "/admin/db", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"}
+    )
+    assert res.status_code == 200
+    reports = res.get_json()["databases"]
+    assert reports["default"]["auto_vacuum"] == "incremental"
+    assert "not a database" in reports["boards/broken"]["error"]
+
+
+def test_scheduled_runs_are_one_job_per_interval(app):
+    scheduled = create_app(
+        "testing",
+        test_config={
+            key: app.config[key]
+            for key in ("DB_PATH", "SQLALCHEMY_DATABASE_URI", "PAYLOAD_CACHE_DIR", "JOBS_DB_PATH")
+        }
+        | {"JOBS_WORKERS": 0, "MAINTENANCE_INTERVAL": 3600},
+    )
+    other_worker = create_app("testing", test_config=scheduled.config)
+    for worker in (scheduled, other_worker, scheduled):
+        worker.test_client().get("/api/state")
+
+    jobs = get_jobs(scheduled)
+    assert jobs.counts()["queued"] == 1
+    assert jobs.run_pending() == 1
+    assert jobs.counts()["done"] == 1
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+
+import pytest
+
+from app.metrics import registry
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def test_server_timing_header_reports_db_breakdown(client):
+    res = client.get("/api/state")
+    assert res.status_code == 200
+    header = res.headers["Server-Timing"]
+    assert header.startswith("app;dur=")
+    assert "db;dur=" in header
+    assert "queries" in header
+
+
+def test_metrics_endpoint_exposes_latency_and_sql_histograms(client):
+    client.get("/api/state")
+    col_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    client.post("/api/card", json={"title": "Docs", "column_id": col_id})
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.mimetype == "text/plain"
+    body = res.get_data(as_text=True)
+    assert "# TYPE dashboard_http_request_duration_seconds histogram" in body
+    assert (
+        'dashboard_http_requests_total{endpoint="api.api_state",method="GET",status="200"} 2'
+        in body
+    )
+    assert 'dashboard_sql_queries_per_request_count{endpoint="api.api_add_card"} 1' in body
+    assert "dashboard_db_commit_duration_seconds_count 1" in body
+
+
+def test_metrics_are_aggregated_across_worker_snapshots(app, client, tmp_path):
+    metrics_dir = tmp_path / "metrics"
+    metrics_dir.mkdir()
+    app.config["METRICS_DIR"] = str(metrics_dir)
+    other_worker = {
+        "counters": [
+            {
+                "name": "dashboard_http_requests_total",
+                "labels": {"endpoint": "api.api_state", "method": "GET", "status": "200"},
+                "value": 5,
+            }
+        ],
+        "histograms": [],
+    }
+    (metrics_dir / "worker_999999.json").write_text(json.dumps(other_worker))
+
+    client.get("/api/state")
+    body = client.get("/metrics").get_data(as_text=True)
+    assert (
+        'dashboard_http_requests_total{endpoint="api.api_state",method="GET",status="200"} 6'
+        in body
+    )
+
+
+def test_concurrent_flushes_do_not_collide(tmp_path):
+    errors = []
+
+    def flush():
+        try:
+            for _ in range(50):
+                registry.inc("dashboard_test_total")
+                registry.flush(tmp_path)
+        except OSError as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=flush) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [path.name for path in tmp_path.iterdir()] == [f"worker_{os.getpid()}.json"]
@@ -0,0 +1,68 @@
+import pytest
+
+from app import create_app
+
+ADMIN_TOKEN = "admin-test-token"
+
+
+@pytest.fixture()
+def profiled_app(app, tmp_path):
+    return create_app(
+        "testing",
+        test_config={
+            **{key: app.config[key] for key in ("DB_PATH", "SQLALCHEMY_DATABASE_URI")},
+            "UPLOAD_DIR": tmp_path / "uploads",
+            "ADMIN_TOKEN": ADMIN_TOKEN,
+            "PROFILING_DIR": tmp_path / "profiles",
+            "PROFILING_THRESHOLD_MS": 60_000,
+            "PROFILING_MAX_FILES": 2,
+            "PAYLOAD_CACHE_ENABLED": False,
+        },
+    )
+
+
+def admin_headers():
+    return {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+
+def test_admin_endpoints_hidden_without_token(client):
+    res = client.get("/admin/profiles")
+    assert res.status_code == 404
+
+
+def test_admin_endpoints_reject_wrong_token(profiled_app):
+    res = profiled_app.test_client().get(
+        "/admin/profiles", headers={"Authorization": "Bearer wrong"}
+    )
+    assert res.status_code == 401
+
+
+def test_profile_header_captures_request_and_sql(profiled_app):
+    client = profiled_app.test_client()
+    fast = client.get("/api/state")
+    assert "X-Profile-Id" not in fast.headers
+
+    res = client.get("/api/state", headers={"X-Profile-Request": ADMIN_TOKEN})
+    assert res.status_code == 200
+    name = res.headers["X-Profile-Id"]
+
+    listing = client.get("/admin/profiles", headers=admin_headers()).get_json()
+    assert [item["name"] for item in listing["profiles"]] == [name]
+    assert listing["profiles"][0]["endpoint"] == "api.api_state"
+
+    summary = client.get(f"/admin/profiles/{name}/summary", headers=admin_headers()).get_json()
+    assert any("FROM columns" in statement for statement in summary["sql"])
+
+    download = client.get(f"/admin/profiles/{name}", headers=admin_headers())
+    assert download.status_code == 200
+    assert len(download.data) > 0
+
+
+def test_profiles_are_kept_in_bounded_ring_buffer(profiled_app):
+    client = profiled_app.test_client()
+    names = [
+        client.get("/api/state", headers={"X-Profile-Request": ADMIN_TOKEN}).headers["X-Profile-Id"]
+        for _ in range(3)
+    ]
+    listing = client.get("/admin/profiles", headers=admin_headers()).get_json()
+    assert [item["name"] for item in listing["profiles"]] == names[:0:-1]
@@ -0,0 +1,162 @@
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.hits import get_hit_counter
+from app.replication import get_replication, read_heartbeat
+
+
+def make_app(app, tmp_path, role, db_path, **overrides):
+    return create_app(
+        "testing",
+        test_config={
+            "DB_PATH": db_path,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "UPLOAD_DIR": app.config["UPLOAD_DIR"],
+            "PAYLOAD_CACHE_DIR": tmp_path / f"cache-{role}",
+            "REPLICATION_ROLE": role,
+            "REPLICATION_DIR": tmp_path / "replication",
+            "REPLICATION_INTERVAL": 0,
+            **overrides,
+        },
+    )
+
+
+@pytest.fixture()
+def primary(app, tmp_path):
+    return make_app(app, tmp_path, "primary", app.config["DB_PATH"])
+
+
+@pytest.fixture()
+def follower(app, tmp_path):
+    return make_app(app, tmp_path, "follower", tmp_path / "follower.db")
+
+
+def column_names(client) -> list[str]:
+    return [col["name"] for col in client.get("/api/state").get_json()["columns"]]
+
+
+def test_follower_serves_published_snapshot(primary, follower):
+    primary.test_client().post("/api/column", json={"name": "Shipped"})
+    follower_client = follower.test_client()
+
+    assert follower_client.get("/api/state").status_code == 503
+    get_replication(primary).step()
+    get_replication(follower).step()
+
+    res = follower_client.get("/api/state")
+    assert res.status_code == 200
+    assert "Shipped" in column_names(follower_client)
+    assert float(res.headers["X-Replica-Lag"]) < follower.config["REPLICATION_MAX_LAG"]
+    # The revision travels with the data, so ETags match the primary's.
+    assert res.headers["ETag"] == primary.test_client().get("/api/state").headers["ETag"]
+
+
+def test_hit_flushes_are_shipped(primary, follower):
+    client = primary.test_client()
+    column_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    card = client.post("/api/card", json={"title": "Docs", "column_id": column_id}).get_json()
+    card_id = card["id"]
+    etag = client.get("/api/state").headers["ETag"]
+    get_replication(primary).step()
+    get_replication(follower).step()
+    assert follower.test_client().get("/api/cards/frequent").get_json() == {"cards": []}
+
+    client.post(f"/api/card/{card_id}/hit")
+    get_hit_counter(primary).flush()
+    get_replication(primary).step()
+    get_replication(follower).step()
+
+    frequent = follower.test_client().get("/api/cards/frequent").get_json()["cards"]
+    assert [card["id"] for card in frequent] == [card_id]
+    # Hits do not touch the board revision, so cached payloads stay valid.
+    assert client.get("/api/state").headers["ETag"] == etag
+
+
+def test_unchanged_primary_only_refreshes_heartbeat(primary, tmp_path):
+    publisher = get_replication(primary)
+    first = publisher.step()
+    second = publisher.step()
+
+    assert second["generation"] == first["generation"]
+    assert second["checked"] >= first["checked"]
+    primary.test_client().post("/api/column", json={"name": "Changed"})
+    assert publisher.step()["generation"] == first["generation"] + 1
+    assert read_heartbeat(tmp_path / "replication")["generation"] == first["generation"] + 1
+
+
+def test_stale_follower_refuses_reads(primary, follower):
+    get_replication(primary).step()
+    get_replication(follower).step()
+    follower.config["REPLICATION_MAX_LAG"] = 0
+
+    res = follower.test_client().get("/api/state")
+
+    assert res.status_code == 503
+    assert "Retry-After" in res.headers
+
+
+def test_follower_rejects_mutations_without_primary(primary, follower):
+    get_replication(primary).step()
+    get_replication(follower).step()
+
+    res = follower.test_client().post("/api/column", json={"name": "Nope"})
+
+    assert res.status_code == 503
+    assert "read-only" in res.get_json()["error"]["message"]
+
+
+def test_follower_forwards_mutations_to_primary(primary, follower):
+    server = make_server("127.0.0.1", 0, primary, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    follower.config["REPLICATION_PRIMARY_URL"] = f"http://127.0.0.1:{server.server_port}"
+    try:
+        res = follower.test_client().post("/api/column", json={"name": "Forwarded"})
+    finally:
+        server.shutdown()
+
+    assert res.status_code == 201
+    assert res.get_json()["name"] == "Forwarded"
+    assert "Forwarded" in column_names(primary.test_client())
+    get_replication(primary).step()
+    get_replication(follower).step()
+    assert "Forwarded" in column_names(follower.test_client())
+
+
+def test_forwarded_mutations_are_limited_per_client(app, tmp_path):
+    limits = {"RATELIMIT_ENABLED": True, "RATE_LIMIT_MUTATIONS": "1 per minute"}
+    token = {"REPLICATION_FORWARD_TOKEN": "s3cret"}
+    primary = make_app(app, tmp_path, "primary", app.config["DB_PATH"], **limits, **token)
+    follower = make_app(app, tmp_path, "follower", tmp_path / "follower.db", **token)
+    server = make_server("127.0.0.1", 0, primary, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    follower.config["REPLICATION_PRIMARY_URL"] = f"http://127.0.0.1:{server.server_port}"
+    client = follower.test_client()
+
+    def add(name, address):
+        environ = {"REMOTE_ADDR": address}
+        return client.post("/api/column", json={"name": name}, environ_base=environ)
+
+    try:
+        assert add("One", "203.0.113.1").status_code == 201
+        assert add("Two", "203.0.113.2").status_code == 201
+        assert add("Three", "203.0.113.1").status_code == 429
+        # Without the token the header is the client's word, not the follower's.
+        spoofed = primary.test_client().post(
+            "/api/column",
+            json={"name": "Four"},
+            headers={"X-Forwarded-For": "203.0.113.3", "X-Replication-Token": "guess"},
+            environ_base={"REMOTE_ADDR": "203.0.113.2"},
+        )
+        assert spoofed.status_code == 429
+    finally:
+        server.shutdown()
+
+
+def test_unknown_role_is_rejected(app, tmp_path):
+    with pytest.raises(ValueError):
+        make_app(app, tmp_path, "leader", app.config["DB_PATH"])
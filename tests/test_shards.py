@@ -0,0 +1,192 @@
+import asyncio
+import json
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from alembic import command
+from app import create_app
+from app.asgi import create_asgi_app
+from app.extensions import db
+from app.jobs import get_jobs
+from app.models import Revision
+from app.shards import _alembic_config, get_shards, use_board
+
+ADMIN_TOKEN = "admin-secret"
+
+
+def admin_headers() -> dict:
+    return {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+
+def make_boards_app(app, tmp_path, **overrides):
+    return create_app(
+        "testing",
+        test_config={
+            **{
+                key: app.config[key]
+                for key in ("DB_PATH", "SQLALCHEMY_DATABASE_URI", "JOBS_DB_PATH", "JOBS_WORKERS")
+            },
+            "UPLOAD_DIR": tmp_path / "uploads",
+            "PAYLOAD_CACHE_DIR": tmp_path / "cache",
+            "ADMIN_TOKEN": ADMIN_TOKEN,
+            "BOARDS_ENABLED": True,
+            "BOARDS_DIR": tmp_path / "boards",
+            **overrides,
+        },
+    )
+
+
+@pytest.fixture()
+def boards_app(app, tmp_path):
+    boards_app = make_boards_app(app, tmp_path)
+    client = boards_app.test_client()
+    for slug in ("team-a", "team-b"):
+        assert (
+            client.post("/admin/boards", json={"slug": slug}, headers=admin_headers()).status_code
+            == 201
+        )
+    return boards_app
+
+
+def column_names(client, prefix: str) -> list[str]:
+    return [column["name"] for column in client.get(f"{prefix}/state").get_json()["columns"]]
+
+
+def test_admin_creates_and_lists_boards(boards_app):
+    client = boards_app.test_client()
+    duplicate = client.post("/admin/boards", json={"slug": "team-a"}, headers=admin_headers())
+    assert duplicate.status_code == 409
+    invalid = client.post("/admin/boards", json={"slug": "../etc"}, headers=admin_headers())
+    assert invalid.status_code == 400
+    assert client.get("/admin/boards", headers=admin_headers()).get_json() == {
+        "boards": ["team-a", "team-b"]
+    }
+
+
+def test_boards_are_isolated_from_each_other_and_the_default_board(boards_app):
+    client = boards_app.test_client()
+    res = client.post("/b/team-a/api/column", json={"name": "Team A only"})
+    assert res.status_code == 201
+    client.post("/b/team-a/api/card", json={"title": "Doc", "column_id": res.get_json()["id"]})
+
+    assert "Team A only" in column_names(client, "/b/team-a/api")
+    assert "Team A only" not in column_names(client, "/b/team-b/api")
+    assert "Team A only" not in column_names(client, "/api")
+
+    client.put("/b/team-b/api/settings", json={"dashboard_title": "Team B"})
+    assert client.get("/b/team-b/api/settings").get_json()["dashboard_title"] == "Team B"
+    assert client.get("/api/settings").get_json()["dashboard_title"] != "Team B"
+
+
+def test_unknown_board_is_404(boards_app):
+    client = boards_app.test_client()
+    assert client.get("/b/nope/api/state").status_code == 404
+    assert client.get("/b/nope/").status_code == 404
+    page = client.get("/b/team-a/")
+    assert page.status_code == 200
+    assert b'data-api-base="/b/team-a/api"' in page.data
+
+
+def test_board_routes_are_off_by_default(client):
+    assert client.get("/b/team-a/api/state").status_code == 404
+
+
+def test_outdated_board_is_migrated_on_first_open(boards_app):
+    shards = get_shards(boards_app)
+    shards.directory.mkdir(parents=True, exist_ok=True)
+    cfg = _alembic_config()
+    cfg.attributes["sqlalchemy.url"] = f"sqlite:///{shards.path('legacy')}"
+    command.upgrade(cfg, "20260213_0002")
+
+    client = boards_app.test_client()
+    assert client.get("/b/legacy/api/state").status_code == 200
+    with boards_app.test_request_context():
+        use_board("legacy")
+        assert db.session.get(Revision, "board") is not None
+
+
+def test_engine_cache_is_bounded(app, tmp_path):
+    boards_app = make_boards_app(app, tmp_path, BOARDS_MAX_OPEN=1)
+    shards = get_shards(boards_app)
+    for slug in ("one", "two"):
+        shards.create(slug)
+    client = boards_app.test_client()
+    client.get("/b/one/api/state")
+    client.get("/b/two/api/state")
+    assert list(shards._engines) == ["two"]
+    assert client.get("/b/one/api/state").status_code == 200
+    assert list(shards._engines) == ["one"]
+
+
+def test_rate_limits_are_per_board(app, tmp_path):
+    limited_app = make_boards_app(
+        app, tmp_path, RATELIMIT_ENABLED=True, RATE_LIMIT_MUTATIONS="1 per minute"
+    )
+    shards = get_shards(limited_app)
+    shards.create("limit-a")
+    shards.create("limit-b")
+    client = limited_app.test_client()
+    assert client.post("/b/limit-a/api/column", json={"name": "One"}).status_code == 201
+    assert client.post("/b/limit-a/api/column", json={"name": "Two"}).status_code == 429
+    assert client.post("/b/limit-b/api/column", json={"name": "One"}).status_code == 201
+
+
+def test_group_commit_writes_to_the_right_board(app, tmp_path):
+    grouped_app = make_boards_app(app, tmp_path, GROUP_COMMIT_ENABLED=True)
+    get_shards(grouped_app).create("grouped")
+    client = grouped_app.test_client()
+    assert client.post("/b/grouped/api/column", json={"name": "Batched"}).status_code == 201
+    assert "Batched" in column_names(client, "/b/grouped/api")
+    assert "Batched" not in column_names(client, "/api")
+
+
+def test_same_background_on_two_boards_is_removed_per_board(boards_app):
+    client = boards_app.test_client()
+    stream = BytesIO()
+    Image.new("RGB", (32, 32), color=(10, 200, 30)).save(stream, format="PNG")
+    data = stream.getvalue()
+    meta = {"filename": "bg.png", "size": len(data), "mimetype": "image/png"}
+    urls = {}
+    for slug in ("team-a", "team-b"):
+        upload_id = client.post(f"/b/{slug}/api/uploads", json=meta).get_json()["id"]
+        client.patch(
+            f"/b/{slug}/api/uploads/{upload_id}", data=data, headers={"Upload-Offset": "0"}
+        )
+        urls[slug] = client.post(f"/b/{slug}/api/uploads/{upload_id}/finalize").get_json()["url"]
+    assert urls["team-a"] != urls["team-b"]
+
+    assert client.delete("/b/team-a/api/settings/bg").status_code == 204
+    assert get_jobs(boards_app).run_pending() == 1
+    uploads = boards_app.config["UPLOAD_DIR"]
+    assert not (uploads / urls["team-a"].rsplit("/", 1)[1]).exists()
+    assert (uploads / urls["team-b"].rsplit("/", 1)[1]).exists()
+    assert client.get("/b/team-b/api/settings").get_json()["dashboard_bg_image"] == urls["team-b"]
+
+
+def test_asgi_events_follow_the_board_revision(boards_app):
+    client = boards_app.test_client()
+    for name in ("One", "Two", "Three"):
+        client.post("/b/team-a/api/column", json={"name": name})
+    with boards_app.test_request_context():
+        use_board("team-a")
+        expected = str(db.session.get(Revision, "board").value)
+
+    asgi_app = create_asgi_app(boards_app)
+    sent = []
+    disconnect = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message.get("body"):
+            disconnect.set()
+
+    scope = {"type": "http", "method": "GET", "path": "/b/team-a/api/events", "headers": []}
+    asyncio.run(asyncio.wait_for(asgi_app(scope, receive, send), timeout=5))
+    payload = sent[1]["body"].decode().split("data: ", 1)[1]
+    assert json.loads(payload) == {"revision": expected}
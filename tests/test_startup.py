@@ -1,3 +1,61 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from app import create_app
+from app.extensions import ProcessThreads
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
 def test_app_starts_with_migrated_database(client):
     response = client.get("/api/state")
     assert response.status_code == 200
+
+
+def test_create_app_does_not_import_pillow():
+    code = (
+        "import sys; from app import create_app; create_app('testing'); "
+        "print('PIL' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_rate_limits_apply_when_enabled(app, client, tmp_path):
+    limited_app = create_app(
+        "testing",
+        test_config={
+            "SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"],
+            "UPLOAD_DIR": tmp_path / "uploads",
+            "RATELIMIT_ENABLED": True,
+            "RATE_LIMIT_MUTATIONS": "1 per minute",
+        },
+    )
+    limited = limited_app.test_client()
+    assert limited.post("/api/column", json={"name": "One"}).status_code == 201
+    assert limited.post("/api/column", json={"name": "Two"}).status_code == 429
+
+    # Apps with rate limiting disabled bypass the limiter enabled above.
+    for name in ("Three", "Four"):
+        assert client.post("/api/column", json={"name": name}).status_code == 201
+
+
+def test_background_threads_start_once_per_process():
+    started = []
+    release = threading.Event()
+    threads = ProcessThreads(release.wait, "test", count=2, on_start=lambda: started.append(1))
+
+    threads.start()
+    threads.start()
+    assert len(started) == 1
+    assert [thread.name for thread in threads._threads] == ["test-0", "test-1"]
+
+    # A forked child inherits the object but none of the threads.
+    threads._pid = -1
+    threads.start()
+    assert len(started) == 2
+    release.set()
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import select, text
+
+from app import create_app
+from app.extensions import db
+from app.models import CardTag
+
+
+@pytest.fixture()
+def cards(client):
+    columns = [column["id"] for column in client.get("/api/state").get_json()["columns"]]
+    return [
+        client.post(
+            "/api/card", json={"title": f"Card {i}", "column_id": columns[i % 2]}
+        ).get_json()
+        for i in range(4)
+    ]
+
+
+def tag(client, card, *names):
+    return client.put(f"/api/card/{card['id']}/tags", json={"tags": list(names)})
+
+
+def counts(client):
+    return {item["name"]: item["count"] for item in client.get("/api/tags").get_json()["tags"]}
+
+
+def test_set_card_tags_normalizes_and_counts(client, cards):
+    res = tag(client, cards[0], "Work", " news ", "work")
+    assert res.get_json() == {"card_id": cards[0]["id"], "tags": ["news", "work"]}
+    tag(client, cards[1], "work")
+    assert counts(client) == {"news": 1, "work": 2}
+
+    tag(client, cards[0], "news", "later")
+    assert client.get(f"/api/card/{cards[0]['id']}/tags").get_json()["tags"] == ["later", "news"]
+    assert counts(client) == {"later": 1, "news": 1, "work": 1}
+
+    assert tag(client, {"id": 9999}, "x").status_code == 404
+    assert tag(client, cards[0], "").status_code == 400
+
+
+def test_reading_card_tags_is_not_rate_limited(app, cards):
+    limited = create_app(
+        "testing",
+        test_config={**app.config, "RATELIMIT_ENABLED": True, "RATE_LIMIT_MUTATIONS": "1/minute"},
+    ).test_client()
+    url = f"/api/card/{cards[0]['id']}/tags"
+    for _ in range(3):
+        assert limited.get(url).status_code == 200
+    assert limited.put(url, json={"tags": ["a"]}).status_code == 200
+    assert limited.put(url, json={"tags": ["b"]}).status_code == 429
+
+
+def test_filter_cards_by_tags_with_and_or(client, cards):
+    tag(client, cards[0], "a", "b")
+    tag(client, cards[1], "a")
+    tag(client, cards[2], "b")
+
+    def titles(query):
+        res = client.get(f"/api/cards?{query}")
+        assert res.status_code == 200
+        return sorted(card["title"] for card in res.get_json()["cards"])
+
+    assert titles("tags=a,b") == ["Card 0"]
+    assert titles("tags=a,b&match=any") == ["Card 0", "Card 1", "Card 2"]
+    assert titles("tags=A") == ["Card 0", "Card 1"]
+    assert titles("tags=a,missing") == []
+    assert client.get("/api/cards?tags=a&match=some").status_code == 400
+    assert client.get("/api/cards").status_code == 400
+
+
+def test_counts_follow_card_and_column_deletes(app, client, cards):
+    for card in cards:
+        tag(client, card, "t")
+    client.delete(f"/api/card/{cards[0]['id']}")
+    assert counts(client) == {"t": 3}
+
+    client.delete(f"/api/column/{cards[1]['column_id']}")
+    assert counts(client) == {"t": 1}
+    with app.app_context():
+        assert db.session.scalar(select(db.func.count()).select_from(CardTag)) == 1
+
+
+def test_tag_filter_uses_the_join_index(app):
+    with app.app_context():
+        plan = " ".join(
+            row[-1]
+            for row in db.session.execute(
+                text("EXPLAIN QUERY PLAN SELECT card_id FROM card_tags WHERE tag_id IN (1, 2)")
+            )
+        )
+    assert "COVERING INDEX ix_card_tags_tag_card" in plan
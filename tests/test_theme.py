@@ -0,0 +1,54 @@
+import re
+
+from app.theme import theme_css
+
+
+def theme_url(client, page: str = "/") -> str:
+    match = re.search(
+        rb'id="themeStylesheet" rel="stylesheet" href="([^"]+)"', client.get(page).data
+    )
+    assert match
+    return match.group(1).decode()
+
+
+def test_index_links_the_current_theme_revision(client):
+    url = theme_url(client)
+    res = client.get(url)
+    assert res.status_code == 200
+    assert res.mimetype == "text/css"
+    assert res.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert "--column-width: 320px;" in res.get_data(as_text=True)
+
+    client.put("/api/settings", json={"column_width": 400, "dashboard_title": "Renamed"})
+    new_url = theme_url(client)
+    assert new_url != url
+    assert "--column-width: 400px;" in client.get(new_url).get_data(as_text=True)
+    assert b"<title>Renamed</title>" in client.get("/").data
+
+    # A page cached with the old fingerprint still gets the current theme, but not forever.
+    stale = client.get(url)
+    assert "--column-width: 400px;" in stale.get_data(as_text=True)
+    assert stale.headers["Cache-Control"] == "no-cache"
+    assert client.get(new_url, headers={"If-None-Match": stale.headers["ETag"]}).status_code == 304
+
+
+def test_theme_css_matches_runtime_settings():
+    settings = {
+        "cols_per_row": 4,
+        "column_width": 300,
+        "card_height": 0,
+        "column_bg_color": "#000",
+        "column_bg_opacity": 0.25,
+        "card_bg_color": "#101820",
+        "card_bg_opacity": 1.0,
+        "dashboard_bg_image": '/static/uploads/b"g.png',
+    }
+    css = theme_css(settings)
+    assert "--card-height: auto;" in css
+    assert "--column-bg: rgba(0, 0, 0, 0.25);" in css
+    assert "--card-bg: rgba(16, 24, 32, 1);" in css
+    assert "--card-text-color: #f1f5f9;" in css
+    assert 'url("/static/uploads/b\\"g.png")' in css
+
+    settings["dashboard_bg_image"] = None
+    assert "#bg" not in theme_css(settings)
@@ -0,0 +1,231 @@
+import http.client
+import socket
+import threading
+import time
+
+import pytest
+
+from app import create_app, unfurl
+from app.unfurl import FetchResult, Unfurler, UnfurlError, get_unfurler, urllib_fetcher
+
+PAGE = (
+    b"<html><head><title>Example  Docs</title>"
+    b'<meta property="og:description" content="All the &amp; docs">'
+    b'<link rel="apple-touch-icon" href="/touch.png">'
+    b'<link rel="shortcut icon" href="/static/icon.png">'
+    b"</head><body>"
+)
+
+
+class FakeFetcher:
+    """Serves ``PAGE`` in small blocks and records what was fetched and read."""
+
+    def __init__(self, body: bytes = PAGE, delay: float = 0.0, content_type: str = "text/html"):
+        self.body = body
+        self.delay = delay
+        self.content_type = content_type
+        self.calls: list[str] = []
+        self.blocks_read = 0
+        self.closed = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url, timeout, max_bytes):
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        if "broken" in url:
+            raise OSError("connection refused")
+        if "garbled" in url:
+            raise http.client.BadStatusLine("HTTP/9.9 OK")
+
+        def blocks():
+            tail = b"<p>body</p>" * 10_000
+            data = self.body + tail
+            for start in range(0, len(data), 64):
+                self.blocks_read += 1
+                yield data[start : start + 64]
+
+        return FetchResult(url, self.content_type, "utf-8", blocks(), close=self.close)
+
+    def close(self):
+        self.closed += 1
+
+
+@pytest.fixture()
+def fetcher(app):
+    fake = FakeFetcher()
+    app.config.update(UNFURL_ENABLED=True, UNFURL_FETCHER=fake)
+    app.config["UNFURL_CACHE_PATH"] = app.config["PAYLOAD_CACHE_DIR"].parent / "unfurl.db"
+    return fake
+
+
+def make_unfurler(tmp_path, fetcher, **kwargs):
+    options = {
+        "ttl": 60.0,
+        "error_ttl": 60.0,
+        "max_entries": 100,
+        "timeout": 1.0,
+        "max_bytes": 1_000_000,
+        "concurrency": 4,
+        **kwargs,
+    }
+    return Unfurler(tmp_path / "unfurl.db", fetcher, **options)
+
+
+def test_preview_stops_reading_after_head(client, fetcher):
+    res = client.get("/api/unfurl", query_string={"url": "https://example.com/docs/"})
+    assert res.get_json() == {
+        "url": "https://example.com/docs/",
+        "title": "Example Docs",
+        "description": "All the & docs",
+        "icon": "https://example.com/static/icon.png",
+    }
+    assert fetcher.blocks_read <= len(PAGE) // 64 + 2
+    assert fetcher.closed == 1
+
+    client.get("/api/unfurl", query_string={"url": "https://example.com/docs/"})
+    assert fetcher.calls == ["https://example.com/docs/"]
+
+
+def test_failures_are_cached_and_reported(client, fetcher):
+    for _ in range(2):
+        res = client.get("/api/unfurl", query_string={"url": "https://broken.example"})
+        assert res.status_code == 502
+    assert fetcher.calls == ["https://broken.example"]
+    assert client.get("/api/unfurl", query_string={"url": "ftp://x"}).status_code == 400
+
+
+def test_malformed_responses_are_cached_errors(client, fetcher):
+    res = client.get("/api/unfurl", query_string={"url": "https://garbled.example"})
+    assert res.status_code == 502
+    urls = ["https://garbled.example", "https://example.com/"]
+    results = client.post("/api/unfurl", json={"urls": urls}).get_json()["results"]
+    assert results["https://garbled.example"] == {"error": "HTTP/9.9 OK"}
+    assert results["https://example.com/"]["title"] == "Example Docs"
+    assert fetcher.calls == urls
+
+
+def test_previews_are_rate_limited_and_batches_bounded(app, client, fetcher):
+    urls = [f"https://site{i}.example" for i in range(101)]
+    assert client.post("/api/unfurl", json={"urls": urls}).status_code == 400
+
+    limited = create_app(
+        "testing",
+        test_config={**app.config, "RATELIMIT_ENABLED": True, "RATE_LIMIT_UNFURL": "1/minute"},
+    ).test_client()
+    assert limited.post("/api/unfurl", json={"urls": urls[:100]}).status_code == 200
+    assert limited.get("/api/unfurl", query_string={"url": urls[0]}).status_code == 429
+
+
+def test_disabled_by_default(client):
+    assert client.get("/api/unfurl", query_string={"url": "https://a.example"}).status_code == 404
+
+
+def test_concurrent_lookups_share_one_fetch(tmp_path):
+    fetcher = FakeFetcher(delay=0.2)
+    unfurler = make_unfurler(tmp_path, fetcher)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(unfurler.unfurl("https://a.example")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8 and all(result == results[0] for result in results)
+    assert fetcher.calls == ["https://a.example"]
+
+
+def test_cache_expires_and_evicts_least_recently_used(tmp_path):
+    fetcher = FakeFetcher()
+    unfurler = make_unfurler(tmp_path, fetcher, max_entries=2, ttl=0.2)
+    for name in ("a", "b", "c"):
+        unfurler.unfurl(f"https://{name}.example")
+    unfurler.unfurl("https://a.example")
+    unfurler.evict()
+    fetcher.calls.clear()
+    unfurler.unfurl("https://a.example")
+    unfurler.unfurl("https://c.example")
+    unfurler.unfurl("https://b.example")
+    assert fetcher.calls == ["https://b.example"]
+
+    time.sleep(0.25)
+    unfurler.unfurl("https://a.example")
+    assert fetcher.calls[-1] == "https://a.example"
+
+
+def test_batch_runs_with_bounded_concurrency(tmp_path):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    inner = FakeFetcher()
+
+    def fetch(url, timeout, max_bytes):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return inner(url, timeout, max_bytes)
+
+    unfurler = make_unfurler(tmp_path, fetch, concurrency=3)
+    urls = [f"https://site{i}.example" for i in range(12)] + ["https://broken.example"]
+    results = unfurler.unfurl_many(urls + urls[:2])
+    assert len(results) == 13
+    assert results["https://broken.example"] == {"error": "connection refused"}
+    assert results["https://site3.example"]["title"] == "Example Docs"
+    assert peak <= 3
+
+
+def test_add_card_fills_blank_fields_from_the_preview(client, fetcher):
+    column_id = client.get("/api/state").get_json()["columns"][0]["id"]
+    res = client.post(
+        "/api/card?unfurl=1",
+        json={"column_id": column_id, "link": "https://example.com/", "description": "Mine"},
+    )
+    assert res.status_code == 201
+    card = res.get_json()
+    assert (card["title"], card["description"]) == ("Example Docs", "Mine")
+    assert card["icon"] == "https://example.com/static/icon.png"
+
+    res = client.post("/api/card?unfurl=1", json={"column_id": column_id, "link": ""})
+    assert res.status_code == 400
+    res = client.post("/api/card", json={"column_id": column_id, "link": "https://example.com/"})
+    assert res.status_code == 400
+
+
+def test_default_fetcher_refuses_private_addresses():
+    fetch = urllib_fetcher()
+    with pytest.raises(UnfurlError, match="not a public address"):
+        fetch("http://127.0.0.1:9/", 1.0, 1024)
+    with pytest.raises(UnfurlError, match="only http"):
+        fetch("file:///etc/passwd", 1.0, 1024)
+
+
+def test_default_fetcher_connects_to_the_checked_address(monkeypatch):
+    # A rebinding resolver: public for the check, private for any later lookup.
+    answers = ["93.184.216.34", "127.0.0.1"]
+    connected = []
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        ip = answers.pop(0) if len(answers) > 1 else answers[0]
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, port))]
+
+    def create_connection(address, *args):
+        connected.append(address)
+        raise ConnectionRefusedError("refused")
+
+    monkeypatch.setattr(unfurl.socket, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(unfurl.socket, "create_connection", create_connection)
+    with pytest.raises(OSError, match="refused"):
+        urllib_fetcher()("http://rebind.example/", 1.0, 1024)
+    assert connected == [("93.184.216.34", 80)]
+    with pytest.raises(UnfurlError, match="not a public address"):
+        urllib_fetcher()("https://rebind.example/", 1.0, 1024)
+
+
+def test_get_unfurler_is_none_when_disabled(app):
+    assert get_unfurler(app) is None
@@ -0,0 +1,148 @@
+import base64
+import hashlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.uploads import UploadError, UploadSessions
+
+
+def png_bytes(size: int = 64) -> bytes:
+    stream = BytesIO()
+    Image.new("RGB", (size, size), color=(10, 200, 30)).save(stream, format="PNG")
+    return stream.getvalue()
+
+
+def create_upload(client, data: bytes, filename: str = "bg.png") -> str:
+    res = client.post(
+        "/api/uploads", json={"filename": filename, "size": len(data), "mimetype": "image/png"}
+    )
+    assert res.status_code == 201
+    assert res.headers["Location"].endswith(res.get_json()["id"])
+    return res.get_json()["id"]
+
+
+def patch(client, upload_id: str, offset: int, chunk: bytes, checksum: bytes | None = None):
+    headers = {"Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"}
+    if checksum is not None:
+        headers["Upload-Checksum"] = f"sha256 {base64.b64encode(checksum).decode()}"
+    return client.patch(f"/api/uploads/{upload_id}", data=chunk, headers=headers)
+
+
+def test_chunked_upload_resumes_and_becomes_the_background(app, client, tmp_path):
+    data = png_bytes()
+    upload_id = create_upload(client, data)
+    half = len(data) // 2
+
+    first = patch(client, upload_id, 0, data[:half], hashlib.sha256(data[:half]).digest())
+    assert first.status_code == 204
+    assert first.headers["Upload-Offset"] == str(half)
+
+    # A client that lost track of the offset is told where to resume.
+    conflict = patch(client, upload_id, 0, data[:half])
+    assert conflict.status_code == 409
+    assert conflict.headers["Upload-Offset"] == str(half)
+    head = client.head(f"/api/uploads/{upload_id}")
+    assert head.headers["Upload-Offset"] == str(half)
+    assert head.headers["Upload-Length"] == str(len(data))
+
+    assert patch(client, upload_id, half, data[half:]).status_code == 204
+    res = client.post(f"/api/uploads/{upload_id}/finalize")
+    assert res.status_code == 200
+    url = res.get_json()["url"]
+    assert url.endswith(f"_{hashlib.sha256(data).hexdigest()[:16]}.png")
+    assert (app.config["UPLOAD_DIR"] / url.rsplit("/", 1)[1]).read_bytes() == data
+    assert client.get("/api/settings").get_json()["dashboard_bg_image"] == url
+    assert list((tmp_path / "uploads-tmp").iterdir()) == []
+
+
+def test_chunk_with_bad_checksum_is_discarded(client):
+    data = png_bytes()
+    upload_id = create_upload(client, data)
+    res = patch(client, upload_id, 0, data[:10], hashlib.sha256(b"other").digest())
+    assert res.status_code == 400
+    assert res.headers["Upload-Offset"] == "0"
+    assert client.head(f"/api/uploads/{upload_id}").headers["Upload-Offset"] == "0"
+
+
+def test_upload_digest_is_kept_while_appending(tmp_path):
+    data = png_bytes()
+    sessions = UploadSessions(tmp_path, max_size=10**6, ttl=60)
+    upload_id = sessions.create("bg.png", len(data), "image/png")
+    half = len(data) // 2
+    sessions.append(upload_id, 0, iter([data[:half]]))
+    with pytest.raises(UploadError):
+        sessions.append(upload_id, half, iter([b"x" * len(data)]))
+    sessions.append(upload_id, half, iter([data[half:]]))
+
+    # Another worker has no digest for the session and reads the file instead.
+    other = UploadSessions(tmp_path, max_size=10**6, ttl=60)
+    assert other.complete(upload_id)[2] == hashlib.sha256(data).hexdigest()
+
+    # The appending worker does not read the file again.
+    (tmp_path / f"{upload_id}.part").write_bytes(bytes(len(data)))
+    assert sessions.complete(upload_id)[2] == hashlib.sha256(data).hexdigest()
+
+
+def test_upload_limits_are_enforced(client):
+    data = png_bytes()
+    upload_id = create_upload(client, data)
+    assert patch(client, upload_id, 0, data + b"extra").status_code == 413
+    assert client.post(f"/api/uploads/{upload_id}/finalize").status_code == 409
+    assert client.head("/api/uploads/" + "0" * 32).status_code == 404
+
+    too_big = client.post("/api/uploads", json={"filename": "bg.png", "size": 10**12})
+    assert too_big.status_code == 413
+    bad_ext = client.post("/api/uploads", json={"filename": "bg.exe", "size": 10})
+    assert bad_ext.status_code == 400
+
+
+def test_finalize_validates_the_assembled_file(client, tmp_path):
+    data = b"not an image at all"
+    upload_id = create_upload(client, data)
+    assert patch(client, upload_id, 0, data).status_code == 204
+    res = client.post(f"/api/uploads/{upload_id}/finalize")
+    assert res.status_code == 400
+    assert res.get_json()["error"]["message"] == "invalid image content"
+    assert client.head(f"/api/uploads/{upload_id}").status_code == 404
+
+
+def test_uploads_are_served_with_ranges_and_validators(app, client):
+    data = png_bytes()
+    (app.config["UPLOAD_DIR"] / "bg_0123.png").write_bytes(data)
+
+    full = client.get("/static/uploads/bg_0123.png")
+    assert full.status_code == 200
+    assert full.data == data
+    assert full.mimetype == "image/png"
+    assert "immutable" in full.headers["Cache-Control"]
+    assert full.headers["Accept-Ranges"] == "bytes"
+
+    part = client.get("/static/uploads/bg_0123.png", headers={"Range": "bytes=0-9"})
+    assert part.status_code == 206
+    assert part.data == data[:10]
+    assert part.headers["Content-Range"] == f"bytes 0-9/{len(data)}"
+
+    cached = client.get(
+        "/static/uploads/bg_0123.png", headers={"If-None-Match": full.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+    assert client.get("/static/uploads/../uploads/missing.png").status_code == 404
+
+
+def test_uploads_can_be_delegated_to_the_proxy(app, client):
+    (app.config["UPLOAD_DIR"] / "bg 1.png").write_bytes(png_bytes())
+
+    app.config["UPLOAD_SERVE_MODE"] = "x-accel"
+    res = client.get("/static/uploads/bg 1.png")
+    assert res.status_code == 200
+    assert res.data == b""
+    assert res.headers["X-Accel-Redirect"] == "/_uploads/bg%201.png"
+    assert res.mimetype == "image/png"
+    assert client.get("/static/uploads/nope.png").status_code == 404
+
+    app.config["UPLOAD_SERVE_MODE"] = "x-sendfile"
+    res = client.get("/static/uploads/bg 1.png")
+    assert res.headers["X-Sendfile"] == str(app.config["UPLOAD_DIR"] / "bg 1.png")
+    assert res.data == b""
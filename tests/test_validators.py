@@ -0,0 +1,65 @@
+import pytest
+
+from app.validators import Int, ListOf, Schema, String, Url, ValidationError
+
+CARDS = Schema(
+    {
+        "cards": ListOf(
+            Schema({"title": String(max_len=10, required=True), "link": Url(default="")}),
+            max_items=5000,
+        )
+    }
+)
+
+
+def test_schema_reports_every_invalid_field(client):
+    res = client.post("/api/card", json={"title": " ", "column_id": "x", "link": "ftp://a"})
+
+    assert res.status_code == 400
+    error = res.get_json()["error"]
+    assert error["message"] in error["details"]["errors"].values()
+    assert error["details"]["errors"] == {
+        "title": "'title' is required",
+        "column_id": "'column_id' must be an integer",
+        "link": "'link' must be an http/https URL",
+    }
+
+
+def test_settings_reject_unknown_fields(client):
+    res = client.put("/api/settings", json={"cols_per_row": 99, "theme": "dark"})
+
+    assert res.status_code == 400
+    error = res.get_json()["error"]
+    assert error["message"] == "unsupported settings fields"
+    assert error["details"] == {"fields": ["theme"]}
+
+
+def test_optional_fields_are_omitted_or_defaulted():
+    schema = Schema({"title": String(max_len=5), "link": Url(default=""), "n": Int()})
+
+    assert schema.load({"title": None, "extra": 1}) == {"link": ""}
+    assert schema.load({"title": "ab", "n": "7"}) == {"title": "ab", "link": "", "n": 7}
+
+
+def test_lists_report_item_paths():
+    payload = {"cards": [{"title": "ok"}] * 3000 + [{"title": "x" * 11}, {"link": "nope"}]}
+
+    with pytest.raises(ValidationError) as exc:
+        CARDS.load(payload)
+
+    assert exc.value.details["errors"] == {
+        "cards[3000].title": "'cards[3000].title' exceeds max length 10",
+        "cards[3001].link": "'cards[3001].link' must be an http/https URL",
+        "cards[3001].title": "'cards[3001].title' must be a string",
+    }
+    assert len(CARDS.load({"cards": [{"title": "ok"}] * 5000})["cards"]) == 5000
+
+
+def test_int_lists_are_converted_and_bounded():
+    schema = Schema({"order": ListOf(Int(), max_items=3, required=True)})
+
+    assert schema.load({"order": [3, "2", 1]}) == {"order": [3, 2, 1]}
+    with pytest.raises(ValidationError, match="exceeds max size 3"):
+        schema.load({"order": [1, 2, 3, 4]})
+    with pytest.raises(ValidationError, match=r"'order' contains non-integer value"):
+        schema.load({"order": [1, "x"]})
@@ -0,0 +1,161 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app import create_app
+from app.extensions import db
+from app.models import Card, Column
+from app.repositories import BoardRepository
+
+
+@contextmanager
+def count_statements(app):
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture()
+def column_id(client):
+    return client.get("/api/state").get_json()["columns"][0]["id"]
+
+
+def test_add_card_is_one_statement(app, client, column_id):
+    with count_statements(app) as statements:
+        first = client.post("/api/card", json={"title": "One", "column_id": column_id})
+    assert first.status_code == 201
+    assert len(statements) == 1
+    second = client.post("/api/card", json={"title": "Two", "column_id": column_id})
+    assert first.get_json()["position"] == 0
+    assert second.get_json()["position"] == 1
+
+
+def test_add_card_to_missing_column_inserts_nothing(app, client):
+    with count_statements(app) as statements:
+        res = client.post("/api/card", json={"title": "Lost", "column_id": 9999})
+    assert res.status_code == 404
+    assert len(statements) == 1
+
+
+def test_update_card_is_one_statement(app, client, column_id):
+    card = client.post("/api/card", json={"title": "One", "column_id": column_id}).get_json()
+    with count_statements(app) as statements:
+        res = client.put(f"/api/card/{card['id']}", json={"title": "Renamed"})
+    assert res.get_json() == {**card, "title": "Renamed"}
+    assert len(statements) == 1
+
+
+def test_moving_card_appends_to_target_column_in_one_statement(app, client):
+    columns = client.get("/api/state").get_json()["columns"]
+    source, target = columns[0]["id"], columns[1]["id"]
+    client.post("/api/card", json={"title": "Existing", "column_id": target})
+    card = client.post("/api/card", json={"title": "Move", "column_id": source}).get_json()
+
+    with count_statements(app) as statements:
+        res = client.put(f"/api/card/{card['id']}", json={"column_id": target})
+    assert len(statements) == 1
+    assert res.get_json()["column_id"] == target
+    assert res.get_json()["position"] == 1
+
+    missing = client.put(f"/api/card/{card['id']}", json={"column_id": 9999})
+    assert missing.status_code == 404
+    assert missing.get_json()["error"]["message"] == "target column not found"
+
+
+def test_column_create_and_update_are_one_statement(app, client):
+    with count_statements(app) as statements:
+        created = client.post("/api/column", json={"name": "Reading"})
+    assert len(statements) == 1
+    column = created.get_json()
+    assert column == {"id": column["id"], "name": "Reading", "position": 3, "cards": []}
+
+    with count_statements(app) as statements:
+        updated = client.put(f"/api/column/{column['id']}", json={"name": "Later"})
+    assert len(statements) == 1
+    assert updated.get_json()["name"] == "Later"
+
+
+def add_cards(client, column_id, count):
+    for i in range(count):
+        client.post("/api/card", json={"title": f"Card {i}", "column_id": column_id})
+
+
+def test_small_column_is_deleted_inline(app, client, column_id):
+    add_cards(client, column_id, 3)
+
+    assert client.delete(f"/api/column/{column_id}").status_code == 204
+
+    assert "column_purge" not in app.extensions
+    with app.app_context():
+        assert db.session.get(Column, column_id) is None
+        assert db.session.scalar(select(func.count()).select_from(Card)) == 0
+
+
+def test_large_column_is_hidden_then_purged_in_chunks(app, client, column_id):
+    app.config["COLUMN_PURGE_CHUNK"] = 4
+    add_cards(client, column_id, 15)
+    etag = client.get("/api/state").headers["ETag"]
+
+    with count_statements(app) as statements:
+        assert client.delete(f"/api/column/{column_id}").status_code == 204
+        state = client.get("/api/state")
+        assert column_id not in [col["id"] for col in state.get_json()["columns"]]
+        deadline = time.monotonic() + 5
+        with app.app_context():
+            while db.session.get(Column, column_id) is not None:
+                assert time.monotonic() < deadline
+                db.session.rollback()
+                time.sleep(0.01)
+
+    deletes = [sql for sql in statements if sql.startswith("DELETE FROM cards")]
+    assert len(deletes) == 4
+    # Only hiding the column changed the board; the purge left the revision alone.
+    final = client.get("/api/state")
+    assert final.headers["ETag"] == state.headers["ETag"] != etag
+
+
+def test_purge_resumes_after_a_restart(app):
+    # A process hid the column, then died before the purge finished.
+    app.config["COLUMN_PURGE_CHUNK"] = 2
+    with app.app_context():
+        column_id = db.session.scalar(select(Column.id).limit(1))
+        db.session.add_all(Card(title=f"Card {i}", column_id=column_id) for i in range(5))
+        db.session.commit()
+        assert BoardRepository().delete_column(column_id, chunk_size=2) is True
+
+    restarted = create_app("testing", test_config=app.config)
+    assert restarted.test_client().get("/api/state").status_code == 200
+    deadline = time.monotonic() + 5
+    with restarted.app_context():
+        while db.session.get(Column, column_id) is not None:
+            assert time.monotonic() < deadline
+            db.session.rollback()
+            time.sleep(0.01)
+
+
+def test_tombstoned_column_rejects_writes(app, client, column_id):
+    add_cards(client, column_id, 2)
+    other = client.get("/api/state").get_json()["columns"][1]["id"]
+    with app.app_context():
+        card_id = db.session.scalar(select(Card.id).where(Card.column_id == column_id))
+        assert BoardRepository().delete_column(column_id, chunk_size=1) is True
+
+    add = client.post("/api/card", json={"title": "Late", "column_id": column_id})
+    assert add.status_code == 404
+    assert client.put(f"/api/card/{card_id}", json={"title": "Edit"}).status_code == 404
+    moved_in = client.post("/api/card", json={"title": "Move", "column_id": other}).get_json()
+    move = client.put(f"/api/card/{moved_in['id']}", json={"column_id": column_id})
+    assert move.get_json()["error"]["message"] == "target column not found"
+    live = [col["id"] for col in client.get("/api/state").get_json()["columns"]]
+    assert client.post("/api/column/reorder", json={"order": live}).status_code == 204